@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 import argparse
-import json
-import socket
 import sys
-import time
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 def send_json(host: str, port: int, payload: Dict[str, Any]) -> None:
-    line = json.dumps(payload, separators=(",", ":")) + "\n"
-    data = line.encode("utf-8")
+    # Imported here so argument errors and --help don't pay for them
+    import socket
+    import json
+    # ASCII-escaped: the server turns each received byte into one TCHAR, so raw UTF-8 would be mangled
+    data = (json.dumps(payload, separators=(",", ":")) + "\n").encode("ascii")
     with socket.create_connection((host, port), timeout=2.0) as sock:
+        # Push the whole line out immediately, then half-close so the FIN follows the payload
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+
+def _with_optional(payload: Dict[str, Any], **optional: Any) -> Dict[str, Any]:
+    payload.update({k: v for k, v in optional.items() if v is not None})
+    return payload
+
+# Subcommand name -> payload builder from parsed args
+CMD_BUILDERS: Dict[str, Callable[[argparse.Namespace], Dict[str, Any]]] = {
+    "move": lambda a: _with_optional({"cmd": "move", "forward": a.forward, "right": a.right}, duration=a.duration),
+    "look": lambda a: _with_optional({"cmd": "look", "yawRate": a.yawRate, "pitchRate": a.pitchRate}, duration=a.duration),
+    "jump": lambda a: {"cmd": "jump"},
+    "sprint": lambda a: {"cmd": "sprint", "enabled": a.enabled.lower() == "true"},
+    "screenshot": lambda a: _with_optional({"cmd": "screenshot"}, path=a.path or None, showUI=True if a.showUI else None),
+    "state": lambda a: _with_optional({"cmd": "state"}, path=a.path or None),
+}
 
 def main() -> int:
     p = argparse.ArgumentParser(description="Send JSON commands to StrandsInputServer over TCP.")
@@ -42,39 +59,14 @@ def main() -> int:
 
     args = p.parse_args()
 
+    build = CMD_BUILDERS.get(args.cmd)
+    if build is None:
+        p.print_help()
+        return 2
     try:
-        if args.cmd == "move":
-            payload = {"cmd": "move", "forward": args.forward, "right": args.right}
-            if args.duration is not None:
-                payload["duration"] = args.duration
-            send_json(args.host, args.port, payload)
-        elif args.cmd == "look":
-            payload = {"cmd": "look", "yawRate": args.yawRate, "pitchRate": args.pitchRate}
-            if args.duration is not None:
-                payload["duration"] = args.duration
-            send_json(args.host, args.port, payload)
-        elif args.cmd == "jump":
-            send_json(args.host, args.port, {"cmd": "jump"})
-        elif args.cmd == "sprint":
-            enabled = args.enabled.lower() == "true"
-            send_json(args.host, args.port, {"cmd": "sprint", "enabled": enabled})
-        elif args.cmd == "screenshot":
-            payload = {"cmd": "screenshot"}
-            if getattr(args, "path", None):
-                payload["path"] = args.path
-            if getattr(args, "showUI", False):
-                payload["showUI"] = True
-            send_json(args.host, args.port, payload)
-        elif args.cmd == "state":
-            payload = {"cmd": "state"}
-            if getattr(args, "path", None):
-                payload["path"] = args.path
-            send_json(args.host, args.port, payload)
-        else:
-            p.print_help()
-            return 2
+        send_json(args.host, args.port, build(args))
         return 0
-    except (ConnectionRefusedError, socket.timeout) as e:
+    except (ConnectionRefusedError, TimeoutError) as e:
         sys.stderr.write(f"Error: could not connect to {args.host}:{args.port} ({e})\n")
         return 1
 
@@ -1,6 +1,29 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import io
+import json
 import os
+import socket
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from strands.agent import Agent
+    from strands.session.file_session_manager import FileSessionManager
+
+# UE project's venv site-packages
+# agent_test.py -> StrandsMCP -> Tools -> MyProject (parents[2])
+_project_root = Path(__file__).resolve().parents[2]
+_site = _project_root / "Intermediate" / "PipInstall" / "Lib" / "site-packages"
 
 # Add likely native DLL locations to the DLL search path to resolve strands.cp311-win_amd64.pyd dependencies.
 def _add_dll_dir(p: Path):
@@ -10,187 +33,659 @@ def _add_dll_dir(p: Path):
     except Exception:
         pass
 
-# UE project's venv site-packages
-# agent_test.py -> StrandsMCP -> Tools -> MyProject (parents[2])
-_project_root = Path(__file__).resolve().parents[2]
-_site = _project_root / "Intermediate" / "PipInstall" / "Lib" / "site-packages"
-
-# Ensure Python can import packages installed by UE's PipInstall
-import sys
-if str(_site) not in sys.path:
-    sys.path.insert(0, str(_site))
+# Heavy / optional modules, bound by _lazy_imports() once the CLI has been parsed so that
+# --help and argument errors don't pay multi-second import and DLL setup costs. Agent and
+# FileSessionManager are bound under private names so the public ones stay typing-only.
+streamablehttp_client = None
+_Agent = None
+MCPClient = None
+_FileSessionManager = None
+BeforeInvocationEvent = None
+AfterInvocationEvent = None
+boto3 = None
+BotoConfig = None
+aioboto3 = None
+orjson = None
+Image = None
+watch = None
+
+def _lazy_imports() -> None:
+    global streamablehttp_client, _Agent, MCPClient, _FileSessionManager
+    global BeforeInvocationEvent, AfterInvocationEvent
+    global boto3, BotoConfig, aioboto3, orjson, Image, watch
+
+    # Ensure Python can import packages installed by UE's PipInstall
+    if str(_site) not in sys.path:
+        sys.path.insert(0, str(_site))
+
+    # Common native lib locations used by numpy/opencv-backed extensions
+    for sub in ["numpy/.libs", "numpy/core", "cv2", ""]:
+        _add_dll_dir((_site / sub) if sub else _site)
+
+    from mcp.client.streamable_http import streamablehttp_client
+    from strands.agent import Agent as _Agent
+    from strands.tools.mcp.mcp_client import MCPClient
+    from strands.session.file_session_manager import FileSessionManager as _FileSessionManager
+    from strands.hooks import BeforeInvocationEvent, AfterInvocationEvent
 
-# Common native lib locations used by numpy/opencv-backed extensions
-for sub in ["numpy/.libs", "numpy/core", "cv2", ""]:
-    _add_dll_dir((_site / sub) if sub else _site)
-
-from mcp.client.streamable_http import streamablehttp_client
-from strands.agent import Agent
-from strands.tools.mcp.mcp_client import MCPClient
-from strands.session.file_session_manager import FileSessionManager
-from strands.hooks import BeforeInvocationEvent, AfterInvocationEvent, HookProvider
-
-import json
-import socket
-import time
-from typing import Optional
-import base64
-try:
-    import boto3  # type: ignore
-except Exception:
-    boto3 = None
+    try:
+        import boto3  # type: ignore
+        from botocore.config import Config as BotoConfig  # type: ignore
+    except Exception:
+        boto3 = None
+        BotoConfig = None
+    try:
+        # Optional: async Bedrock client so summaries don't each hold a pool thread
+        import aioboto3  # type: ignore
+    except Exception:
+        aioboto3 = None
+    try:
+        import orjson  # type: ignore
+    except Exception:
+        orjson = None
+    try:
+        from PIL import Image  # type: ignore
+    except Exception:
+        Image = None
+    try:
+        # OS-level file notifications (inotify / ReadDirectoryChangesW / FSEvents)
+        from watchfiles import watch  # type: ignore
+    except Exception:
+        watch = None
+
+def _mcp_http_client_factory(headers=None, timeout=None, auth=None):
+    """httpx client for the MCP streamable-HTTP transport.
+
+    streamablehttp_client owns (and closes) the client it is handed, so this is one per MCP
+    session. httpx drops idle pooled connections after 5s by default, which is shorter than a
+    model turn between tool calls; keep them for a minute so tool calls reuse one connection.
+    """
+    import httpx
+
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout if timeout is not None else httpx.Timeout(30.0, read=300.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0),
+    )
+
+def _mcp_transport(url: str):
+    try:
+        return streamablehttp_client(url, httpx_client_factory=_mcp_http_client_factory)
+    except TypeError:
+        # Older mcp releases don't accept a client factory
+        return streamablehttp_client(url)
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 17777
 
-def _send_unreal_cmd(payload: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> bool:
-    """Fire-and-forget TCP JSON line to the Unreal StrandsInputServer."""
+# bedrock-runtime clients keyed by region; building one resolves endpoints and loads service
+# models, so reuse it (and its pooled HTTPS connection) across turns.
+_BEDROCK_CLIENTS: dict = {}
+_BEDROCK_LOCK = threading.Lock()
+
+def _bedrock_client(region: str):
+    client = _BEDROCK_CLIENTS.get(region)
+    if client is None:
+        with _BEDROCK_LOCK:
+            client = _BEDROCK_CLIENTS.get(region)
+            if client is None:
+                client = boto3.client("bedrock-runtime", region_name=region, config=_bedrock_config())
+                _BEDROCK_CLIENTS[region] = client
+    return client
+
+def _bedrock_config():
+    # botocore's adaptive mode is the only retry layer: it backs off (and rate-limits the client)
+    # on throttling and transient errors, so callers make a single converse call
+    return BotoConfig(
+        retries={"max_attempts": 4, "mode": "adaptive"},
+        tcp_keepalive=True,
+        max_pool_connections=8,
+    )
+
+# aioboto3 clients live on one background event loop and are reused across runs in this
+# process. Concurrent summaries on that loop can interleave while a client is being created, so
+# creation is serialized by an asyncio lock; the clients are closed on the loop at exit.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+_ASYNC_BEDROCK_CLIENTS: dict = {}  # region -> (client context manager, client)
+_ASYNC_BEDROCK_LOCK: Optional[asyncio.Lock] = None
+
+def _bedrock_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="bedrock-loop", daemon=True).start()
+            atexit.register(_shutdown_bedrock_loop)
+    return _LOOP
+
+async def _async_bedrock_client(region: str):
+    global _ASYNC_BEDROCK_LOCK
+    if _ASYNC_BEDROCK_LOCK is None:
+        _ASYNC_BEDROCK_LOCK = asyncio.Lock()  # created on the loop's thread, no await before this
+    async with _ASYNC_BEDROCK_LOCK:
+        entry = _ASYNC_BEDROCK_CLIENTS.get(region)
+        if entry is None:
+            ctx = aioboto3.Session().client("bedrock-runtime", region_name=region, config=_bedrock_config())
+            entry = (ctx, await ctx.__aenter__())
+            _ASYNC_BEDROCK_CLIENTS[region] = entry
+    return entry[1]
+
+async def _close_async_bedrock_clients() -> None:
+    entries = list(_ASYNC_BEDROCK_CLIENTS.values())
+    _ASYNC_BEDROCK_CLIENTS.clear()
+    for ctx, _client in entries:
+        try:
+            await ctx.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+def _shutdown_bedrock_loop() -> None:
+    """atexit: close the cached clients on their loop, then stop it."""
+    global _LOOP
+    with _LOOP_LOCK:
+        loop, _LOOP = _LOOP, None
+    if loop is None or not loop.is_running():
+        return
     try:
-        line = json.dumps(payload, separators=(",", ":")) + "\n"
-        data = line.encode("utf-8")
+        asyncio.run_coroutine_threadsafe(_close_async_bedrock_clients(), loop).result(timeout=5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+def _json_line(payload: dict) -> bytes:
+    """Serialize payload as one compact newline-terminated JSON line.
+
+    Always ASCII (non-ASCII escaped as \\uXXXX): StrandsInputServer turns each received byte into
+    one TCHAR, so raw UTF-8 in a path or id would arrive mangled.
+    """
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("ascii")
+
+def _load_json_file(path: Path):
+    """Parse a JSON file written by Unreal (which may carry a UTF-8 BOM) straight from bytes."""
+    raw = path.read_bytes()
+    if raw.startswith(_UTF8_BOM):
+        raw = raw[len(_UTF8_BOM):]
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+class _UnrealConn:
+    """Persistent newline-framed JSON connection to the Unreal StrandsInputServer.
+
+    The server keeps clients connected and processes every complete line it receives, so one
+    socket is reused across commands. Lazily (re)connects; guarded by a lock because hooks may
+    fire from agent threads.
+    """
+
+    _lock = threading.Lock()
+    _sock: Optional[socket.socket] = None
+    _addr: Optional[tuple] = None
+
+    @classmethod
+    def _connect(cls, host: str, port: int) -> socket.socket:
+        sock = socket.create_connection((host, port), timeout=2.0)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        cls._sock = sock
+        cls._addr = (host, port)
+        return sock
+
+    @classmethod
+    def _drop(cls) -> None:
+        if cls._sock is not None:
+            try:
+                cls._sock.close()
+            except OSError:
+                pass
+        cls._sock = None
+        cls._addr = None
+
+    @staticmethod
+    def _alive(sock: socket.socket) -> bool:
+        """False once the server has closed the connection (PIE stopped, level changed): a send
+        on the stale socket would still be accepted by the kernel and the command silently lost."""
+        timeout = sock.gettimeout()
+        try:
+            sock.setblocking(False)
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except BlockingIOError:
+            return True  # open, nothing to read
+        except OSError:
+            return False
+        finally:
+            try:
+                sock.settimeout(timeout)
+            except OSError:
+                pass
+
+    @classmethod
+    def _ensure(cls, host: str, port: int) -> socket.socket:
+        if cls._sock is None or cls._addr != (host, port) or not cls._alive(cls._sock):
+            cls._drop()
+            cls._connect(host, port)
+        return cls._sock
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, n: int) -> bytearray:
+        buf = bytearray(n)
+        view = memoryview(buf)
+        got = 0
+        while got < n:
+            r = sock.recv_into(view[got:], n - got)
+            if r == 0:
+                raise ConnectionError("connection closed mid-reply")
+            got += r
+        return buf
+
+    @classmethod
+    def send(cls, payload: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        data = _json_line(payload)
+        with cls._lock:
+            cls._ensure(host, port)
+            try:
+                cls._sock.sendall(data)
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                # Server restarted or dropped us; reconnect once and retry
+                cls._drop()
+                cls._connect(host, port).sendall(data)
+            except OSError:
+                cls._drop()
+                raise
+
+    @classmethod
+    def request(cls, payload: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 2.0) -> bytearray:
+        """Send a command and read its reply: a 4-byte big-endian length followed by that many bytes.
+
+        Uses its own short-lived connection, so waiting for a reply never holds the shared
+        connection's lock (or leaves it out of sync when the reply doesn't come).
+        """
+        data = _json_line(payload)
         with socket.create_connection((host, port), timeout=2.0) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             sock.sendall(data)
+            sock.settimeout(timeout)
+            (length,) = struct.unpack(">I", cls._recv_exact(sock, 4))
+            return cls._recv_exact(sock, length)
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            cls._drop()
+
+def _send_unreal_cmd(payload: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> bool:
+    """Send a JSON command line to the Unreal StrandsInputServer over the persistent connection."""
+    try:
+        _UnrealConn.send(payload, host, port)
         return True
     except Exception:
         return False
 
+# Cleared the first time an inline readback fails: a StrandsInputServer build without
+# screenshot_inline never replies, so later turns go straight to the file capture
+_INLINE_SHOT_SUPPORTED = True
+
+def _send_unreal_cmd_readback(payload: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Optional[bytes]:
+    """Send a command whose reply is returned inline (length-prefixed) on a dedicated connection. None on failure."""
+    try:
+        return bytes(_UnrealConn.request(payload, host, port))
+    except Exception:
+        return None
+
+def _file_ready(p: Path, start_ts: float) -> bool:
+    # One stat per check (exists() + two stat() calls was three)
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return False
+    return st.st_mtime > start_ts and st.st_size > 0
+
 def _wait_for_file(p: Path, start_ts: float, timeout_s: float = 15.0, poll_ms: int = 100) -> bool:
-    """Wait for file to appear and have mtime newer than start_ts."""
-    deadline = start_ts + timeout_s
-    while time.time() < deadline:
+    """Wait for file to appear and have mtime newer than start_ts.
+
+    start_ts is wall-clock (time.time()) because it is compared against st_mtime; the timeout
+    itself runs on the monotonic clock so wall-clock adjustments can't cut it short or stretch it.
+    Uses OS file notifications on the parent directory when watchfiles is installed,
+    otherwise falls back to polling every poll_ms.
+    """
+    if _file_ready(p, start_ts):
+        return True
+    deadline = time.monotonic() + max(0.0, timeout_s - (time.time() - start_ts))
+    if watch is not None:
         try:
-            if p.exists() and p.stat().st_mtime > start_ts and p.stat().st_size > 0:
-                return True
-        except FileNotFoundError:
-            pass
+            p.parent.mkdir(parents=True, exist_ok=True)
+            # rust_timeout bounds each wait so we re-check the deadline (and any write that
+            # landed before the watcher was armed) at least every 500ms.
+            for _changes in watch(
+                p.parent,
+                watch_filter=lambda _change, path: Path(path).name == p.name,
+                step=10,
+                rust_timeout=500,
+                yield_on_timeout=True,
+                recursive=False,
+            ):
+                if _file_ready(p, start_ts):
+                    return True
+                if time.monotonic() >= deadline:
+                    return False
+        except Exception:
+            pass  # watcher unavailable (e.g. unsupported filesystem); poll instead
+    while time.monotonic() < deadline:
+        if _file_ready(p, start_ts):
+            return True
         time.sleep(poll_ms / 1000.0)
     return False
 
+# Screenshots below this size are sent as-is; larger ones are re-encoded as JPEG
+_JPEG_MIN_BYTES = 200_000
+
+def _compact_image(img_bytes: bytes, img_format: str = "png", max_dim: Optional[int] = None) -> tuple:
+    """Re-encode a large screenshot as JPEG (quality 85), downscaled so its long edge is at most
+    max_dim when given. Returns (bytes, format); the input is returned unchanged when no work is needed."""
+    if Image is None or (max_dim is None and len(img_bytes) < _JPEG_MIN_BYTES):
+        return img_bytes, img_format
+    try:
+        with Image.open(io.BytesIO(img_bytes)) as img:
+            too_big = max_dim is not None and max(img.size) > max_dim
+            if not too_big and len(img_bytes) < _JPEG_MIN_BYTES:
+                return img_bytes, img_format
+            img = img.convert("RGB")
+            if too_big:
+                img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=85, optimize=True)
+        return buf.getvalue(), "jpeg"
+    except Exception:
+        return img_bytes, img_format
+
+def _jpeg_bytes(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85, optimize=True)
+    return buf.getvalue()
+
+def _prepare_shot(img_bytes: bytes, img_format: str = "png", summary_max_dim: int = 768) -> tuple:
+    """Decode a screenshot once and derive everything a scene message needs from that decode.
+
+    Returns (session_bytes, session_format, summary_bytes, summary_format, scene_hash): the session
+    copy (JPEG-compacted like _compact_image when large), the Bedrock copy downscaled to
+    summary_max_dim on its long edge, and the scene fingerprint. Without Pillow (or on a decode
+    error) the original bytes serve all three, hashed raw.
+    """
+    try:
+        if Image is None:
+            raise ValueError("Pillow unavailable")
+        with Image.open(io.BytesIO(img_bytes)) as img:
+            rgb = img.convert("RGB")
+    except Exception:
+        digest = hashlib.blake2b(img_bytes, digest_size=8).digest()
+        return img_bytes, img_format, img_bytes, img_format, digest
+
+    if len(img_bytes) >= _JPEG_MIN_BYTES:
+        session_bytes, session_format = _jpeg_bytes(rgb), "jpeg"
+    else:
+        session_bytes, session_format = img_bytes, img_format
+    small = rgb
+    summary_bytes, summary_format = session_bytes, session_format
+    if max(rgb.size) > summary_max_dim:
+        small = rgb.copy()
+        small.thumbnail((summary_max_dim, summary_max_dim), Image.LANCZOS)
+        summary_bytes, summary_format = _jpeg_bytes(small), "jpeg"
+    # Fingerprint: a 32x32 grayscale thumbnail quantized to 16 levels, so encoder and sensor noise
+    # don't register as a scene change
+    gray = small.convert("L").resize((32, 32))
+    digest = hashlib.blake2b(bytes(v >> 4 for v in gray.tobytes()), digest_size=8).digest()
+    return session_bytes, session_format, summary_bytes, summary_format, digest
+
+def _summary_request(
+    img_bytes: bytes,
+    image_format: str,
+    model_id: Optional[str],
+    inference_profile_arn: Optional[str],
+    max_tokens: int,
+    prompt: Optional[str],
+    summary_max_dim: Optional[int],
+) -> dict:
+    """Build the Converse keyword arguments for a scene summary.
+
+    The image is downscaled to summary_max_dim on its long edge first; a one-sentence summary
+    doesn't need full resolution, and image tokens scale with pixel count.
+    """
+    if summary_max_dim:
+        img_bytes, image_format = _compact_image(img_bytes, image_format, max_dim=summary_max_dim)
+    # Default prompt if not provided
+    prompt_text = prompt or "Summarize the scene in one or two concise sentences. Mention key objects and relative positions."
+
+    # Converse takes raw image bytes (no base64 wrapping) and accepts an inference profile ARN as modelId
+    return {
+        "modelId": inference_profile_arn or model_id or "anthropic.claude-3-7-sonnet-20250219-v1:0",
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"text": prompt_text},
+                    {"image": {"format": image_format, "source": {"bytes": img_bytes}}},
+                ],
+            }
+        ],
+        "inferenceConfig": {"maxTokens": max_tokens, "temperature": 0.0},
+    }
+
+def _summary_text(resp: dict) -> Optional[str]:
+    # Converse response shape: {"output":{"message":{"content":[{"text":"..."}]}}}
+    msg = resp.get("output", {}).get("message", {})
+    content = msg.get("content", []) if isinstance(msg, dict) else []
+    for block in content:
+        if isinstance(block, dict) and block.get("text"):
+            return str(block["text"]).strip()
+    return None
+
+async def _async_summarize(
+    img_bytes: bytes,
+    *,
+    image_format: str = "png",
+    region: str = "us-west-2",
+    model_id: Optional[str] = None,
+    inference_profile_arn: Optional[str] = None,
+    max_tokens: int = 256,
+    prompt: Optional[str] = None,
+    summary_max_dim: Optional[int] = 768,
+) -> Optional[str]:
+    """aioboto3 variant of _summarize_image_bedrock; run it on _bedrock_loop(). Returns None on failure."""
+    try:
+        # Building the request may decode and re-encode the image; keep that CPU work off the
+        # shared loop so other in-flight summaries aren't stalled behind it
+        request = await asyncio.get_running_loop().run_in_executor(
+            None, _summary_request, img_bytes, image_format, model_id, inference_profile_arn, max_tokens, prompt, summary_max_dim
+        )
+        client = await _async_bedrock_client(region)
+        resp = await client.converse(**request)
+        return _summary_text(resp)
+    except Exception as e:
+        print(f"Scene summary: Bedrock call failed: {type(e).__name__}: {e}")
+        return None
+
 def _summarize_image_bedrock(
     img_bytes: bytes,
     *,
+    image_format: str = "png",
     region: str = "us-west-2",
     model_id: Optional[str] = None,
     inference_profile_arn: Optional[str] = None,
     max_tokens: int = 256,
     prompt: Optional[str] = None,
+    summary_max_dim: Optional[int] = 768,
 ) -> Optional[str]:
-    """Call Bedrock Claude Sonnet to summarize an image into text. Returns None on failure."""
+    """Call Bedrock Claude Sonnet to summarize an image into text. Returns None on failure.
+
+    Uses the async client on the background loop when aioboto3 is installed, else boto3.
+    """
+    kwargs = dict(
+        image_format=image_format,
+        region=region,
+        model_id=model_id,
+        inference_profile_arn=inference_profile_arn,
+        max_tokens=max_tokens,
+        prompt=prompt,
+        summary_max_dim=summary_max_dim,
+    )
+    if aioboto3 is not None:
+        try:
+            return asyncio.run_coroutine_threadsafe(_async_summarize(img_bytes, **kwargs), _bedrock_loop()).result(timeout=20)
+        except Exception as e:
+            print(f"Scene summary: Bedrock call failed: {type(e).__name__}: {e}")
+            return None
     if boto3 is None:
         return None
     try:
-        client = boto3.client("bedrock-runtime", region_name=region)
-        # Default prompt if not provided
-        prompt_text = prompt or "Summarize the scene in one or two concise sentences. Mention key objects and relative positions."
+        request = _summary_request(img_bytes, image_format, model_id, inference_profile_arn, max_tokens, prompt, summary_max_dim)
+        client = _bedrock_client(region)
+        resp = client.converse(**request)
+        return _summary_text(resp)
+    except Exception as e:
+        print(f"Scene summary: Bedrock call failed: {type(e).__name__}: {e}")
+        return None
 
-        body = json.dumps(
-            {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "input_text", "text": prompt_text},
-                            {
-                                "type": "input_image",
-                                "image": {
-                                    "format": "png",
-                                    "source": {"bytes": base64.b64encode(img_bytes).decode("utf-8")},
-                                },
-                            },
-                        ],
-                    }
-                ],
-            }
-        )
+# Scene summaries run off the hook path and queue their messages like the hooks do: on the
+# Bedrock event loop when aioboto3 is available, otherwise on this pool. Every in-flight summary
+# is tracked in _PENDING_SUMMARIES so a run can wait for them without shutting the pool down.
+_SUMMARY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scene-summary")
+_PENDING_SUMMARIES: set = set()
 
-        # Prefer inference profile ARN if provided; else fallback to modelId
-        if inference_profile_arn:
-            try:
-                resp = client.invoke_model(
-                    inferenceProfileArn=inference_profile_arn,
-                    contentType="application/json",
-                    accept="application/json",
-                    body=body,
-                )
-            except TypeError:
-                # SDK may not support inferenceProfileArn param; fallback to modelId path below
-                resp = None
-        else:
-            resp = None
-
-        if resp is None:
-            mid = model_id or "anthropic.claude-3-7-sonnet-20250219-v1:0"
-            resp = client.invoke_model(
-                modelId=mid,
-                contentType="application/json",
-                accept="application/json",
-                body=body,
-            )
-
-        payload = resp.get("body").read().decode("utf-8") if hasattr(resp.get("body", None), "read") else resp
-        data = json.loads(payload) if isinstance(payload, str) else payload
-
-        # Try common Anthropic Bedrock response shape
-        # Some SDKs return {"output":{"message":{"content":[{"type":"output_text","text":"..."}]}}}
-        msg = data.get("output", {}).get("message", {})
-        content = msg.get("content", []) if isinstance(msg, dict) else []
-        for block in content:
-            if isinstance(block, dict) and block.get("type") in ("output_text", "text") and block.get("text"):
-                return str(block["text"]).strip()
-
-        # Fallback: some responses use "content":[{"text":"..."}] at top-level
-        content = data.get("content")
-        if isinstance(content, list):
-            for block in content:
-                if isinstance(block, dict) and block.get("text"):
-                    return str(block["text"]).strip()
+def _drain_summaries(timeout_s: float = 30.0) -> None:
+    """Wait for in-flight scene summaries (and their session appends) to finish."""
+    deadline = time.monotonic() + timeout_s
+    while _PENDING_SUMMARIES and time.monotonic() < deadline:
+        time.sleep(0.05)
 
-        return None
-    except Exception:
-        return None
+class _SessionBuffer:
+    """Queues session messages so a turn pays for one sync_agent instead of one per message.
+
+    Hooks and background summaries only append to the pending list; flush() writes the queued
+    messages and syncs the agent once. It also remembers this session's last scene summary, so an
+    unchanged scene reuses it (never another session's, in a long-lived worker process).
+    """
+
+    def __init__(self, session_manager: FileSessionManager):
+        self.session_manager = session_manager
+        self._pending: list = []
+        self._agent: Optional[Agent] = None
+        self._lock = threading.Lock()
+        self._last_shot_hash: Optional[bytes] = None
+        self._last_summary: Optional[str] = None
+
+    def cached_summary(self, shot_hash: bytes) -> Optional[str]:
+        with self._lock:
+            return self._last_summary if shot_hash == self._last_shot_hash else None
+
+    def remember_summary(self, shot_hash: bytes, summary: str) -> None:
+        with self._lock:
+            self._last_shot_hash, self._last_summary = shot_hash, summary
+
+    def append_message(self, message: dict, agent: Agent) -> None:
+        with self._lock:
+            self._pending.append(message)
+            self._agent = agent
+
+    def flush(self, agent: Optional[Agent] = None) -> None:
+        with self._lock:
+            agent = agent or self._agent
+            if not self._pending or agent is None:
+                return
+            pending, self._pending = self._pending, []
+            for message in pending:
+                self.session_manager.append_message(message, agent)
+            self.session_manager.sync_agent(agent)
 
 def _append_image_message_with_optional_summary(
-    session_manager: FileSessionManager,
+    session_buffer: _SessionBuffer,
     agent: Agent,
     shot_path: Path,
     *,
+    img_bytes: Optional[bytes] = None,
     include_summary: bool = True,
     region: str = "us-west-2",
     model_id: Optional[str] = None,
     inference_profile_arn: Optional[str] = "arn:aws:bedrock:us-west-2:609061237212:inference-profile/us.anthropic.claude-sonnet-4-20250514-v1:0",
 ) -> None:
-    """Read image from disk, optionally summarize with Bedrock, and append message (text + image) to session."""
-    img_bytes = shot_path.read_bytes()
-    blocks = [{"text": f"Scene image captured at {time.ctime()}."}]
+    """Read image from disk (unless img_bytes is given) and append it to the session right away.
+
+    With include_summary, Bedrock summarizes the image in the background and the summary is
+    appended as a follow-up message when it resolves, so the turn never waits on it.
+    """
+    if img_bytes is None:
+        img_bytes = shot_path.read_bytes()
+    # One decode yields the compact session copy, the downscaled Bedrock copy and the scene hash
+    img_bytes, img_format, summary_bytes, summary_format, shot_hash = _prepare_shot(img_bytes)
+    blocks = [
+        {"text": f"Scene image captured at {time.ctime()}."},
+        {"image": {"format": img_format, "source": {"bytes": img_bytes}}},
+    ]
+    session_buffer.append_message({"role": "user", "content": blocks}, agent)
+
     if include_summary:
-        summary = _summarize_image_bedrock(
-            img_bytes,
+        cached = session_buffer.cached_summary(shot_hash)
+        if cached:
+            # Scene hasn't changed since the last summary; skip the Bedrock call
+            session_buffer.append_message({"role": "user", "content": [{"text": f"Scene summary: {cached}"}]}, agent)
+            return
+
+        summary_kwargs = dict(
+            image_format=summary_format,
             region=region,
             model_id=model_id,
             inference_profile_arn=inference_profile_arn,
             max_tokens=192,
             prompt="Provide a concise, factual description of what is visible in this third-person Unreal scene.",
+            summary_max_dim=None,  # already downscaled by _prepare_shot
         )
-        if summary:
-            blocks.append({"text": f"Scene summary: {summary}"})
-    blocks.append({"image": {"format": "png", "source": {"bytes": img_bytes}}})
+        if aioboto3 is not None:
+            fut = asyncio.run_coroutine_threadsafe(_async_summarize(summary_bytes, **summary_kwargs), _bedrock_loop())
+        else:
+            fut = _SUMMARY_POOL.submit(_summarize_image_bedrock, summary_bytes, **summary_kwargs)
 
-    message = {"role": "user", "content": blocks}
-    session_manager.append_message(message, agent)
-    session_manager.sync_agent(agent)
+        def _on_summary(f):
+            try:
+                summary = f.result()
+                if summary:
+                    session_buffer.remember_summary(shot_hash, summary)
+                    session_buffer.append_message({"role": "user", "content": [{"text": f"Scene summary: {summary}"}]}, agent)
+            except Exception as e:
+                print("Scene summary: failed to append:", e)
 
-def _append_post_turn_screenshot(session_manager: FileSessionManager, agent: Agent, shot_path: Path) -> None:
-    """Capture and append a post-turn screenshot to the session for agent situational awareness."""
+        _PENDING_SUMMARIES.add(fut)
+        fut.add_done_callback(_on_summary)
+        # Registered after _on_summary so a future leaves the set only once its message is queued
+        fut.add_done_callback(_PENDING_SUMMARIES.discard)
+
+def _append_post_turn_screenshot(session_buffer: _SessionBuffer, agent: Agent, shot_path: Path, inline: bool = False) -> None:
+    """Capture and append a post-turn screenshot to the session for agent situational awareness.
+
+    With inline=True the PNG is read back over a socket (screenshot_inline), skipping the disk
+    write and file wait; falls back to the file path if that fails, and stops trying inline for
+    the rest of the process.
+    """
     try:
         # brief delay to ensure world has advanced and frame is rendered
         time.sleep(0.5)
+        global _INLINE_SHOT_SUPPORTED
+        if inline and _INLINE_SHOT_SUPPORTED:
+            img_bytes = _send_unreal_cmd_readback({"cmd": "screenshot_inline", "showUI": False})
+            if img_bytes:
+                try:
+                    _append_image_message_with_optional_summary(session_buffer, agent, shot_path, img_bytes=img_bytes, include_summary=True)
+                    print("Appended post-turn screenshot (inline) to session.")
+                except Exception as e:
+                    print("Post-turn: failed to append inline screenshot:", e)
+                return
+            _INLINE_SHOT_SUPPORTED = False
+            print("Post-turn: inline screenshot unavailable; using file capture from now on.")
         t = time.time()
         _send_unreal_cmd({"cmd": "screenshot", "path": str(shot_path), "showUI": False})
         if _wait_for_file(shot_path, t, timeout_s=8.0):
             try:
-                _append_image_message_with_optional_summary(session_manager, agent, shot_path, include_summary=True)
+                _append_image_message_with_optional_summary(session_buffer, agent, shot_path, include_summary=True)
                 print("Appended post-turn screenshot to session.")
             except Exception as e:
                 print("Post-turn: failed to read/append screenshot:", e)
@@ -199,133 +694,158 @@ def _append_post_turn_screenshot(session_manager: FileSessionManager, agent: Age
     except Exception as e:
         print("Post-turn screenshot error:", e)
 
-def _append_pre_turn_screenshot(session_manager: FileSessionManager, agent: Agent, shot_path: Path) -> None:
-    """Capture and append a pre-turn screenshot to the session so the model sees it before answering."""
+def _as_float(v, d: float = 0.0) -> float:
     try:
-        # small settle to allow camera to stabilize before capture
-        time.sleep(0.3)
-        t = time.time()
-        _send_unreal_cmd({"cmd": "screenshot", "path": str(shot_path), "showUI": False})
-        if _wait_for_file(shot_path, t, timeout_s=8.0):
-            try:
-                _append_image_message_with_optional_summary(session_manager, agent, shot_path, include_summary=True)
-                print("Appended pre-turn screenshot to session.")
-            except Exception as e:
-                print("Pre-turn: failed to read/append screenshot:", e)
-        else:
-            print(f"Pre-turn: timed out waiting for screenshot at {shot_path}.")
-    except Exception as e:
-        print("Pre-turn screenshot error:", e)
+        return float(v)
+    except Exception:
+        return d
+
+def _env_state_fields(data: dict) -> dict:
+    """Project the exported world state onto the flat set of fields the turn summary uses."""
+    pos = data.get("pos") or [0.0, 0.0, 0.0]
+    tr = data.get("trace", {})
+    return {
+        "pos": [_as_float(v) for v in pos[:3]],
+        "yaw": _as_float(data.get("rot", {}).get("yaw")),
+        "speed": _as_float(data.get("speed") or 0.0),
+        "mode": data.get("move", {}).get("mode", ""),
+        "fwd_waist": _as_float(tr.get("forward", {}).get("waist")),
+        "left_waist": _as_float(tr.get("left", {}).get("waist")),
+        "right_waist": _as_float(tr.get("right", {}).get("waist")),
+        "down_dist": _as_float(tr.get("down", {}).get("dist")),
+        "blocked_forward": bool(data.get("blocked", {}).get("forward", False)),
+    }
 
+def _append_env_state_message(session_buffer: _SessionBuffer, agent: Agent, state_path: Path) -> None:
+    """Parse the exported state JSON and append a compact env state summary to the session."""
+    f = _env_state_fields(_load_json_file(state_path))
+    pos = f["pos"]
+    line1 = f"Env state: pos=({pos[0]:.1f},{pos[1]:.1f},{pos[2]:.1f}), yaw={f['yaw']:.1f}, speed={f['speed']:.1f} cm/s"
+    line2 = f"mode={f['mode']}, fwdWaist={f['fwd_waist']:.0f}cm, left={f['left_waist']:.0f}cm, right={f['right_waist']:.0f}cm, down={f['down_dist']:.0f}cm"
+    line3 = f"blockedForward={f['blocked_forward']}"
+    message = {"role": "user", "content": [{"text": line1 + "\n" + line2 + "\n" + line3}]}
+    session_buffer.append_message(message, agent)
+
+def _append_pre_turn_capture(
+    session_buffer: _SessionBuffer,
+    agent: Agent,
+    shot_path: Optional[Path],
+    state_path: Optional[Path],
+) -> None:
+    """Request env state and a screenshot back-to-back, then append each as soon as its file lands.
 
-def _append_pre_turn_state(session_manager: FileSessionManager, agent: Agent, state_path: Path) -> None:
-    """Request and append a compact env state summary before each turn."""
+    Unreal renders the screenshot while it exports state, and both file waits run concurrently,
+    so pre-turn latency is the slower of the two rather than their sum.
+    """
     try:
+        waits = {}
+        if shot_path is not None:
+            # small settle to allow camera to stabilize before capture
+            time.sleep(0.3)
         t = time.time()
-        try:
-            state_path.parent.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            pass
-        _send_unreal_cmd({"cmd": "state", "path": str(state_path)})
-        if _wait_for_file(state_path, t, timeout_s=8.0):
+        if state_path is not None:
             try:
-                data = json.loads(state_path.read_text(encoding="utf-8-sig"))
-                pos = data.get("pos", [0.0, 0.0, 0.0])
-                rot = data.get("rot", {})
-                move = data.get("move", {})
-                tr = data.get("trace", {})
-                fwd = tr.get("forward", {})
-                left = tr.get("left", {})
-                right = tr.get("right", {})
-                down = tr.get("down", {})
-                blk = data.get("blocked", {})
-                speed = float(data.get("speed", 0.0) or 0.0)
-
-                def _num(v, d=0.0):
-                    try:
-                        return float(v)
-                    except Exception:
-                        return d
-
-                line1 = f"Env state: pos=({pos[0]:.1f},{pos[1]:.1f},{pos[2]:.1f}), yaw={_num(rot.get('yaw'),0.0):.1f}, speed={speed:.1f} cm/s"
-                line2 = f"mode={move.get('mode','')}, fwdWaist={_num(fwd.get('waist'),0):.0f}cm, left={_num(left.get('waist'),0):.0f}cm, right={_num(right.get('waist'),0):.0f}cm, down={_num(down.get('dist'),0):.0f}cm"
-                line3 = f"blockedForward={bool(blk.get('forward', False))}"
-                message = {"role": "user", "content": [{"text": line1 + "\n" + line2 + "\n" + line3}]}
-                session_manager.append_message(message, agent)
-                session_manager.sync_agent(agent)
-                print("Appended pre-turn env state to session.")
-            except Exception as e:
-                print("Pre-turn: failed to read/append env state:", e)
-        else:
-            print(f"Pre-turn: timed out waiting for env state at {state_path}.")
+                state_path.parent.mkdir(parents=True, exist_ok=True)
+            except Exception:
+                pass
+            _send_unreal_cmd({"cmd": "state", "path": str(state_path)})
+            waits["env state"] = (state_path, _append_env_state_message)
+        if shot_path is not None:
+            _send_unreal_cmd({"cmd": "screenshot", "path": str(shot_path), "showUI": False})
+            waits["screenshot"] = (shot_path, _append_image_message_with_optional_summary)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = {
+                pool.submit(_wait_for_file, path, t, 8.0): (label, path, append)
+                for label, (path, append) in waits.items()
+            }
+            for fut in as_completed(futures):
+                label, path, append = futures[fut]
+                if not fut.result():
+                    print(f"Pre-turn: timed out waiting for {label} at {path}.")
+                    continue
+                try:
+                    append(session_buffer, agent, path)
+                    print(f"Appended pre-turn {label} to session.")
+                except Exception as e:
+                    print(f"Pre-turn: failed to read/append {label}:", e)
     except Exception as e:
-        print("Pre-turn env state error:", e)
+        print("Pre-turn capture error:", e)
 
-class PreTurnSenseHook(HookProvider):
-    def __init__(self, session_manager: FileSessionManager, state_path: Path):
-        self.session_manager = session_manager
+# Hooks satisfy strands' HookProvider protocol structurally (register_hooks), so they don't need
+# the strands import at module load.
+class PreTurnCaptureHook:
+    def __init__(self, session_buffer: _SessionBuffer, shot_path: Optional[Path], state_path: Optional[Path]):
+        self.session_buffer = session_buffer
+        self.shot_path = shot_path
         self.state_path = state_path
 
     def register_hooks(self, registry, **kwargs):
-        # Capture and append env state before each agent invocation
+        # Capture and append env state and/or a screenshot before each agent invocation
+        # Bind state once so each event only does local lookups
+        sm, shot, state, fn = self.session_buffer, self.shot_path, self.state_path, _append_pre_turn_capture
         registry.add_callback(
             BeforeInvocationEvent,
-            lambda event: _append_pre_turn_state(self.session_manager, event.agent, self.state_path),
+            lambda event: fn(sm, event.agent, shot, state),
         )
 
-class PostTurnScreenshotHook(HookProvider):
-    def __init__(self, session_manager: FileSessionManager, shot_path: Path):
-        self.session_manager = session_manager
+class PostTurnScreenshotHook:
+    def __init__(self, session_buffer: _SessionBuffer, shot_path: Path, inline: bool = False):
+        self.session_buffer = session_buffer
         self.shot_path = shot_path
+        self.inline = inline
 
     def register_hooks(self, registry, **kwargs):
-        # Append a screenshot at the end of every agent invocation (turn)
-        registry.add_callback(
-            AfterInvocationEvent,
-            lambda event: _append_post_turn_screenshot(self.session_manager, event.agent, self.shot_path),
-        )
+        # Append a screenshot at the end of every agent invocation (turn), then write it out.
+        # Flushing here rather than in a separate hook: After* callbacks run in reverse registration order.
+        sm, shot, inline, fn = self.session_buffer, self.shot_path, self.inline, _append_post_turn_screenshot
 
-class PreTurnScreenshotHook(HookProvider):
-    def __init__(self, session_manager: FileSessionManager, shot_path: Path):
-        self.session_manager = session_manager
-        self.shot_path = shot_path
+        def _after(event):
+            fn(sm, event.agent, shot, inline)
+            sm.flush(event.agent)
 
-    def register_hooks(self, registry, **kwargs):
-        # Capture and append a screenshot before each agent invocation
-        registry.add_callback(
-            BeforeInvocationEvent,
-            lambda event: _append_pre_turn_screenshot(self.session_manager, event.agent, self.shot_path),
-        )
+        registry.add_callback(AfterInvocationEvent, _after)
 
-def main():
-    import argparse
-    from datetime import datetime, timezone
+class SessionFlushHook:
+    def __init__(self, session_buffer: _SessionBuffer):
+        self.session_buffer = session_buffer
 
-    # Parse CLI arguments
-    parser = argparse.ArgumentParser(description="Run Strands Agent against local MCP server and Unreal.")
-    parser.add_argument("--prompt", required=True, help="User command/prompt for the agent.")
-    parser.add_argument("--session-id", default=None, help="Optional session id to reuse for persistence.")
-    parser.add_argument("--mcp-url", default=os.environ.get("MCP_URL", "http://localhost:8000/mcp"), help="MCP server URL.")
-    parser.add_argument("--no-pre-shot", action="store_true", help="Disable pre-turn screenshot hook.")
-    parser.add_argument("--no-post-shot", action="store_true", help="Disable post-turn screenshot hook.")
-    parser.add_argument("--no-pre-sense", action="store_true", help="Disable pre-turn environment state hook.")
-    parser.add_argument("--result-json", default=None, help="Optional path to write a JSON summary result.")
-    args = parser.parse_args()
+    def register_hooks(self, registry, **kwargs):
+        # Register last so everything the pre-turn hooks queued is written right before the model call
+        sm = self.session_buffer
+        registry.add_callback(BeforeInvocationEvent, lambda event: sm.flush(event.agent))
+
+def run_once(
+    prompt: str,
+    session_id: Optional[str] = None,
+    mcp_url: Optional[str] = None,
+    result_json: Optional[str] = None,
+    *,
+    include_pre_shot: bool = True,
+    include_post_shot: bool = True,
+    include_pre_sense: bool = True,
+    inline_post_shot: bool = False,
+) -> dict:
+    """Run one agent invocation and return its JSON summary (also written to result_json if given).
+
+    Module state (Unreal connection, summary pool, Bedrock clients) is reused across calls, so a
+    long-lived worker process can call this once per job.
+    """
+    from datetime import datetime, timezone
 
-    include_pre_shot = not args.no_pre_shot
-    include_post_shot = not args.no_post_shot
-    include_pre_sense = not args.no_pre_sense
+    _lazy_imports()
+    mcp_url = mcp_url or os.environ.get("MCP_URL", "http://localhost:8000/mcp")
 
     start_ts = datetime.now(timezone.utc)
 
     # Client configured for Streamable HTTP (SSE) MCP server
-    streamable_http_mcp_client = MCPClient(lambda: streamablehttp_client(args.mcp_url))
+    streamable_http_mcp_client = MCPClient(lambda: _mcp_transport(mcp_url))
 
     success = True
     err_msg = None
-    user_command = args.prompt
-    session_id = None
+    user_command = prompt
     shot_path = None
+    session_buffer = None
 
     # Create an agent with MCP tools
     with streamable_http_mcp_client:
@@ -352,8 +872,9 @@ def main():
         shot_path = saved_dir / "AutoScreenshot.png"
         state_path = saved_dir / "WorldState" / "agent_state.json"
 
-        session_id = args.session_id or f"session-{int(time.time())}"
-        session_manager = FileSessionManager(session_id=session_id)
+        session_id = session_id or f"session-{int(time.time())}"
+        session_manager = _FileSessionManager(session_id=session_id)
+        session_buffer = _SessionBuffer(session_manager)
         system_prompt = (
             "You control a character in Unreal. Always review the env state and latest scene image "
             "before taking any actions. Keep actions safe and reversible. "
@@ -365,14 +886,17 @@ def main():
         )
 
         hooks = []
-        if include_pre_sense:
-            hooks.append(PreTurnSenseHook(session_manager, state_path))
-        if include_pre_shot:
-            hooks.append(PreTurnScreenshotHook(session_manager, shot_path))
+        if include_pre_sense or include_pre_shot:
+            hooks.append(PreTurnCaptureHook(
+                session_buffer,
+                shot_path if include_pre_shot else None,
+                state_path if include_pre_sense else None,
+            ))
         if include_post_shot:
-            hooks.append(PostTurnScreenshotHook(session_manager, shot_path))
+            hooks.append(PostTurnScreenshotHook(session_buffer, shot_path, inline=inline_post_shot))
+        hooks.append(SessionFlushHook(session_buffer))
 
-        agent = Agent(
+        agent = _Agent(
             tools=filtered_tools,
             session_manager=session_manager,
             system_prompt=system_prompt,
@@ -387,13 +911,23 @@ def main():
             success = False
             err_msg = f"{type(e).__name__}: {e}"
 
+    # Hooks are done; let in-flight scene summaries land in the session, then release the Unreal connection
+    _drain_summaries()
+    if session_buffer is not None:
+        try:
+            session_buffer.flush()
+        except Exception as e:
+            print("Failed to flush session messages:", e)
+    _UnrealConn.close()
+
     # Emit a compact JSON summary to stdout (and optionally to a file)
     finish_ts = datetime.now(timezone.utc)
     summary = {
+        "_schema": "v1",  # complete summary; the orchestrator uses it as-is
         "status": "ok" if success else "error",
         "sessionId": session_id or "",
         "prompt": user_command,
-        "mcpUrl": args.mcp_url,
+        "mcpUrl": mcp_url,
         "startedAt": start_ts.isoformat(),
         "finishedAt": finish_ts.isoformat(),
         "hooks": {
@@ -409,19 +943,47 @@ def main():
         summary["error"] = err_msg
 
     try:
-        print(json.dumps(summary, separators=(",", ":")))
+        print(_json_line(summary).decode("utf-8"), end="")
     except Exception:
         pass
 
-    if args.result_json:
+    if result_json:
         try:
-            p = Path(args.result_json)
+            p = Path(result_json)
             p.parent.mkdir(parents=True, exist_ok=True)
             p.write_text(json.dumps(summary, indent=2), encoding="utf-8")
         except Exception:
             pass
 
-    sys.exit(0 if success else 1)
+    return summary
+
+def main():
+    import argparse
+
+    # Parse CLI arguments
+    parser = argparse.ArgumentParser(description="Run Strands Agent against local MCP server and Unreal.")
+    parser.add_argument("--prompt", required=True, help="User command/prompt for the agent.")
+    parser.add_argument("--session-id", default=None, help="Optional session id to reuse for persistence.")
+    parser.add_argument("--mcp-url", default=os.environ.get("MCP_URL", "http://localhost:8000/mcp"), help="MCP server URL.")
+    parser.add_argument("--no-pre-shot", action="store_true", help="Disable pre-turn screenshot hook.")
+    parser.add_argument("--no-post-shot", action="store_true", help="Disable post-turn screenshot hook.")
+    parser.add_argument("--no-pre-sense", action="store_true", help="Disable pre-turn environment state hook.")
+    parser.add_argument("--inline-post-shot", action="store_true",
+                        help="Read the post-turn screenshot back over the command socket (needs a StrandsInputServer build with screenshot_inline).")
+    parser.add_argument("--result-json", default=None, help="Optional path to write a JSON summary result.")
+    args = parser.parse_args()
+
+    summary = run_once(
+        args.prompt,
+        session_id=args.session_id,
+        mcp_url=args.mcp_url,
+        result_json=args.result_json,
+        include_pre_shot=not args.no_pre_shot,
+        include_post_shot=not args.no_post_shot,
+        include_pre_sense=not args.no_pre_sense,
+        inline_post_shot=args.inline_post_shot,
+    )
+    sys.exit(0 if summary["status"] == "ok" else 1)
 
 
 if __name__ == "__main__":
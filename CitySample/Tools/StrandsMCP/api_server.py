@@ -6,19 +6,27 @@ Provides REST API and WebSocket streaming for CloudFront frontend integration
 
 import os
 import sys
+import site
 import json
 import uuid
 import asyncio
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
 from dataclasses import asdict
 
-# Add Python path for UE dependencies
+# Add Python path for UE dependencies: prepended so these win over the embedded interpreter's
+# own packages, then .pth files processed (addsitedir won't re-add a path already present)
 _project_root = Path(__file__).resolve().parents[2]
 _site = _project_root / "Intermediate" / "PipInstall" / "Lib" / "site-packages"
-if str(_site) not in sys.path:
+if _site.is_dir() and str(_site) not in sys.path:
     sys.path.insert(0, str(_site))
+    site.addsitedir(str(_site))
 
 try:
     from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
@@ -29,15 +37,69 @@ try:
 except ImportError:
     print("FastAPI not found. Installing...")
     import subprocess
-    subprocess.run([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn", "websockets"])
+    # uvicorn[standard] brings httptools and, off Windows, uvloop
+    subprocess.run([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn[standard]", "websockets"])
     from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.responses import JSONResponse
     from pydantic import BaseModel
     import uvicorn
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+# Errors that mean a WebSocket client has gone away (Starlette raises RuntimeError when sending
+# on a closed socket; uvicorn surfaces transport loss as websockets' ConnectionClosed or OSError)
+try:
+    from websockets.exceptions import ConnectionClosed
+    _WS_SEND_ERRORS = (WebSocketDisconnect, ConnectionClosed, RuntimeError, OSError)
+except ImportError:
+    _WS_SEND_ERRORS = (WebSocketDisconnect, RuntimeError, OSError)
+
 from turn_based_agent import TurnBasedAgent
 
+def _dumps(obj: Any) -> str:
+    """Compact JSON for WebSocket frames; orjson when installed.
+
+    Frames stay text because the frontend JSON.parse()s event.data.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+# Cap on threads used for blocking agent calls made from request handlers
+API_EXECUTOR_WORKERS = 8
+
+def _zframe(text: str) -> bytes:
+    """Binary frame for clients connected with ?compress=zlib (they inflate it, e.g. pako.inflate)"""
+    return zlib.compress(text.encode("utf-8"), 1)
+
+# Static frames, built once
+_PONG = _dumps({"type": "pong"})
+_PONG_ZLIB = _zframe(_PONG)
+
+# Outbound frames buffered per WebSocket client; a client that falls this far behind misses updates
+CLIENT_QUEUE_SIZE = 64
+
+# Seconds between status_update pushes to each WebSocket client
+STATUS_PUSH_INTERVAL = 5.0
+
+# UTC ISO timestamp refreshed by a background ticker, so broadcasts and responses don't each
+# build and format a datetime
+_ts_cache = {"iso": "", "t": 0.0}
+
+def _now_iso() -> str:
+    return _ts_cache["iso"] or datetime.now(timezone.utc).isoformat()
+
+async def _ts_ticker():
+    while True:
+        now = datetime.now(timezone.utc)
+        _ts_cache["iso"] = now.isoformat()
+        _ts_cache["t"] = now.timestamp()
+        await asyncio.sleep(0.25)
+
 # Pydantic models for API requests
 class TurnRequest(BaseModel):
     prompt: str
@@ -55,37 +117,88 @@ class PersonaTraits(BaseModel):
 class AgentManager:
     def __init__(self):
         self.active_agents: Dict[str, TurnBasedAgent] = {}
-        self.websocket_connections: List[WebSocket] = []
+        # WebSocket clients -> (outbound queue, wants zlib frames), keyed by the session they
+        # subscribed to, and the agent that owns each turn
+        self.ws_by_session: Dict[str, Dict[WebSocket, Tuple[asyncio.Queue, bool]]] = defaultdict(dict)
+        self.turn_to_agent: Dict[str, TurnBasedAgent] = {}
+        # start_turn runs on executor threads; don't create two agents for one new session
+        self._agents_lock = threading.Lock()
+        # Keeps turn_to_agent in step with each agent's turns_history (entries leave with evicted turns)
+        self._turns_lock = threading.Lock()
     
     def get_or_create_agent(self, session_id: str, s3_bucket: Optional[str] = None) -> TurnBasedAgent:
         """Get existing agent or create new one"""
-        if session_id not in self.active_agents:
-            self.active_agents[session_id] = TurnBasedAgent(
-                session_id=session_id,
-                s3_bucket=s3_bucket or os.getenv("STRANDS_S3_BUCKET")
-            )
-        return self.active_agents[session_id]
+        with self._agents_lock:
+            if session_id not in self.active_agents:
+                self.active_agents[session_id] = TurnBasedAgent(
+                    session_id=session_id,
+                    s3_bucket=s3_bucket or os.getenv("STRANDS_S3_BUCKET")
+                )
+            return self.active_agents[session_id]
+    
+    def start_turn(self, session_id: str, prompt: str, persona_traits: Optional[Dict] = None,
+                   s3_bucket: Optional[str] = None) -> str:
+        """Create the session's agent if needed and start a turn (blocking; run off the event loop)"""
+        agent = self.get_or_create_agent(session_id, s3_bucket)
+        with self._turns_lock:
+            history = agent.turns_history
+            evicted = history[0].turn_id if len(history) == history.maxlen else None
+            turn_id = agent.start_turn(prompt, persona_traits)
+            if evicted is not None:
+                self.turn_to_agent.pop(evicted, None)
+            self.turn_to_agent[turn_id] = agent
+        return turn_id
     
     async def broadcast_update(self, session_id: str, update_data: Dict):
-        """Broadcast update to all connected WebSocket clients"""
+        """Broadcast update to the WebSocket clients subscribed to session_id"""
         message = {
             "type": "turn_update",
             "session_id": session_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": _now_iso(),
             "data": update_data
         }
         
-        disconnected = []
-        for websocket in self.websocket_connections:
+        # Serialize (and compress) once and hand the same frame to each client's queue; the per-client
+        # drainer does the actual send, so a slow client never holds up the broadcaster or the others
+        payload = _dumps(message)
+        blob = None
+        for websocket, (out_q, compress) in list(self.ws_by_session.get(session_id, {}).items()):
+            if compress and blob is None:
+                blob = _zframe(payload)
             try:
-                await websocket.send_text(json.dumps(message))
-            except:
-                disconnected.append(websocket)
-        
-        # Remove disconnected clients
-        for ws in disconnected:
-            if ws in self.websocket_connections:
-                self.websocket_connections.remove(ws)
+                out_q.put_nowait(blob if compress else payload)
+            except asyncio.QueueFull:
+                print(f"WebSocket client for {session_id} is {CLIENT_QUEUE_SIZE} frames behind; dropping update")
+
+async def _drain_outbound(websocket: WebSocket, out_q: asyncio.Queue):
+    """Sole sender for one WebSocket client: writes its queued frames in order"""
+    try:
+        while True:
+            frame = await out_q.get()
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+    except _WS_SEND_ERRORS:
+        pass  # Client gone; the endpoint's receive loop sees the disconnect and cleans up
+
+async def _push_status(session_id: str, out_q: asyncio.Queue, frame):
+    """Periodically queue the session's turn status while a turn is running or just completed"""
+    while True:
+        await asyncio.sleep(STATUS_PUSH_INTERVAL)
+        agent = agent_manager.active_agents.get(session_id)
+        if not agent:
+            continue
+        status = agent.get_current_turn_status()
+        if status and status.get("status") in ["running", "completed"]:
+            try:
+                out_q.put_nowait(frame(_dumps({
+                    "type": "status_update",
+                    "session_id": session_id,
+                    "data": status
+                })))
+            except asyncio.QueueFull:
+                pass  # Client is behind; the next push carries fresher status anyway
 
 # Create FastAPI app
 app = FastAPI(
@@ -112,7 +225,7 @@ async def root():
     return {
         "service": "Strands Turn-Based Agent API",
         "status": "running",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": _now_iso(),
         "active_sessions": len(agent_manager.active_agents)
     }
 
@@ -122,18 +235,18 @@ async def start_turn(request: TurnRequest):
     try:
         session_id = request.session_id or f"session-{int(datetime.now().timestamp())}"
         
-        # Get or create agent
-        agent = agent_manager.get_or_create_agent(session_id, request.s3_bucket)
-        
-        # Start the turn
-        turn_id = agent.start_turn(request.prompt, request.persona_traits)
+        # Get or create agent and start the turn; agent setup (S3 client etc.) blocks, so keep it off the loop
+        turn_id = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(agent_manager.start_turn, session_id, request.prompt, request.persona_traits, request.s3_bucket)
+        )
         
         response = {
             "success": True,
             "turn_id": turn_id,
             "session_id": session_id,
             "status": "started",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _now_iso()
         }
         
         # Broadcast to WebSocket clients
@@ -149,17 +262,12 @@ async def get_turn_status(turn_id: str, session_id: Optional[str] = None):
     """Get the status of a specific turn"""
     try:
         # Find the agent with this turn
-        target_agent = None
-        for agent in agent_manager.active_agents.values():
-            status = agent.get_turn_status(turn_id)
-            if status:
-                target_agent = agent
-                break
+        target_agent = agent_manager.turn_to_agent.get(turn_id)
+        status = target_agent.get_turn_status(turn_id) if target_agent else None
         
-        if not target_agent:
+        if not status:
             raise HTTPException(status_code=404, detail="Turn not found")
         
-        status = target_agent.get_turn_status(turn_id)
         return status
         
     except HTTPException:
@@ -181,7 +289,7 @@ async def get_session_status(session_id: str):
             "session_id": session_id,
             "status": "active",
             "current_turn": current_turn,
-            "total_turns": len(agent.turns_history)
+            "total_turns": agent.turn_count
         }
         
     except Exception as e:
@@ -240,8 +348,10 @@ async def interact_with_agent(request: Dict[str, Any]):
             }
         
         # Start turn
-        agent = agent_manager.get_or_create_agent(session_id)
-        turn_id = agent.start_turn(prompt, persona_traits)
+        turn_id = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(agent_manager.start_turn, session_id, prompt, persona_traits)
+        )
         
         response = {
             "success": True,
@@ -261,9 +371,18 @@ async def interact_with_agent(request: Dict[str, Any]):
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for real-time turn updates"""
+    """WebSocket endpoint for real-time turn updates
+    
+    Connect with ?compress=zlib to receive every frame as zlib-compressed JSON in a binary message.
+    """
     await websocket.accept()
-    agent_manager.websocket_connections.append(websocket)
+    compress = websocket.query_params.get("compress") == "zlib"
+    frame = _zframe if compress else (lambda text: text)
+    pong = _PONG_ZLIB if compress else _PONG
+    out_q: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    sender = asyncio.create_task(_drain_outbound(websocket, out_q))
+    pusher = asyncio.create_task(_push_status(session_id, out_q, frame))
+    agent_manager.ws_by_session[session_id][websocket] = (out_q, compress)
     
     try:
         # Send initial session state
@@ -271,52 +390,55 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             agent = agent_manager.active_agents[session_id]
             current_status = agent.get_current_turn_status()
             if current_status:
-                await websocket.send_text(json.dumps({
+                await out_q.put(frame(_dumps({
                     "type": "session_state",
                     "session_id": session_id,
                     "data": current_status
-                }))
+                })))
         
-        # Keep connection alive and handle messages
+        # Keep connection alive and handle messages; periodic status comes from the pusher task
         while True:
-            try:
-                # Wait for messages from client
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                
-                # Handle client messages (ping, status requests, etc.)
-                if message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-                elif message.get("type") == "get_status":
-                    if session_id in agent_manager.active_agents:
-                        agent = agent_manager.active_agents[session_id]
-                        status = agent.get_current_turn_status()
-                        await websocket.send_text(json.dumps({
-                            "type": "status_response",
-                            "data": status
-                        }))
-                
-            except asyncio.TimeoutError:
-                # Send periodic status updates
+            # Wait for messages from client
+            data = await websocket.receive_text()
+            message = orjson.loads(data) if orjson is not None else json.loads(data)
+            
+            # Handle client messages (ping, status requests, etc.)
+            if message.get("type") == "ping":
+                await out_q.put(pong)
+            elif message.get("type") == "get_status":
                 if session_id in agent_manager.active_agents:
                     agent = agent_manager.active_agents[session_id]
                     status = agent.get_current_turn_status()
-                    if status and status.get("status") in ["running", "completed"]:
-                        await websocket.send_text(json.dumps({
-                            "type": "status_update",
-                            "session_id": session_id,
-                            "data": status
-                        }))
+                    await out_q.put(frame(_dumps({
+                        "type": "status_response",
+                        "data": status
+                    })))
                 
     except WebSocketDisconnect:
         pass
     finally:
-        if websocket in agent_manager.websocket_connections:
-            agent_manager.websocket_connections.remove(websocket)
+        subscribers = agent_manager.ws_by_session.get(session_id)
+        if subscribers is not None:
+            subscribers.pop(websocket, None)
+            if not subscribers:
+                del agent_manager.ws_by_session[session_id]
+        pusher.cancel()
+        sender.cancel()
+
+@app.on_event("startup")
+async def startup_event():
+    """Bound the default executor used for blocking agent calls"""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=API_EXECUTOR_WORKERS, thread_name_prefix="api-agent")
+    )
+    app.state.ts_ticker = asyncio.create_task(_ts_ticker())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    ticker = getattr(app.state, "ts_ticker", None)
+    if ticker:
+        ticker.cancel()
     for agent in agent_manager.active_agents.values():
         agent.cleanup()
 
@@ -328,6 +450,7 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8001, help="Port to bind to")
     parser.add_argument("--s3-bucket", help="Default S3 bucket for outputs")
+    parser.add_argument("--dev", action="store_true", help="Development mode: auto-reload on code changes")
     
     args = parser.parse_args()
     
@@ -339,10 +462,22 @@ if __name__ == "__main__":
     if args.s3_bucket:
         print(f"Using S3 bucket: {args.s3_bucket}")
     
-    uvicorn.run(
-        "api_server:app", 
-        host=args.host, 
-        port=args.port, 
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    if args.dev:
+        uvicorn.run(
+            "api_server:app", 
+            host=args.host, 
+            port=args.port, 
+            reload=True,
+            log_level="info"
+        )
+    else:
+        # No reloader/file watcher; "auto" picks uvloop and httptools when installed
+        # (uvloop isn't available on Windows, where this falls back to asyncio)
+        uvicorn.run(
+            app,
+            host=args.host,
+            port=args.port,
+            loop="auto",
+            http="auto",
+            log_level="info"
+        )
\ No newline at end of file
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import os
 import json
 import anyio
 import logging
@@ -6,10 +7,12 @@ import traceback
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.session import ClientSession
 
-# Enable detailed logging to diagnose client/server exchange
-logging.basicConfig(level=logging.DEBUG)
+# Set MCP_DEBUG=1 for detailed logging of the client/server exchange; off by default so the
+# formatting cost doesn't skew call timings
+_LOG_LEVEL = logging.DEBUG if os.environ.get("MCP_DEBUG") else logging.WARNING
+logging.basicConfig(level=_LOG_LEVEL)
 for name in ["mcp", "mcp.client", "httpx", "anyio"]:
-    logging.getLogger(name).setLevel(logging.DEBUG)
+    logging.getLogger(name).setLevel(_LOG_LEVEL)
 
 
 async def main():
@@ -3,19 +3,41 @@ import os
 import json
 import uuid
 import base64
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import boto3
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 SQS_QUEUE_URL = os.environ.get("SQS_QUEUE_URL", "")
 MESSAGE_GROUP_ID = os.environ.get("MESSAGE_GROUP_ID", "agent-1")  # FIFO queue group for sequential processing
+_DEFAULT_GROUP_ID = MESSAGE_GROUP_ID or "agent-1"
+
+# Bulk submits: SQS takes at most 10 entries per send_message_batch call
+SQS_BATCH_SIZE = 10
+MAX_BATCH_PROMPTS = 100
+_SHARED_FIELDS = ("sessionId", "options", "resultBucket", "resultKeyPrefix")
+
+_STATIC_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+}
 
 sqs = boto3.client("sqs")
 
 
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def _parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
     body = event.get("body", "")
-    if not isinstance(body, str):
+    if not body or not isinstance(body, str):
         return {}
     if event.get("isBase64Encoded"):
         try:
@@ -23,7 +45,7 @@ def _parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
         except Exception:
             return {}
     try:
-        return json.loads(body)
+        return orjson.loads(body) if orjson is not None else json.loads(body)
     except Exception:
         return {}
 
@@ -31,46 +53,28 @@ def _parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
 def _response(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
+        "headers": _STATIC_HEADERS,
+        "body": _dumps(body),
     }
 
 
-def lambda_handler(event, context):
-    # HTTP API (APIGW v2) compatibility
-    method = (event.get("requestContext", {}).get("http", {}) or {}).get("method", "POST")
-    if method != "POST":
-        return _response(405, {"error": "method_not_allowed", "detail": f"{method} not supported, use POST"})
-
-    if not SQS_QUEUE_URL:
-        return _response(500, {"error": "config_error", "detail": "SQS_QUEUE_URL is not configured"})
-
-    body = _parse_event_body(event)
-    if not body:
-        return _response(400, {"error": "invalid_json"})
-
+def _build_message(fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Message payload for the local orchestrator, or None when the prompt is missing"""
     # Required: prompt
-    prompt = str(body.get("prompt") or "").strip()
+    prompt = str(fields.get("prompt") or "").strip()
     if not prompt:
-        return _response(400, {"error": "missing_field", "field": "prompt"})
+        return None
 
     # Optional
-    request_id = str(body.get("requestId") or str(uuid.uuid4()))
-    session_id = body.get("sessionId")
-    options = body.get("options") if isinstance(body.get("options"), dict) else None
-    result_bucket = body.get("resultBucket")
-    result_prefix = body.get("resultKeyPrefix")
-    group_id = str(body.get("groupId") or MESSAGE_GROUP_ID or "agent-1")
-
-    # Build message payload for the local orchestrator
     msg: Dict[str, Any] = {
         "type": "invoke-agent",
         "prompt": prompt,
-        "requestId": request_id,
+        "requestId": str(fields.get("requestId") or str(uuid.uuid4())),
     }
+    session_id = fields.get("sessionId")
+    options = fields.get("options") if isinstance(fields.get("options"), dict) else None
+    result_bucket = fields.get("resultBucket")
+    result_prefix = fields.get("resultKeyPrefix")
     if session_id:
         msg["sessionId"] = session_id
     if options:
@@ -79,11 +83,96 @@ def lambda_handler(event, context):
         msg["resultBucket"] = result_bucket
     if result_prefix:
         msg["resultKeyPrefix"] = result_prefix
+    return msg
+
+
+def _send_batch(msgs: List[Dict[str, Any]], group_id: str) -> Dict[str, Any]:
+    """Queue several messages with send_message_batch (10 per call), in order, one group"""
+    results: List[Dict[str, Any]] = [{"requestId": m["requestId"]} for m in msgs]
+    for start in range(0, len(msgs), SQS_BATCH_SIZE):
+        chunk = msgs[start:start + SQS_BATCH_SIZE]
+        try:
+            resp = sqs.send_message_batch(
+                QueueUrl=SQS_QUEUE_URL,
+                Entries=[
+                    {
+                        "Id": str(start + i),
+                        "MessageBody": _dumps(m),
+                        "MessageGroupId": group_id,
+                        "MessageDeduplicationId": m["requestId"],  # ensure idempotency on FIFO queues
+                    }
+                    for i, m in enumerate(chunk)
+                ],
+            )
+        except Exception as e:
+            for i in range(start, start + len(chunk)):
+                results[i]["error"] = f"{type(e).__name__}: {e}"
+            continue
+        for ok in resp.get("Successful", []):
+            results[int(ok["Id"])]["sqsMessageId"] = ok.get("MessageId")
+        for err in resp.get("Failed", []):
+            results[int(err["Id"])]["error"] = f"{err.get('Code')}: {err.get('Message')}"
+
+    failed = sum(1 for r in results if "error" in r)
+    if not failed:
+        status, label = 202, "queued"
+    elif failed < len(results):
+        status, label = 207, "partial"
+    else:
+        status, label = 500, "failed"
+    return _response(
+        status,
+        {
+            "status": label,
+            "groupId": group_id,
+            "queued": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        },
+    )
+
+
+def lambda_handler(event, context):
+    # HTTP API (APIGW v2) compatibility
+    method = (event.get("requestContext", {}).get("http", {}) or {}).get("method", "POST")
+    if method != "POST":
+        return _response(405, {"error": "method_not_allowed", "detail": f"{method} not supported, use POST"})
+
+    if not SQS_QUEUE_URL:
+        return _response(500, {"error": "config_error", "detail": "SQS_QUEUE_URL is not configured"})
+
+    body = _parse_event_body(event)
+    if not body:
+        return _response(400, {"error": "invalid_json"})
+
+    group_id = str(body.get("groupId") or _DEFAULT_GROUP_ID)
+
+    # Bulk submit: "prompts" is a list of prompt strings or objects with the single-request
+    # fields; sessionId/options/resultBucket/resultKeyPrefix at the top level apply to all
+    prompts = body.get("prompts")
+    if isinstance(prompts, list):
+        if not prompts or len(prompts) > MAX_BATCH_PROMPTS:
+            return _response(400, {"error": "invalid_field", "field": "prompts",
+                                   "detail": f"expected 1..{MAX_BATCH_PROMPTS} prompts"})
+        shared = {k: body[k] for k in _SHARED_FIELDS if k in body}
+        msgs = []
+        for i, item in enumerate(prompts):
+            fields = {**shared, **item} if isinstance(item, dict) else {**shared, "prompt": item}
+            msg = _build_message(fields)
+            if msg is None:
+                return _response(400, {"error": "missing_field", "field": f"prompts[{i}].prompt"})
+            msgs.append(msg)
+        return _send_batch(msgs, group_id)
+
+    msg = _build_message(body)
+    if msg is None:
+        return _response(400, {"error": "missing_field", "field": "prompt"})
+    request_id = msg["requestId"]
 
     try:
         resp = sqs.send_message(
             QueueUrl=SQS_QUEUE_URL,
-            MessageBody=json.dumps(msg, separators=(",", ":")),
+            MessageBody=_dumps(msg),
             MessageGroupId=group_id,
             MessageDeduplicationId=request_id,  # ensure idempotency on FIFO queues
         )
@@ -7,19 +7,49 @@ Runs multiple persona agents in an endless loop, simulating ongoing AI lives in
 import os
 import sys
 import json
+import atexit
 import time
 import random
+import signal
 import subprocess
+import multiprocessing
 import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Project paths
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 TOOLS_DIR = Path(__file__).resolve().parent
 PERSONA_SCRIPT = TOOLS_DIR / "persona_agent.py"
 
+# OBS dashboard layout; filled in by ConsciousnessManager.update_dashboard
+_DASH_TEMPLATE = """
+╔══════════════════════════════════════════════════════════════╗
+║                 UNREAL AI CONSCIOUSNESS SYSTEM                ║
+╠══════════════════════════════════════════════════════════════╣
+║ Status: ACTIVE                                                ║
+║ Cycle: #{cycle}                                   ║
+║ Time: {timestamp}                                            ║
+╠══════════════════════════════════════════════════════════════╣
+║ Current Persona: {message}                                   ║
+║ Total Personas: {total_personas}                         ║
+║ Cycle Duration: {cycle_duration}s                       ║
+╚══════════════════════════════════════════════════════════════╝
+"""
+
+
+def _run_persona_in_worker(name: str, traits: Dict[str, Any], duration: int,
+                           load_state: Optional[str], use_s3: bool) -> int:
+    """Pool worker entry point: persona_agent (and strands) is imported once per worker process
+    and reused for every later cycle."""
+    if str(TOOLS_DIR) not in sys.path:
+        sys.path.insert(0, str(TOOLS_DIR))
+    import persona_agent
+    return persona_agent.run_persona_once(name, traits, duration, load_state=load_state, use_s3=use_s3)
+
 class ConsciousnessManager:
     """Manages multiple AI personas living continuously in the game world"""
     
@@ -38,27 +68,63 @@ class ConsciousnessManager:
         # Activity log
         self.activity_log = self.dashboard_dir / "activity_log.txt"
         
+        # Dashboard fields that don't change between updates
+        self._dash_static = {
+            "total_personas": len(self.personas),
+            "cycle_duration": self.cycle_duration,
+        }
+        
+        # Both files stay open for the manager's lifetime; each update is a write (+ truncate) rather
+        # than an open/truncate/close per file. O_BINARY keeps Windows from translating newlines.
+        binary = getattr(os, "O_BINARY", 0)
+        self._dash_fd = os.open(self.dashboard_file, os.O_WRONLY | os.O_CREAT | binary, 0o644)
+        self._log_fd = os.open(self.activity_log, os.O_WRONLY | os.O_CREAT | os.O_APPEND | binary, 0o644)
+        atexit.register(self.close)
+        
+        # Personas run one at a time in a long-lived worker process instead of a fresh interpreter per cycle
+        self._new_pool()
+        
+    def _new_pool(self):
+        # spawn, not fork: a forked worker would inherit the open dashboard/log descriptors
+        self.pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        # Start the worker now and note its pid, so a hung cycle can be killed with os.kill
+        self._worker_pid = self.pool.submit(os.getpid).result()
+    
+    def _reset_pool(self, kill: bool = True):
+        """Kill the worker (unless it already died) and start a fresh pool for the next cycle"""
+        if kill:
+            try:
+                os.kill(self._worker_pid, signal.SIGTERM)  # TerminateProcess on Windows
+            except OSError:
+                pass
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self._new_pool()
+    
     def update_dashboard(self, message: str):
         """Update the OBS dashboard with current status"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        dashboard_content = f"""
-╔══════════════════════════════════════════════════════════════╗
-║                 UNREAL AI CONSCIOUSNESS SYSTEM                ║
-╠══════════════════════════════════════════════════════════════╣
-║ Status: ACTIVE                                                ║
-║ Cycle: #{self.cycle_count}                                   ║
-║ Time: {timestamp}                                            ║
-╠══════════════════════════════════════════════════════════════╣
-║ Current Persona: {message}                                   ║
-║ Total Personas: {len(self.personas)}                         ║
-║ Cycle Duration: {self.cycle_duration}s                       ║
-╚══════════════════════════════════════════════════════════════╝
-"""
-        self.dashboard_file.write_text(dashboard_content, encoding='utf-8')
+        dashboard_content = _DASH_TEMPLATE.format_map({
+            "cycle": self.cycle_count,
+            "timestamp": timestamp,
+            "message": message,
+            **self._dash_static,
+        })
+        buf = dashboard_content.encode('utf-8')
+        os.lseek(self._dash_fd, 0, os.SEEK_SET)
+        os.write(self._dash_fd, buf)
+        os.ftruncate(self._dash_fd, len(buf))
         
         # Log activity
-        with open(self.activity_log, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {message}\n")
+        os.write(self._log_fd, f"[{timestamp}] {message}\n".encode('utf-8'))
+    
+    def close(self):
+        """Close the dashboard and activity log files"""
+        for fd in (self._dash_fd, self._log_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._dash_fd = self._log_fd = -1
     
     def run_persona(self, persona_config: Dict[str, Any]) -> bool:
         """Run a single persona for one cycle"""
@@ -67,36 +133,77 @@ class ConsciousnessManager:
         
         self.update_dashboard(f"{name} is awakening...")
         
-        # Build command
-        cmd = [
-            sys.executable,
-            str(PERSONA_SCRIPT),
-            "--persona", name,
-            "--traits", json.dumps(traits),
-            "--duration", str(self.cycle_duration),
-            "--use-s3"
-        ]
-        
         # Check for existing state to load
+        load_state = None
         state_dir = PROJECT_ROOT / "Saved" / "PersonaStates" / name
-        if state_dir.exists():
+        if (state_dir / "state.json").exists():
+            load_state = str(state_dir / "state.json")
+        elif state_dir.exists():
+            # Older runs left only timestamped snapshots
             state_files = sorted(state_dir.glob("state_*.json"), reverse=True)
             if state_files:
-                cmd.extend(["--load-state", str(state_files[0])])
-                self.update_dashboard(f"{name} is loading memories...")
+                load_state = str(state_files[0])
+        if load_state:
+            self.update_dashboard(f"{name} is loading memories...")
         
         # Run the persona
         try:
             self.update_dashboard(f"{name} is exploring the world...")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.cycle_duration + 30)
+            future = self.pool.submit(_run_persona_in_worker, name, traits, self.cycle_duration, load_state, True)
+            returncode = future.result(timeout=self.cycle_duration + 30)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self.update_dashboard(f"{name} completed their cycle successfully")
                 return True
             else:
-                self.update_dashboard(f"{name} encountered issues: {result.stderr[:100]}")
+                self.update_dashboard(f"{name} encountered issues (exit code {returncode})")
                 return False
                 
+        except FutureTimeoutError:
+            self._reset_pool()
+            self.update_dashboard(f"{name}'s cycle timed out - moving to next persona")
+            return False
+        except BrokenProcessPool:
+            # Worker died (crash in a native extension, etc.); run this cycle the old way
+            self._reset_pool(kill=False)
+            return self._run_persona_subprocess(name, traits, load_state)
+        except Exception as e:
+            self.update_dashboard(f"{name} error: {str(e)[:100]}")
+            return False
+    
+    def _run_persona_subprocess(self, name: str, traits: Dict[str, Any], load_state: Optional[str]) -> bool:
+        """Fallback: run one persona cycle in a separate interpreter"""
+        # Build command
+        cmd = [
+            sys.executable,
+            str(PERSONA_SCRIPT),
+            "--persona", name,
+            "--traits", json.dumps(traits),
+            "--duration", str(self.cycle_duration),
+            "--use-s3"
+        ]
+        if load_state:
+            cmd.extend(["--load-state", load_state])
+        
+        # stderr goes to a per-persona log rather than a pipe buffering the whole cycle in memory;
+        # only its tail is needed for the dashboard
+        stderr_path = self.dashboard_dir / f"{name}.stderr.log"
+        try:
+            with open(stderr_path, "a+b") as stderr_file:
+                start = stderr_file.seek(0, os.SEEK_END)
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=stderr_file,
+                                        timeout=self.cycle_duration + 30)
+                
+                if result.returncode == 0:
+                    self.update_dashboard(f"{name} completed their cycle successfully")
+                    return True
+                else:
+                    end = stderr_file.seek(0, os.SEEK_END)
+                    stderr_file.seek(max(start, end - 100))
+                    tail = stderr_file.read().decode("utf-8", errors="replace")
+                    self.update_dashboard(f"{name} encountered issues: {tail}")
+                    return False
+                
         except subprocess.TimeoutExpired:
             self.update_dashboard(f"{name}'s cycle timed out - moving to next persona")
             return False
@@ -142,6 +249,7 @@ class ConsciousnessManager:
                 time.sleep(5)  # Brief pause before retrying
         
         self.update_dashboard("System shut down gracefully")
+        self.pool.shutdown(wait=False, cancel_futures=True)
 
 
 def create_default_personas() -> List[Dict[str, Any]]:
@@ -2,7 +2,10 @@
 import os
 import sys
 import json
+import importlib
+import itertools
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 OUT = Path(__file__).with_name("strands_inspect.txt")
@@ -18,6 +21,33 @@ def add_dll_dirs():
         except Exception:
             pass
 
+def _safe_import(name):
+    """Import a submodule and describe it, or describe the import error."""
+    try:
+        mod = importlib.import_module(name)
+        return name, {
+            "ok": True,
+            "file": str(getattr(mod, "__file__", "built-in/extension")),
+            "has_Agent": hasattr(mod, "Agent"),
+            "exports_sample": ["Agent"] if hasattr(mod, "Agent") else [],
+        }
+    except Exception as e:
+        return name, {
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+def _probe_mcp_client():
+    try:
+        mcp_client = importlib.import_module("strands.tools.mcp.mcp_client")
+        return {
+            "ok": True,
+            "file": str(getattr(mcp_client, "__file__", "")),
+            "attrs": [a for a in dir(mcp_client) if not a.startswith("_")],
+        }
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
 def main():
     add_dll_dirs()
     info = {}
@@ -25,7 +55,7 @@ def main():
         import strands  # type: ignore
         info["strands_module"] = str(getattr(strands, "__file__", "built-in/extension"))
         info["has_Agent_top_level"] = hasattr(strands, "Agent")
-        info["dir_strands_sample"] = [a for a in dir(strands) if not a.startswith("_")][:200]
+        info["dir_strands_sample"] = list(itertools.islice((a for a in dir(strands) if not a.startswith("_")), 200))
     except Exception as e:
         info["strands_import_error"] = f"{type(e).__name__}: {e}"
         info["strands_traceback"] = traceback.format_exc()
@@ -40,35 +70,19 @@ def main():
         "strands.tools",
         "strands.tools.mcp",
     ]
-    info["submodules"] = {}
-    import importlib
-    for m in submods:
-        try:
-            mod = importlib.import_module(m)
-            info["submodules"][m] = {
-                "ok": True,
-                "file": str(getattr(mod, "__file__", "built-in/extension")),
-                "has_Agent": hasattr(mod, "Agent"),
-                "exports_sample": [a for a in dir(mod) if a == "Agent"],
-            }
-        except Exception as e:
-            info["submodules"][m] = {
-                "ok": False,
-                "error": f"{type(e).__name__}: {e}",
-            }
+    # The probes are independent; import them concurrently (imports release the GIL on I/O)
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        mcp_probe = ex.submit(_probe_mcp_client)
+        info["submodules"] = dict(ex.map(_safe_import, submods))
 
     # Also check exact path for MCP client module presence
-    try:
-        mcp_client = importlib.import_module("strands.tools.mcp.mcp_client")
-        info["mcp_client"] = {
-            "ok": True,
-            "file": str(getattr(mcp_client, "__file__", "")),
-            "attrs": [a for a in dir(mcp_client) if not a.startswith("_")],
-        }
-    except Exception as e:
-        info["mcp_client"] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    info["mcp_client"] = mcp_probe.result()
 
-    OUT.write_text(json.dumps(info, indent=2), encoding="utf-8")
+    try:
+        import orjson  # type: ignore
+        OUT.write_bytes(orjson.dumps(info, option=orjson.OPT_INDENT_2))
+    except ImportError:
+        OUT.write_text(json.dumps(info, indent=2), encoding="utf-8")
 
 if __name__ == "__main__":
     main()
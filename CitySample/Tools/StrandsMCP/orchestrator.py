@@ -16,42 +16,70 @@ Configuration (env or .env in the same folder):
   SQS_WAIT_TIME=20
   SQS_VISIBILITY_EXTENSION_SEC=30
   POLL_SLEEP=1.0
+  S3_PART_SIZE_MB=50
 """
 
 import os
+import re
 import sys
+import queue
+import logging
+import logging.handlers
 import json
 import time
 import signal
 import threading
+import multiprocessing
+import traceback
+import contextlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 # Project root (Tools/StrandsMCP -> MyProject)
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 TOOLS_DIR = Path(__file__).resolve().parent
 
+# KEY=value, KEY="value" or KEY='value' per line; comments and malformed lines don't match
+_DOTENV_LINE = re.compile(r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))[ \t]*\r?$""", re.M)
+_DOTENV: Dict[str, str] = {}
+
 def _load_dotenv():
-    """Minimal .env loader (no external dependency)."""
-    env_path = TOOLS_DIR / ".env"
-    if not env_path.exists():
+    """Minimal .env loader (no external dependency). Set STRANDS_SKIP_DOTENV=1 to skip it,
+    e.g. in containers that get their configuration from the environment."""
+    if os.getenv("STRANDS_SKIP_DOTENV") or _DOTENV:
         return
     try:
-        for line in env_path.read_text(encoding="utf-8").splitlines():
-            s = line.strip()
-            if not s or s.startswith("#") or "=" not in s:
-                continue
-            k, v = s.split("=", 1)
-            k = k.strip()
-            v = v.strip().strip('"').strip("'")
-            os.environ.setdefault(k, v)
-    except Exception:
-        pass
+        text = (TOOLS_DIR / ".env").read_text(encoding="utf-8")
+    except OSError:
+        return
+    for m in _DOTENV_LINE.finditer(text):
+        k, dq, sq, raw = m.groups()
+        _DOTENV[k] = dq if dq is not None else sq if sq is not None else raw
+    for k, v in _DOTENV.items():
+        os.environ.setdefault(k, v)
 
 _load_dotenv()
 
+log = logging.getLogger("orchestrator")
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so pollers and agent threads never block on stdout;
+    a single listener thread does the writes."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    # Only this module's logger feeds the queue; other loggers keep their own handling
+    log.setLevel(logging.INFO)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    log.propagate = False
+    listener = logging.handlers.QueueListener(q, handler)
+    listener.start()
+    return listener
+
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
 SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL", "").strip()
 S3_RESULTS_BUCKET = os.getenv("S3_RESULTS_BUCKET", "").strip() or None
@@ -60,6 +88,7 @@ CONCURRENCY = max(1, int(os.getenv("CONCURRENCY", "1")))
 SQS_WAIT_TIME = max(0, min(20, int(os.getenv("SQS_WAIT_TIME", "20"))))  # long poll
 SQS_VISIBILITY_EXTENSION_SEC = max(10, int(os.getenv("SQS_VISIBILITY_EXTENSION_SEC", "30")))
 POLL_SLEEP = float(os.getenv("POLL_SLEEP", "1.0"))
+S3_PART_SIZE_MB = max(5, int(os.getenv("S3_PART_SIZE_MB", "50")))  # S3 minimum part size is 5 MiB
 
 # Where to store local logs and results
 LOG_DIR = (PROJECT_ROOT / "Saved" / "Logs" / "Agent").resolve()
@@ -69,10 +98,41 @@ for p in (LOG_DIR, RESULT_DIR):
 
 AGENT_SCRIPT = (TOOLS_DIR / "agent_test.py").resolve()
 
+# agent_test defers its heavy imports (strands, mcp, boto3) to _lazy_imports(), so importing it here is cheap
+import agent_test
+
+# Up to 10 messages are received per poll; their jobs share this pool, so at most CONCURRENCY agents
+# run at once across all workers
+SQS_MAX_MESSAGES = 10
+_AGENT_POOL = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="agent-job")
+# One long-polling worker per 10 agent slots is enough to keep the pool fed
+POLLERS = -(-CONCURRENCY // SQS_MAX_MESSAGES)
+
 try:
     import boto3  # type: ignore
+    from boto3.s3.transfer import TransferConfig  # type: ignore
+    from botocore.config import Config as BotoConfig  # type: ignore
 except Exception as e:
     boto3 = None
+    TransferConfig = None
+    BotoConfig = None
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+# Multipart (in parallel parts) at S3_PART_SIZE_MB and above; artifact uploads for a job run side by side
+TRANSFER_CFG = TransferConfig(
+    multipart_threshold=S3_PART_SIZE_MB * 1024 * 1024,
+    multipart_chunksize=S3_PART_SIZE_MB * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+) if TransferConfig is not None else None
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="s3-upload")
 
 def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -81,17 +141,32 @@ def _ensure_boto3():
     if boto3 is None:
         raise RuntimeError("boto3 is required. Please install it in the environment running orchestrator.py")
 
+# One client per service, shared by all workers (boto3 clients are thread-safe); building a client
+# loads service models and starts a new connection pool, so don't do it per call
+_CLIENTS: Dict[str, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _client(service: str):
+    client = _CLIENTS.get(service)
+    if client is None:
+        _ensure_boto3()
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(service)
+            if client is None:
+                session = boto3.session.Session(region_name=AWS_REGION)
+                client = session.client(service, config=BotoConfig(max_pool_connections=50))
+                _CLIENTS[service] = client
+    return client
+
 def _sqs_client():
-    _ensure_boto3()
-    return boto3.client("sqs", region_name=AWS_REGION)
+    return _client("sqs")
 
 def _s3_client():
-    _ensure_boto3()
-    return boto3.client("s3", region_name=AWS_REGION)
+    return _client("s3")
 
 def _safe_json_loads(s: str) -> Optional[Dict[str, Any]]:
     try:
-        return json.loads(s)
+        return _loads(s)
     except Exception:
         return None
 
@@ -100,27 +175,90 @@ def _upload_file_s3(bucket: str, key: str, path: Path) -> Optional[str]:
         if not path.exists() or not path.is_file():
             return None
         s3 = _s3_client()
-        s3.upload_file(str(path), bucket, key)
+        s3.upload_file(str(path), bucket, key, Config=TRANSFER_CFG)
         return f"s3://{bucket}/{key}"
     except Exception as e:
-        print(f"[WARN] Failed to upload {path} to s3://{bucket}/{key}: {e}", flush=True)
+        log.warning(f"Failed to upload {path} to s3://{bucket}/{key}: {e}")
         return None
 
-def _extend_visibility_loop(stop_event: threading.Event, sqs, receipt_handle: str):
-    """Periodically extend SQS visibility timeout while the agent is running."""
-    try:
-        while not stop_event.wait(timeout=SQS_VISIBILITY_EXTENSION_SEC / 2):
+# Receipt handles of every in-flight message -> when it was received; one heartbeat thread keeps
+# them all invisible until they are handled (waiting for a pool slot, running, or awaiting deletion)
+_VIS_REGISTRY: Dict[str, float] = {}
+_VIS_LOCK = threading.Lock()
+
+def _track_visibility(receipt_handles: List[str]):
+    now = time.time()
+    with _VIS_LOCK:
+        for r in receipt_handles:
+            _VIS_REGISTRY[r] = now
+
+def _untrack_visibility(receipt_handles: List[str]):
+    with _VIS_LOCK:
+        for r in receipt_handles:
+            _VIS_REGISTRY.pop(r, None)
+
+def _visibility_heartbeat(stop_event: threading.Event):
+    """Every half extension period, extend visibility of all tracked messages, 10 per batch call."""
+    while not stop_event.wait(timeout=SQS_VISIBILITY_EXTENSION_SEC / 2):
+        with _VIS_LOCK:
+            handles = list(_VIS_REGISTRY)
+        if not handles:
+            continue
+        try:
+            sqs = _sqs_client()
+        except Exception as e:
+            log.warning(f"Visibility heartbeat has no SQS client: {e}")
+            continue
+        for i in range(0, len(handles), SQS_MAX_MESSAGES):
+            entries = [
+                {"Id": str(j), "ReceiptHandle": r, "VisibilityTimeout": SQS_VISIBILITY_EXTENSION_SEC}
+                for j, r in enumerate(handles[i:i + SQS_MAX_MESSAGES])
+            ]
             try:
-                sqs.change_message_visibility(
-                    QueueUrl=SQS_QUEUE_URL,
-                    ReceiptHandle=receipt_handle,
-                    VisibilityTimeout=SQS_VISIBILITY_EXTENSION_SEC,
-                )
-                # print("[DEBUG] Extended message visibility", flush=True)
+                resp = sqs.change_message_visibility_batch(QueueUrl=SQS_QUEUE_URL, Entries=entries)
+                if resp.get("Failed"):
+                    log.warning(f"change_message_visibility_batch failed for: {resp['Failed']}")
             except Exception as e:
-                print(f"[WARN] change_message_visibility failed: {e}", flush=True)
-    except Exception:
-        pass
+                log.warning(f"change_message_visibility_batch failed: {e}")
+
+def _agent_flags(options: Optional[Dict[str, Any]]) -> Dict[str, bool]:
+    """Map request options to agent_test.run_once hook switches."""
+    options = options if isinstance(options, dict) else {}
+    return {
+        "include_pre_shot": options.get("includePreScreenshot") is not False,
+        "include_post_shot": options.get("includePostScreenshot") is not False,
+        "include_pre_sense": options.get("includePreSense") is not False,
+    }
+
+def _agent_summary(ret: int, prompt: str, session_id: Optional[str], request_id: str, mcp_url: str,
+                   log_path: Path, result_json_path: Path, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if data is None:
+        try:
+            data = _loads(result_json_path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            data = {"parseError": f"{type(e).__name__}: {e}"}
+
+    # A complete agent_test summary only needs the orchestrator's own fields added
+    if isinstance(data, dict) and data.get("_schema") == "v1":
+        data.update(requestId=request_id, exitCode=ret, logPath=str(log_path), resultJsonPath=str(result_json_path))
+        if ret != 0:
+            data["status"] = "error"
+        return data
+
+    summary: Dict[str, Any] = {
+        "status": "error" if ret != 0 else "ok",
+        "requestId": request_id,
+        "sessionId": session_id or "",
+        "prompt": prompt,
+        "mcpUrl": mcp_url,
+        "exitCode": ret,
+        "logPath": str(log_path),
+        "resultJsonPath": str(result_json_path),
+    }
+    summary.update(data if isinstance(data, dict) else {})
+    return summary
 
 def _run_agent_subprocess(prompt: str, session_id: Optional[str], request_id: str, mcp_url: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Run agent_test.py with arguments, capture logs, and ensure a result json is written."""
@@ -138,54 +276,93 @@ def _run_agent_subprocess(prompt: str, session_id: Optional[str], request_id: st
         args.extend(["--session-id", session_id])
 
     # Map options booleans to CLI flags
-    if isinstance(options, dict):
-        if options.get("includePreScreenshot") is False:
-            args.append("--no-pre-shot")
-        if options.get("includePostScreenshot") is False:
-            args.append("--no-post-shot")
-        if options.get("includePreSense") is False:
-            args.append("--no-pre-sense")
+    flags = _agent_flags(options)
+    if not flags["include_pre_shot"]:
+        args.append("--no-pre-shot")
+    if not flags["include_post_shot"]:
+        args.append("--no-post-shot")
+    if not flags["include_pre_sense"]:
+        args.append("--no-pre-sense")
 
     # Run agent; capture stdout & stderr to the same log file
-    print(f"[INFO] Spawning agent: {' '.join(args)}", flush=True)
-    with log_path.open("wb") as logf:
-        proc = subprocess.Popen(args, stdout=logf, stderr=subprocess.STDOUT)
+    log.info(f"Spawning agent: {' '.join(args)}")
+    fd = os.open(str(log_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+                 | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        proc = subprocess.Popen(args, stdout=fd, stderr=subprocess.STDOUT, close_fds=True)
         ret = proc.wait()
+    finally:
+        os.close(fd)
 
-    # Try to load result json
-    summary: Dict[str, Any] = {
-        "status": "error" if ret != 0 else "ok",
-        "requestId": request_id,
-        "sessionId": session_id or "",
-        "prompt": prompt,
-        "mcpUrl": mcp_url,
-        "exitCode": ret,
-        "logPath": str(log_path),
-        "resultJsonPath": str(result_json_path),
-    }
+    return _agent_summary(ret, prompt, session_id, request_id, mcp_url, log_path, result_json_path)
+
+def _run_agent_in_worker(log_path: str, prompt: str, session_id: Optional[str], mcp_url: str,
+                         result_json_path: str, flags: Dict[str, bool]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Agent pool entry point: run one job in this (long-lived) worker process with its
+    stdout/stderr captured to the job's log file. Returns an exit code like the script would,
+    plus the run's summary so the parent doesn't have to re-read it from disk."""
+    with open(log_path, "w", encoding="utf-8", buffering=1) as logf, \
+            contextlib.redirect_stdout(logf), contextlib.redirect_stderr(logf):
+        try:
+            summary = agent_test.run_once(prompt, session_id=session_id, mcp_url=mcp_url,
+                                          result_json=result_json_path, **flags)
+            return (0 if summary.get("status") == "ok" else 1), summary
+        except Exception:
+            traceback.print_exc()
+            return 1, None
+
+# Pre-warmed agent worker processes: strands/mcp are imported once per worker rather than per job
+_AGENT_PROCS: Optional[ProcessPoolExecutor] = None
+_AGENT_PROCS_LOCK = threading.Lock()
+
+def _agent_procs() -> ProcessPoolExecutor:
+    global _AGENT_PROCS
+    with _AGENT_PROCS_LOCK:
+        if _AGENT_PROCS is None:
+            # spawn, not fork: by now this process runs poller, heartbeat, logging and upload
+            # threads, and a forked child can inherit one of their locks held
+            _AGENT_PROCS = ProcessPoolExecutor(max_workers=CONCURRENCY, initializer=agent_test._lazy_imports,
+                                               mp_context=multiprocessing.get_context("spawn"))
+        return _AGENT_PROCS
+
+def _reset_agent_procs(broken: ProcessPoolExecutor):
+    global _AGENT_PROCS
+    with _AGENT_PROCS_LOCK:
+        if _AGENT_PROCS is broken:
+            _AGENT_PROCS = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _run_agent(prompt: str, session_id: Optional[str], request_id: str, mcp_url: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run one agent job on the worker pool; falls back to a fresh subprocess if the pool is broken."""
+    log_path = LOG_DIR / f"{request_id}.log"
+    result_json_path = RESULT_DIR / f"{request_id}.json"
+
+    pool = _agent_procs()
+    log.info(f"Running agent for requestId={request_id} in worker pool")
     try:
-        if result_json_path.exists():
-            data = json.loads(result_json_path.read_text(encoding="utf-8"))
-            summary.update(data if isinstance(data, dict) else {})
-    except Exception as e:
-        summary["parseError"] = f"{type(e).__name__}: {e}"
+        ret, data = pool.submit(_run_agent_in_worker, str(log_path), prompt, session_id, mcp_url,
+                          str(result_json_path), _agent_flags(options)).result()
+    except BrokenProcessPool:
+        log.warning("Agent worker pool died; falling back to a subprocess for this job.")
+        _reset_agent_procs(pool)
+        return _run_agent_subprocess(prompt, session_id, request_id, mcp_url, options=options)
 
-    return summary
+    return _agent_summary(ret, prompt, session_id, request_id, mcp_url, log_path, result_json_path, data)
 
 def _process_message(sqs, msg: Dict[str, Any]) -> bool:
     """Return True on success (message should be deleted)."""
     body = _safe_json_loads(msg.get("Body", ""))
     if not body:
-        print("[WARN] Invalid JSON body; skipping.", flush=True)
+        log.warning("Invalid JSON body; skipping.")
         return True  # discard
 
     if body.get("type") != "invoke-agent":
-        print(f"[INFO] Unsupported message type: {body.get('type')}; skipping.", flush=True)
+        log.info(f"Unsupported message type: {body.get('type')}; skipping.")
         return True  # discard
 
     prompt = str(body.get("prompt") or "").strip()
     if not prompt:
-        print("[WARN] Missing 'prompt'; skipping.", flush=True)
+        log.warning("Missing 'prompt'; skipping.")
         return True  # discard
 
     request_id = str(body.get("requestId") or f"req-{int(time.time())}")
@@ -194,56 +371,92 @@ def _process_message(sqs, msg: Dict[str, Any]) -> bool:
     result_prefix = body.get("resultKeyPrefix") or "results/"
     options = body.get("options") if isinstance(body.get("options"), dict) else None
 
-    print(f"[INFO] Processing requestId={request_id} prompt={prompt!r}", flush=True)
-
-    # Start a visibility extension thread while we run the agent
-    stop_evt = threading.Event()
-    vis_thread = threading.Thread(target=_extend_visibility_loop, args=(stop_evt, sqs, msg["ReceiptHandle"]), daemon=True)
-    vis_thread.start()
-
+    log.info(f"Processing requestId={request_id} prompt={prompt!r}")
+
+    summary = _run_agent(prompt, session_id, request_id, MCP_URL, options=options)
+    ok = summary.get("status") == "ok"
+    # Upload artifacts if requested
+    s3_locations: Dict[str, str] = {}
+    if result_bucket:
+        uploads = {}
+        # upload result JSON
+        result_json_path = Path(summary.get("resultJsonPath", ""))
+        if result_json_path and result_json_path.exists():
+            key = f"{result_prefix}{request_id}.json"
+            uploads["summary"] = (key, result_json_path)
+        # upload screenshot if present
+        shots = summary.get("shots") or {}
+        shot_path = shots.get("path")
+        if shot_path:
+            sp = Path(shot_path)
+            if sp.exists() and sp.is_file():
+                key = f"{result_prefix}{request_id}/AutoScreenshot.png"
+                uploads["screenshot"] = (key, sp)
+        futures = {
+            _UPLOAD_POOL.submit(_upload_file_s3, result_bucket, key, path): name
+            for name, (key, path) in uploads.items()
+        }
+        for fut in as_completed(futures):
+            loc = fut.result()
+            if loc:
+                s3_locations[futures[fut]] = loc
+
+    if s3_locations:
+        log.info(f"Uploaded artifacts: {s3_locations}")
+
+    return ok
+
+def _delete_batch(sqs, receipt_handles: List[str]):
+    """Delete handled messages in one call (SQS allows up to 10 entries). Entries that fail to delete
+    are made visible again right away instead of waiting out their visibility timeout."""
+    if not receipt_handles:
+        return
+    entries = [{"Id": str(i), "ReceiptHandle": r} for i, r in enumerate(receipt_handles)]
     try:
-        summary = _run_agent_subprocess(prompt, session_id, request_id, MCP_URL, options=options)
-        ok = summary.get("status") == "ok"
-        # Upload artifacts if requested
-        s3_locations: Dict[str, str] = {}
-        if result_bucket:
-            # upload result JSON
-            result_json_path = Path(summary.get("resultJsonPath", ""))
-            if result_json_path and result_json_path.exists():
-                key = f"{result_prefix}{request_id}.json"
-                loc = _upload_file_s3(result_bucket, key, result_json_path)
-                if loc:
-                    s3_locations["summary"] = loc
-            # upload screenshot if present
-            shots = summary.get("shots") or {}
-            shot_path = shots.get("path")
-            if shot_path:
-                sp = Path(shot_path)
-                if sp.exists() and sp.is_file():
-                    key = f"{result_prefix}{request_id}/AutoScreenshot.png"
-                    loc = _upload_file_s3(result_bucket, key, sp)
-                    if loc:
-                        s3_locations["screenshot"] = loc
-
-        if s3_locations:
-            print(f"[INFO] Uploaded artifacts: {s3_locations}", flush=True)
-
-        return ok
-    finally:
-        # Stop visibility extension
-        stop_evt.set()
+        resp = sqs.delete_message_batch(QueueUrl=SQS_QUEUE_URL, Entries=entries)
+    except Exception as e:
+        log.warning(f"delete_message_batch failed: {e}")
+        return
+    deleted = len(resp.get("Successful", []))
+    if deleted:
+        log.info(f"Deleted {deleted} message(s) (success).")
+    failed = resp.get("Failed", [])
+    if failed:
+        log.warning(f"delete_message_batch failed for {len(failed)} message(s): {failed}")
+        by_id = {e["Id"]: e["ReceiptHandle"] for e in entries}
         try:
-            vis_thread.join(timeout=2.0)
-        except Exception:
-            pass
+            sqs.change_message_visibility_batch(
+                QueueUrl=SQS_QUEUE_URL,
+                Entries=[{"Id": f["Id"], "ReceiptHandle": by_id[f["Id"]], "VisibilityTimeout": 0} for f in failed],
+            )
+        except Exception as e:
+            log.warning(f"change_message_visibility_batch failed: {e}")
+
+def _run_group(sqs, msgs: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], bool]]:
+    """Process one FIFO message group's messages in order. Stops at the first failure so later
+    messages in the group aren't run ahead of it; those are released for redelivery."""
+    results = []
+    for m in msgs:
+        try:
+            success = _process_message(sqs, m)
+        except Exception as e:
+            log.error(f"Unhandled error processing message: {e}")
+            success = False
+        results.append((m, success))
+        if not success:
+            break
+    # Failed and skipped messages stop being extended so they become visible again for retry
+    done = {m["ReceiptHandle"] for m, success in results if success}
+    _untrack_visibility([m["ReceiptHandle"] for m in msgs if m["ReceiptHandle"] not in done])
+    return results
 
 def _worker_loop(worker_id: int, stop_event: threading.Event):
-    print(f"[INFO] Worker {worker_id} starting. Queue={SQS_QUEUE_URL}", flush=True)
+    log.info(f"Worker {worker_id} starting. Queue={SQS_QUEUE_URL}")
     if not SQS_QUEUE_URL:
-        print("[ERROR] SQS_QUEUE_URL is not set. Exiting.", flush=True)
+        log.error("SQS_QUEUE_URL is not set. Exiting.")
         return
     if boto3 is None:
-        print("[ERROR] boto3 is not installed. Exiting.", flush=True)
+        log.error("boto3 is not installed. Exiting.")
         return
 
     sqs = _sqs_client()
@@ -252,12 +465,13 @@ def _worker_loop(worker_id: int, stop_event: threading.Event):
         try:
             resp = sqs.receive_message(
                 QueueUrl=SQS_QUEUE_URL,
-                MaxNumberOfMessages=1,
+                MaxNumberOfMessages=SQS_MAX_MESSAGES,
                 WaitTimeSeconds=SQS_WAIT_TIME,
+                AttributeNames=["MessageGroupId"],
                 VisibilityTimeout=SQS_VISIBILITY_EXTENSION_SEC,  # initial visibility window
             )
         except Exception as e:
-            print(f"[WARN] receive_message failed: {e}", flush=True)
+            log.warning(f"receive_message failed: {e}")
             time.sleep(POLL_SLEEP)
             continue
 
@@ -266,30 +480,40 @@ def _worker_loop(worker_id: int, stop_event: threading.Event):
             # idle
             continue
 
-        for m in msgs:
-            receipt = m["ReceiptHandle"]
-            try:
-                success = _process_message(sqs, m)
-                if success:
-                    try:
-                        sqs.delete_message(QueueUrl=SQS_QUEUE_URL, ReceiptHandle=receipt)
-                        print("[INFO] Deleted message (success).", flush=True)
-                    except Exception as e:
-                        print(f"[WARN] delete_message failed: {e}", flush=True)
-                else:
-                    # Let it retry naturally; do not delete
-                    print("[INFO] Agent reported failure; leaving message for retry.", flush=True)
-            except Exception as e:
-                print(f"[ERROR] Unhandled error processing message: {e}", flush=True)
-            finally:
-                # small backoff between messages
-                time.sleep(POLL_SLEEP)
+        # Keep every received message invisible until it has been handled, including ones still
+        # waiting behind others in the batch
+        _track_visibility([m["ReceiptHandle"] for m in msgs])
+
+        try:
+            # FIFO ordering holds within a message group: groups run concurrently, each one in order
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for m in msgs:
+                group_id = (m.get("Attributes") or {}).get("MessageGroupId") or m["MessageId"]
+                groups.setdefault(group_id, []).append(m)
+            futures = [_AGENT_POOL.submit(_run_group, sqs, g) for g in groups.values()]
+
+            # Successful messages stay tracked (still extended) until the batch delete below
+            successful: List[str] = []
+            for fut in as_completed(futures):
+                for m, success in fut.result():
+                    if success:
+                        successful.append(m["ReceiptHandle"])
+                    else:
+                        # Let it retry naturally; do not delete
+                        log.info("Agent reported failure; leaving message for retry.")
+            _delete_batch(sqs, successful)
+        except Exception as e:
+            log.error(f"Unhandled error processing batch: {e}")
+        finally:
+            # Stop visibility extension
+            _untrack_visibility([m["ReceiptHandle"] for m in msgs])
 
 def main():
+    listener = _setup_logging()
     stop_event = threading.Event()
 
     def _handle_sigint(signum, frame):
-        print("[INFO] Received interrupt, shutting down...", flush=True)
+        log.info("Received interrupt, shutting down...")
         stop_event.set()
 
     try:
@@ -298,8 +522,9 @@ def main():
     except Exception:
         pass
 
-    workers = []
-    for i in range(CONCURRENCY):
+    workers = [threading.Thread(target=_visibility_heartbeat, args=(stop_event,), daemon=True)]
+    workers[0].start()
+    for i in range(POLLERS):
         t = threading.Thread(target=_worker_loop, args=(i, stop_event), daemon=True)
         workers.append(t)
         t.start()
@@ -314,7 +539,10 @@ def main():
                 t.join(timeout=3.0)
             except Exception:
                 pass
-        print("[INFO] Orchestrator stopped.", flush=True)
+        if _AGENT_PROCS is not None:
+            _AGENT_PROCS.shutdown(wait=False, cancel_futures=True)
+        log.info("Orchestrator stopped.")
+        listener.stop()
 
 if __name__ == "__main__":
     main()
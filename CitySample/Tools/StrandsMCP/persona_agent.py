@@ -5,7 +5,11 @@ Simulates consciousness in Unreal Engine with streaming thoughts to OBS
 """
 
 import os
+import re
 import sys
+import mmap
+import tempfile
+import faulthandler
 import json
 import time
 import socket
@@ -16,11 +20,15 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 import threading
 import queue
+import itertools
+from collections import deque
+from functools import lru_cache
 
-# Add likely native DLL locations to the DLL search path
+# Add likely native DLL locations to the DLL search path (once per directory)
+@lru_cache(maxsize=None)
 def _add_dll_dir(p: Path):
     try:
-        if p and p.is_dir():
+        if p.is_dir():
             os.add_dll_directory(str(p))
     except Exception:
         pass
@@ -29,13 +37,14 @@ def _add_dll_dir(p: Path):
 _project_root = Path(__file__).resolve().parents[2]
 _site = _project_root / "Intermediate" / "PipInstall" / "Lib" / "site-packages"
 
-# Ensure Python can import packages installed by UE's PipInstall
-if str(_site) not in sys.path:
+# Ensure Python can import packages installed by UE's PipInstall; skipped entirely when
+# there is no PipInstall dir or a parent/earlier import already set it up
+if _site.is_dir() and str(_site) not in sys.path:
     sys.path.insert(0, str(_site))
-
-# Common native lib locations
-for sub in ["numpy/.libs", "numpy/core", "cv2", ""]:
-    _add_dll_dir((_site / sub) if sub else _site)
+    # Common native lib locations (os.add_dll_directory is Windows-only)
+    if hasattr(os, "add_dll_directory"):
+        for sub in ("numpy/.libs", "numpy/core", "cv2", ""):
+            _add_dll_dir((_site / sub) if sub else _site)
 
 from mcp.client.streamable_http import streamablehttp_client
 from strands.agent import Agent
@@ -62,9 +71,70 @@ try:
 except Exception:
     boto3 = None
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+def _dumps(obj: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 17777
 OBS_OUTPUT_FILE = "persona_thoughts.txt"
+OBS_TAIL_LINES = 20
+OBS_FILE_SIZE = 8192  # bytes; the OBS file is kept at this size and memory-mapped
+STATE_SNAPSHOT_EVERY = 10  # every Nth save also leaves a timestamped state_<ts>.json
+STATE_SNAPSHOTS_KEPT = 5
+MEMORY_WINDOW = 256  # memories kept in state snapshots; older ones are appended to memories.jsonl
+OBS_FLUSH_INTERVAL = 0.1  # seconds to let a burst of thoughts accumulate before rewriting
+
+# Personality-driven action tables: archetype keyword -> (actions, weights)
+_ACTION_WEIGHTS = {
+    "explorer": (["explore_forward", "look_around", "investigate", "climb"], [0.4, 0.3, 0.2, 0.1]),
+    "cautious": (["sense_environment", "look_carefully", "move_slowly", "wait"], [0.4, 0.3, 0.2, 0.1]),
+    "social": (["wave", "dance", "look_for_others", "communicate"], [.3, 0.3, 0.3, 0.1]),
+}
+_DEFAULT_ACTION_WEIGHTS = (["wander", "observe", "interact", "rest"], [0.3, 0.3, 0.3, 0.1])
+
+# Event keyword -> emotion; the earliest trigger in an event wins
+_EMOTION_TRIGGERS = {
+    "blocked": "frustrated",
+    "clear_path": "excited",
+    "stuck": "anxious",
+    "success": "happy",
+    "failure": "disappointed",
+    "low_energy": "tired",
+    "high_energy": "energetic"
+}
+_EMOTION_RE = re.compile("|".join(f"(?P<{t}>{re.escape(t)})" for t in _EMOTION_TRIGGERS), re.I)
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via a temp file in the same dir + os.replace, so readers see the old or new file, never a partial one."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _action_table(archetype: str):
+    """Pick the action table for an archetype, with cumulative weights for random.choices."""
+    actions, weights = next((t for key, t in _ACTION_WEIGHTS.items() if key in archetype), _DEFAULT_ACTION_WEIGHTS)
+    return actions, list(itertools.accumulate(weights))
 
 class PersonaAgent:
     """An AI agent with personality, inner monologue, and continuous consciousness"""
@@ -82,15 +152,30 @@ class PersonaAgent:
         self.running = True
         
         # Memory and state persistence
-        self.memories = []
+        self.memories = deque(maxlen=MEMORY_WINDOW)
+        self.memory_count = 0
+        self._archive = []  # memories evicted from the window, not yet appended to memories.jsonl
         self.emotional_state = persona_traits.get("base_emotion", "curious")
         self.energy_level = 100.0  # 0-100 energy simulation
+        self._rng = random.Random()
+        self._action_table = _action_table(persona_traits.get("archetype", ""))
         self.goals = persona_traits.get("goals", ["explore", "understand", "survive"])
+        self._recent_memories = deque(maxlen=5)
+        self._refresh_prompt_cache()
         
         # OBS output directory
         self.obs_dir = _project_root / "Saved" / "OBS"
         self.obs_dir.mkdir(parents=True, exist_ok=True)
         self.obs_file = self.obs_dir / OBS_OUTPUT_FILE
+        # Last lines shown in OBS, kept in memory so each thought only rewrites this small tail
+        self._tail = deque(maxlen=OBS_TAIL_LINES)
+        try:
+            if self.obs_file.exists():
+                self._tail.extend(l + "\n" for l in self.obs_file.read_text(encoding='utf-8').splitlines() if l)
+        except Exception as e:
+            print(f"OBS tail load error: {e}")
+        self._obs_fh = None
+        self._obs_mm = None
         
         # Session persistence paths
         self.saved_dir = _project_root / "Saved"
@@ -99,25 +184,47 @@ class PersonaAgent:
         
         # Start OBS writer thread
         self._start_obs_writer()
+        
+        # State snapshots are written (and uploaded) off the lifecycle loop
+        self._save_q = queue.Queue(maxsize=4)
+        self._last_saved = None
+        self._saves = 0
+        self._s3 = None
+        self.saver_thread = threading.Thread(target=self._saver, daemon=True)
+        self.saver_thread.start()
     
     def _start_obs_writer(self):
         """Start background thread to write thoughts to OBS file"""
         def writer():
             while self.running:
                 try:
-                    thought = self.thought_queue.get(timeout=0.5)
+                    batch = [self.thought_queue.get(timeout=0.25)]
+                    # Coalesce the rest of the burst into a single rewrite
+                    time.sleep(OBS_FLUSH_INTERVAL)
+                    try:
+                        while True:
+                            batch.append(self.thought_queue.get_nowait())
+                    except queue.Empty:
+                        pass
                     # Write to OBS file with timestamp
                     timestamp = datetime.now().strftime("%H:%M:%S")
-                    formatted = f"[{timestamp}] {self.persona_name}: {thought}\n"
-                    
-                    # Append to file for OBS text source
-                    with open(self.obs_file, 'a', encoding='utf-8') as f:
-                        f.write(formatted)
+                    self._tail.extend(f"[{timestamp}] {self.persona_name}: {thought}\n" for thought in batch)
                     
-                    # Keep only last 20 lines for readability
-                    lines = self.obs_file.read_text(encoding='utf-8').splitlines()
-                    if len(lines) > 20:
-                        self.obs_file.write_text('\n'.join(lines[-20:]) + '\n', encoding='utf-8')
+                    data = ''.join(self._tail).encode('utf-8')
+                    if self._obs_mm is None and self._obs_fh is None:
+                        self._open_obs_map()
+                    if self._obs_mm is not None:
+                        # Overwrite the fixed-size mapped file in place: one memcpy, no open/close per batch
+                        if len(data) > OBS_FILE_SIZE:
+                            data = data[-OBS_FILE_SIZE:]
+                            while data and data[0] & 0xC0 == 0x80:  # don't start mid UTF-8 character
+                                data = data[1:]
+                        self._obs_mm[:] = data.ljust(OBS_FILE_SIZE, b'\n')
+                    else:
+                        # Rewrite the tail atomically so the OBS text source never reads a torn file
+                        tmp = self.obs_file.with_suffix('.tmp')
+                        tmp.write_bytes(data)
+                        os.replace(tmp, self.obs_file)
                         
                 except queue.Empty:
                     continue
@@ -127,6 +234,19 @@ class PersonaAgent:
         self.obs_writer_thread = threading.Thread(target=writer, daemon=True)
         self.obs_writer_thread.start()
     
+    def _open_obs_map(self):
+        """Map the OBS file at a fixed OBS_FILE_SIZE (tail padded with newlines); on failure the
+        writer falls back to atomic rewrites."""
+        try:
+            self._obs_fh = open(self.obs_file, 'a+b')
+            self._obs_fh.truncate(OBS_FILE_SIZE)
+            self._obs_mm = mmap.mmap(self._obs_fh.fileno(), OBS_FILE_SIZE)
+        except Exception as e:
+            print(f"OBS mmap unavailable, rewriting file instead: {e}")
+            if self._obs_fh is not None:
+                self._obs_fh.close()
+            self._obs_fh = False  # don't retry
+    
     def think(self, thought: str):
         """Generate an inner monologue thought"""
         # Add personality flavor to thoughts
@@ -146,21 +266,11 @@ class PersonaAgent:
     
     def update_emotion(self, event: str):
         """Update emotional state based on events"""
-        emotion_triggers = {
-            "blocked": "frustrated",
-            "clear_path": "excited",
-            "stuck": "anxious",
-            "success": "happy",
-            "failure": "disappointed",
-            "low_energy": "tired",
-            "high_energy": "energetic"
-        }
-        
-        for trigger, emotion in emotion_triggers.items():
-            if trigger in event.lower():
-                self.emotional_state = emotion
-                self.think(f"Feeling {emotion} now...")
-                break
+        m = _EMOTION_RE.search(event)
+        if m:
+            emotion = _EMOTION_TRIGGERS[m.lastgroup]
+            self.emotional_state = emotion
+            self.think(f"Feeling {emotion} now...")
     
     def decide_action(self) -> str:
         """Decide what to do next based on personality and state"""
@@ -170,29 +280,32 @@ class PersonaAgent:
             return "rest"
         
         # Personality-driven decisions
-        if "explorer" in self.persona_traits.get("archetype", ""):
-            actions = ["explore_forward", "look_around", "investigate", "climb"]
-            weights = [0.4, 0.3, 0.2, 0.1]
-        elif "cautious" in self.persona_traits.get("archetype", ""):
-            actions = ["sense_environment", "look_carefully", "move_slowly", "wait"]
-            weights = [0.4, 0.3, 0.2, 0.1]
-        elif "social" in self.persona_traits.get("archetype", ""):
-            actions = ["wave", "dance", "look_for_others", "communicate"]
-            weights = [.3, 0.3, 0.3, 0.1]
-        else:
-            actions = ["wander", "observe", "interact", "rest"]
-            weights = [0.3, 0.3, 0.3, 0.1]
-        
-        return random.choices(actions, weights=weights)[0]
+        actions, cum_weights = self._action_table
+        return self._rng.choices(actions, cum_weights=cum_weights)[0]
+    
+    def _refresh_prompt_cache(self):
+        """Re-serialize traits/goals for the prompt; call after either changes."""
+        self._traits_json = json.dumps(self.persona_traits)
+        self._goals_str = ', '.join(self.goals)
+        self._recent_memories.clear()
+        self._recent_memories.extend(self.memories)
+    
+    def remember(self, memory: str):
+        """Record a memory (rolling window for saving, last five for prompts)"""
+        if len(self.memories) == self.memories.maxlen:
+            self._archive.append(self.memories[0])
+        self.memories.append(memory)
+        self.memory_count += 1
+        self._recent_memories.append(memory)
     
     def generate_persona_prompt(self) -> str:
         """Generate a contextual prompt based on persona and current state"""
-        base_prompt = f"""You are {self.persona_name}, with these traits: {json.dumps(self.persona_traits)}.
+        base_prompt = f"""You are {self.persona_name}, with these traits: {self._traits_json}.
         
 Your current emotional state is '{self.emotional_state}' and energy level is {self.energy_level:.0f}%.
-Your goals are: {', '.join(self.goals)}.
+Your goals are: {self._goals_str}.
 
-Recent memories: {'; '.join(self.memories[-5:]) if self.memories else 'None yet'}
+Recent memories: {'; '.join(self._recent_memories) if self._recent_memories else 'None yet'}
 
 Based on your personality and current state, express your thoughts as you explore.
 Before each action, share your inner monologue about what you're thinking and feeling.
@@ -210,59 +323,103 @@ Describe what catches your attention and why, based on your personality traits."
         return base_prompt
     
     def save_state(self):
-        """Save persona state to disk (and optionally S3)"""
+        """Queue a snapshot of persona state for the saver thread (disk and optionally S3)"""
         state = {
             "persona_name": self.persona_name,
             "persona_traits": self.persona_traits,
             "session_id": self.session_id,
-            "memories": self.memories,
+            "memories": list(self.memories),
             "emotional_state": self.emotional_state,
             "energy_level": self.energy_level,
-            "goals": self.goals,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "goals": list(self.goals),
         }
         
-        # Save locally
-        state_file = self.state_dir / f"state_{int(time.time())}.json"
-        state_file.write_text(json.dumps(state, indent=2), encoding='utf-8')
+        # Skip the write entirely if nothing changed since the last snapshot
+        fingerprint = _dumps(state)
+        if fingerprint == self._last_saved:
+            return state
+        self._last_saved = fingerprint
+        state["timestamp"] = datetime.now(timezone.utc).isoformat()
+        archive, self._archive = self._archive, []
         
-        # Save to S3 if enabled
-        if self.use_s3:
+        # Snapshots are complete, so if the saver is behind, drop the oldest pending one
+        # (carrying its evicted memories over so none are lost)
+        stamp = int(time.time())
+        while True:
             try:
-                s3 = boto3.client('s3')
-                bucket = os.getenv('S3_PERSONA_BUCKET', 'strands-personas')
-                key = f"{self.persona_name}/{self.session_id}/state_{int(time.time())}.json"
-                s3.put_object(
-                    Bucket=bucket,
-                    Key=key,
-                    Body=json.dumps(state),
-                    ContentType='application/json'
-                )
-                self.think(f"Saved my memories to the cloud...")
-            except Exception as e:
-                print(f"S3 save failed: {e}")
+                self._save_q.put_nowait((stamp, state, archive))
+                break
+            except queue.Full:
+                try:
+                    archive = self._save_q.get_nowait()[2] + archive
+                except queue.Empty:
+                    pass
         
         return state
     
+    def _saver(self):
+        """Background thread: write queued state snapshots locally and to S3 if enabled"""
+        while True:
+            item = self._save_q.get()
+            if item is None:
+                break
+            stamp, state, archive = item
+            try:
+                # Memories that fell out of the window go to an append-only log
+                if archive:
+                    with open(self.state_dir / "memories.jsonl", "ab") as f:
+                        f.write(b"".join(_dumps(m) + b"\n" for m in archive))
+                # Save locally: state.json is replaced atomically, so a crash never leaves it torn
+                data = _dumps(state)
+                _atomic_write(self.state_dir / "state.json", data)
+                # Plus a timestamped snapshot every few saves, keeping only the newest ones
+                self._saves += 1
+                if self._saves % STATE_SNAPSHOT_EVERY == 0:
+                    _atomic_write(self.state_dir / f"state_{stamp}.json", data)
+                    for old in sorted(self.state_dir.glob("state_*.json"))[:-STATE_SNAPSHOTS_KEPT]:
+                        old.unlink(missing_ok=True)
+            except Exception as e:
+                print(f"State save failed: {e}")
+                continue
+            
+            # Save to S3 if enabled
+            if self.use_s3:
+                try:
+                    if self._s3 is None:
+                        self._s3 = boto3.client('s3')
+                    bucket = os.getenv('S3_PERSONA_BUCKET', 'strands-personas')
+                    key = f"{self.persona_name}/{self.session_id}/state_{stamp}.json"
+                    self._s3.put_object(
+                        Bucket=bucket,
+                        Key=key,
+                        Body=data,
+                        ContentType='application/json'
+                    )
+                    self.think(f"Saved my memories to the cloud...")
+                except Exception as e:
+                    print(f"S3 save failed: {e}")
+    
     def load_state(self, state_file: Optional[Path] = None):
         """Load previous persona state"""
         if state_file and state_file.exists():
-            state = json.loads(state_file.read_text(encoding='utf-8'))
-            self.memories = state.get('memories', [])
+            state = _loads(state_file.read_bytes())
+            self.memories = deque(state.get('memories', []), maxlen=MEMORY_WINDOW)
+            self.memory_count = len(self.memories)
             self.emotional_state = state.get('emotional_state', 'curious')
             self.energy_level = state.get('energy_level', 100.0)
             self.goals = state.get('goals', self.goals)
-            self.think(f"Remembering... {len(self.memories)} previous experiences")
+            self._refresh_prompt_cache()
+            self.think(f"Remembering... {self.memory_count} previous experiences")
     
     def run_lifecycle(self, agent: Agent, duration_seconds: int = 300):
         """Run the persona's life cycle for a specified duration"""
-        start_time = time.time()
+        deadline = time.monotonic() + duration_seconds
         action_count = 0
         
         self.think(f"Awakening... I am {self.persona_name}")
-        self.think(f"My purpose: {', '.join(self.goals)}")
+        self.think(f"My purpose: {self._goals_str}")
         
-        while time.time() - start_time < duration_seconds:
+        while time.monotonic() < deadline:
             # Decide what to do
             action = self.decide_action()
             self.think(f"I should {action.replace('_', ' ')}")
@@ -278,22 +435,22 @@ Describe what catches your attention and why, based on your personality traits."
                 result = agent(full_prompt)
                 
                 # Process result and update state
-                self.memories.append(f"I tried to {action} and {self._interpret_result(result)}")
+                self.remember(f"I tried to {action} and {self._interpret_result(result)}")
                 self.update_emotion("success")
                 
                 # Energy depletes with actions
-                self.energy_level = max(0, self.energy_level - random.uniform(2, 5))
+                self.energy_level = max(0, self.energy_level - self._rng.uniform(2, 5))
                 
             except Exception as e:
                 self.think(f"Something went wrong: {str(e)[:50]}")
-                self.memories.append(f"Failed to {action}")
+                self.remember(f"Failed to {action}")
                 self.update_emotion("failure")
                 self.energy_level = max(0, self.energy_level - 1)
             
             # Rest if tired
             if self.energy_level < 20:
                 self.think("I need to rest and recover energy")
-                time.sleep(5)
+                self._pause(5, deadline)
                 self.energy_level = min(100, self.energy_level + 20)
                 self.think("Feeling refreshed!")
             
@@ -302,12 +459,19 @@ Describe what catches your attention and why, based on your personality traits."
             if action_count % 5 == 0:
                 self.save_state()
             
-            # Brief pause between actions
-            time.sleep(random.uniform(2, 5))
+            # Brief pause between actions (OBS writes and state saves carry on in their threads)
+            self._pause(self._rng.uniform(2, 5), deadline)
         
-        self.think(f"My exploration session is complete. I learned {len(self.memories)} new things.")
+        self.think(f"My exploration session is complete. I learned {self.memory_count} new things.")
         self.save_state()
     
+    @staticmethod
+    def _pause(seconds: float, deadline: float):
+        """Sleep, but never past the end of the session"""
+        seconds = min(seconds, deadline - time.monotonic())
+        if seconds > 0:
+            time.sleep(seconds)
+    
     def _action_to_prompt(self, action: str) -> str:
         """Convert action decision to natural language prompt"""
         prompts = {
@@ -341,43 +505,57 @@ Describe what catches your attention and why, based on your personality traits."
     
     def cleanup(self):
         """Clean up resources"""
+        # Let queued state snapshots (including the final one) finish before stopping
+        self._save_q.put(None)
+        self.saver_thread.join(timeout=30)
         self.running = False
         if self.obs_writer_thread:
             self.obs_writer_thread.join(timeout=2)
+        if self._obs_mm is not None:
+            self._obs_mm.close()
+            self._obs_mm = None
+        if self._obs_fh:
+            self._obs_fh.close()
 
 
-def main():
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="Run a Persona-based Strands Agent")
-    parser.add_argument("--persona", default="Explorer", help="Persona name")
-    parser.add_argument("--traits", type=json.loads, 
-                       default='{"archetype": "explorer", "base_emotion": "curious", "goals": ["explore", "discover", "learn"]}',
-                       help="Persona traits as JSON")
-    parser.add_argument("--duration", type=int, default=300, help="Lifecycle duration in seconds")
-    parser.add_argument("--session-id", help="Session ID for continuity")
-    parser.add_argument("--load-state", help="Path to previous state file to load")
-    parser.add_argument("--use-s3", action="store_true", help="Use S3 for state persistence")
-    parser.add_argument("--mcp-url", default=os.environ.get("MCP_URL", "http://localhost:8000/mcp"))
-    parser.add_argument("--agent-id", help="Route commands to a specific Unreal agent")
-    
-    args = parser.parse_args()
+def run_persona_once(
+    persona_name: str,
+    persona_traits: Dict[str, Any],
+    duration: int = 300,
+    load_state: Optional[str] = None,
+    use_s3: bool = False,
+    session_id: Optional[str] = None,
+    mcp_url: Optional[str] = None,
+    agent_id: Optional[str] = None,
+) -> int:
+    """Run one persona lifecycle in this process. Returns 0 on success, 1 on a critical error.
+
+    Used by main() and, in-process, by continuous_consciousness so a cycle doesn't pay for a
+    fresh interpreter and strands import.
+    """
+    mcp_url = mcp_url or os.environ.get("MCP_URL", "http://localhost:8000/mcp")
+    rc = 0
+    # Dump tracebacks on hard crashes (e.g. in native code) instead of dying silently
+    try:
+        faulthandler.enable()
+    except Exception:
+        pass
     
     # Create persona
     persona = PersonaAgent(
-        persona_name=args.persona,
-        persona_traits=args.traits,
-        session_id=args.session_id,
-        use_s3=args.use_s3
+        persona_name=persona_name,
+        persona_traits=persona_traits,
+        session_id=session_id,
+        use_s3=use_s3
     )
     
     # Load previous state if provided
-    if args.load_state:
-        persona.load_state(Path(args.load_state))
+    if load_state:
+        persona.load_state(Path(load_state))
     
     # Setup MCP client and agent
     try:
-        streamable_http_mcp_client = MCPClient(lambda: streamablehttp_client(args.mcp_url))
+        streamable_http_mcp_client = MCPClient(lambda: streamablehttp_client(mcp_url))
         
         with streamable_http_mcp_client:
             tools = streamable_http_mcp_client.list_tools_sync()
@@ -387,7 +565,7 @@ def main():
             session_manager = FileSessionManager(session_id=persona.session_id)
             
             # Create agent with persona's prompt
-            agent_hooks = [AgentIdHook(args.agent_id)] if args.agent_id else []
+            agent_hooks = [AgentIdHook(agent_id)] if agent_id else []
             agent = Agent(
                 tools=filtered_tools,
                 session_manager=session_manager,
@@ -395,19 +573,49 @@ def main():
                 hooks=agent_hooks,
             )
             
-            print(f"Starting {persona.persona_name}'s lifecycle for {args.duration} seconds...")
+            print(f"Starting {persona.persona_name}'s lifecycle for {duration} seconds...")
             print(f"OBS output: {persona.obs_file}")
             
             # Run the persona's lifecycle
-            persona.run_lifecycle(agent, args.duration)
+            persona.run_lifecycle(agent, duration)
             
     except Exception as e:
         print(f"Error: {e}")
         persona.think(f"Critical error: {str(e)[:100]}")
+        rc = 1
     finally:
         persona.cleanup()
         print(f"Persona {persona.persona_name} has completed their journey.")
+    return rc
+
 
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run a Persona-based Strands Agent")
+    parser.add_argument("--persona", default="Explorer", help="Persona name")
+    parser.add_argument("--traits", type=json.loads, 
+                       default='{"archetype": "explorer", "base_emotion": "curious", "goals": ["explore", "discover", "learn"]}',
+                       help="Persona traits as JSON")
+    parser.add_argument("--duration", type=int, default=300, help="Lifecycle duration in seconds")
+    parser.add_argument("--session-id", help="Session ID for continuity")
+    parser.add_argument("--load-state", help="Path to previous state file to load")
+    parser.add_argument("--use-s3", action="store_true", help="Use S3 for state persistence")
+    parser.add_argument("--mcp-url", default=os.environ.get("MCP_URL", "http://localhost:8000/mcp"))
+    parser.add_argument("--agent-id", help="Route commands to a specific Unreal agent")
+    
+    args = parser.parse_args()
+    
+    return run_persona_once(
+        args.persona,
+        args.traits,
+        duration=args.duration,
+        load_state=args.load_state,
+        use_s3=args.use_s3,
+        session_id=args.session_id,
+        mcp_url=args.mcp_url,
+        agent_id=args.agent_id,
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Union
+import os
+import asyncio
 import json
+import math
 import socket
+import threading
 import time
 from pathlib import Path
 
 from mcp.server import FastMCP
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    # OS-level file notifications (inotify / ReadDirectoryChangesW / FSEvents)
+    from watchfiles import watch  # type: ignore
+except Exception:
+    watch = None
+
 # Defaults for the Unreal StrandsInputServer plugin
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 17777
@@ -15,17 +30,100 @@ DEFAULT_PORT = 17777
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_STATE_PATH = PROJECT_ROOT / "Saved" / "WorldState" / "agent_state.json"
 
-def send_json(host: str, port: int, payload: Dict[str, Any]) -> None:
-    line = json.dumps(payload, separators=(",", ":")) + "\n"
-    data = line.encode("utf-8")
-    with socket.create_connection((host, port), timeout=2.0) as sock:
-        sock.sendall(data)
+# Persistent connections to StrandsInputServer, one per (host, port). The server keeps clients
+# connected and handles every complete line, so tool calls skip the connect/teardown.
+_SOCKS: Dict[Tuple[str, int], socket.socket] = {}
+_SOCKS_LOCK = threading.Lock()
+
+def _connect(host: str, port: int) -> socket.socket:
+    sock = socket.create_connection((host, port), timeout=2.0)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    _SOCKS[(host, port)] = sock
+    return sock
+
+def _alive(sock: socket.socket) -> bool:
+    """False once Unreal has closed the connection (PIE stopped, level changed): a send on the
+    stale socket would still be accepted by the kernel and the command silently lost."""
+    timeout = sock.gettimeout()
+    try:
+        sock.setblocking(False)
+        return sock.recv(1, socket.MSG_PEEK) != b""
+    except BlockingIOError:
+        return True  # open, nothing to read
+    except OSError:
+        return False
+    finally:
+        try:
+            sock.settimeout(timeout)
+        except OSError:
+            pass
+
+def _drop(host: str, port: int) -> None:
+    sock = _SOCKS.pop((host, port), None)
+    if sock is not None:
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+# Framing is one JSON object per '\n'-terminated line: that's what the plugin's Strands_SplitLines
+# reads, so there is no length-prefixed mode to switch to on this side alone. Lines stay ASCII
+# (json.dumps escapes non-ASCII): the plugin turns each received byte into one TCHAR, so raw UTF-8
+# in a screenshot path or agent id would arrive mangled.
+def _line(payload: Dict[str, Any]) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("ascii")
+
+# Pre-encoded lines for the fixed-shape commands (see _fast_line); the common move/look/jump/sprint
+# calls then skip building a payload dict and running it through the JSON encoder.
+_MOVE_PREFIX = b'{"cmd":"move","forward":'
+_LOOK_PREFIX = b'{"cmd":"look","yawRate":'
+_JUMP_LINE = b'{"cmd":"jump"}\n'
+_SPRINT_LINES = {True: b'{"cmd":"sprint","enabled":true}\n', False: b'{"cmd":"sprint","enabled":false}\n'}
+
+def _fast_line(prefix: bytes, a: float, key: bytes, b: float) -> Optional[bytes]:
+    """prefix + a + key + b as a JSON line, or None when a value has no plain JSON form (nan/inf)."""
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        return None
+    return b"".join((prefix, repr(a).encode(), key, repr(b).encode(), b"}\n"))
 
-def safe_send(host: str, port: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+Payload = Union[Dict[str, Any], List[Dict[str, Any]], bytes]
+
+def send_json(host: str, port: int, payload: Payload) -> None:
+    """Send one command, or a list of commands as newline-delimited JSON in a single write.
+    A bytes payload is an already-encoded line and is sent as-is."""
+    # Everything for this call is joined into one buffer before the single sendall, so with
+    # TCP_NODELAY a small command or batch leaves as one segment; TCP_CORK/MSG_MORE would only
+    # help across separate writes (and don't exist on Windows, where Unreal usually runs).
+    if isinstance(payload, bytes):
+        data = payload
+    elif isinstance(payload, list):
+        data = b"".join(map(_line, payload))
+    else:
+        data = _line(payload)
+    with _SOCKS_LOCK:
+        sock = _SOCKS.get((host, port))
+        if sock is None or not _alive(sock):
+            _drop(host, port)
+            sock = _connect(host, port)
+        try:
+            sock.sendall(data)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            # Unreal restarted or dropped us; reconnect once and retry
+            _drop(host, port)
+            _connect(host, port).sendall(data)
+        except OSError:
+            _drop(host, port)
+            raise
+
+def safe_send(host: str, port: int, payload: Payload) -> Dict[str, Any]:
     try:
         send_json(host, port, payload)
         return {"status": "ok"}
     except (ConnectionRefusedError, socket.timeout, OSError) as e:
+        if isinstance(payload, bytes):
+            payload = json.loads(payload)
         return {
             "status": "error",
             "error": f"{type(e).__name__}: {e}",
@@ -34,15 +132,52 @@ def safe_send(host: str, port: int, payload: Dict[str, Any]) -> Dict[str, Any]:
             "payload": payload,
         }
 
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+def _load_json_file(path: Path):
+    """Parse a JSON file written by Unreal (which may carry a UTF-8 BOM) straight from bytes."""
+    raw = path.read_bytes()
+    if raw.startswith(_UTF8_BOM):
+        raw = raw[len(_UTF8_BOM):]
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _file_ready(p: Path, start_ts: float) -> bool:
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return False
+    return st.st_mtime > start_ts and st.st_size > 0
+
 def _wait_for_file(p: Path, start_ts: float, timeout_s: float = 10.0, poll_ms: int = 100) -> bool:
-    """Wait for file to appear and have mtime newer than start_ts."""
-    deadline = start_ts + timeout_s
-    while time.time() < deadline:
+    """Wait for file to appear and have mtime newer than start_ts.
+
+    Uses OS file notifications on the parent directory when watchfiles is installed,
+    otherwise falls back to polling every poll_ms.
+    """
+    if _file_ready(p, start_ts):
+        return True
+    deadline = time.monotonic() + max(0.0, timeout_s - (time.time() - start_ts))
+    if watch is not None:
         try:
-            if p.exists() and p.stat().st_mtime > start_ts and p.stat().st_size > 0:
-                return True
-        except FileNotFoundError:
-            pass
+            # rust_timeout bounds each wait so we re-check the deadline (and any write that
+            # landed before the watcher was armed) at least every 500ms.
+            for _changes in watch(
+                p.parent,
+                watch_filter=lambda _change, path: Path(path).name == p.name,
+                step=10,
+                rust_timeout=500,
+                yield_on_timeout=True,
+                recursive=False,
+            ):
+                if _file_ready(p, start_ts):
+                    return True
+                if time.monotonic() >= deadline:
+                    return False
+        except Exception:
+            pass  # watcher unavailable (e.g. unsupported filesystem); poll instead
+    while time.monotonic() < deadline:
+        if _file_ready(p, start_ts):
+            return True
         time.sleep(poll_ms / 1000.0)
     return False
 
@@ -60,6 +195,10 @@ def move(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
 ) -> Dict[str, Any]:
+    if duration is None and agent_id is None:
+        line = _fast_line(_MOVE_PREFIX, forward, b',"right":', right)
+        if line is not None:
+            return safe_send(host, port, line)
     payload: Dict[str, Any] = {"cmd": "move", "forward": forward, "right": right}
     if duration is not None:
         payload["duration"] = duration
@@ -76,6 +215,10 @@ def look(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
 ) -> Dict[str, Any]:
+    if duration is None and agent_id is None:
+        line = _fast_line(_LOOK_PREFIX, yawRate, b',"pitchRate":', pitchRate)
+        if line is not None:
+            return safe_send(host, port, line)
     payload: Dict[str, Any] = {"cmd": "look", "yawRate": yawRate, "pitchRate": pitchRate}
     if duration is not None:
         payload["duration"] = duration
@@ -89,6 +232,8 @@ def jump(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
 ) -> Dict[str, Any]:
+    if agent_id is None:
+        return safe_send(host, port, _JUMP_LINE)
     payload: Dict[str, Any] = {"cmd": "jump"}
     if agent_id is not None:
         payload["id"] = agent_id
@@ -101,6 +246,8 @@ def sprint(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
 ) -> Dict[str, Any]:
+    if agent_id is None:
+        return safe_send(host, port, _SPRINT_LINES[bool(enabled)])
     payload: Dict[str, Any] = {"cmd": "sprint", "enabled": bool(enabled)}
     if agent_id is not None:
         payload["id"] = agent_id
@@ -121,8 +268,26 @@ def screenshot(
         payload["id"] = agent_id
     return safe_send(host, port, payload)
 
+@mcp.tool(description="Send several commands at once, in order, e.g. "
+                      "[{\"cmd\": \"move\", \"forward\": 1, \"duration\": 1}, {\"cmd\": \"look\", \"yawRate\": 45}]. "
+                      "Each command takes the same fields as its tool (agent id goes in \"id\").")
+def batch(
+    commands: List[Dict[str, Any]],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> Dict[str, Any]:
+    bad = [i for i, c in enumerate(commands) if not isinstance(c, dict) or not isinstance(c.get("cmd"), str)]
+    if bad:
+        return {"status": "error", "error": "each command needs a string 'cmd'", "invalid": bad}
+    if not commands:
+        return {"status": "ok", "sent": 0}
+    res = safe_send(host, port, commands)
+    if res.get("status") == "ok":
+        res["sent"] = len(commands)
+    return res
+
 @mcp.tool(description="Capture a compact world/agent state snapshot to JSON and return it. Optional agent id.")
-def sense(
+async def sense(
     path: Optional[str] = None,
     agent_id: Optional[str] = None,
     host: str = DEFAULT_HOST,
@@ -135,21 +300,24 @@ def sense(
     except Exception:
         pass
 
-    # Trigger state export in Unreal and wait for file
+    # Trigger state export in Unreal and wait for file. The blocking steps (send, the wait of up
+    # to 10s, and decoding a possibly multi-MB file) run in the default executor so the MCP event
+    # loop keeps serving other tool calls meanwhile.
+    loop = asyncio.get_running_loop()
     t = time.time()
     payload: Dict[str, Any] = {"cmd": "state", "path": str(out_path)}
     if agent_id is not None:
         payload["id"] = agent_id
 
-    res = safe_send(host, port, payload)
+    res = await loop.run_in_executor(None, safe_send, host, port, payload)
     if res.get("status") != "ok":
         return {"status": "error", "error": "send_failed", "detail": res}
 
-    if not _wait_for_file(out_path, t, timeout_s=10.0):
+    if not await loop.run_in_executor(None, _wait_for_file, out_path, t, 10.0):
         return {"status": "error", "error": "timeout_waiting_for_state", "path": str(out_path)}
 
     try:
-        data = json.loads(out_path.read_text(encoding="utf-8"))
+        data = await loop.run_in_executor(None, _load_json_file, out_path)
         return {"status": "ok", "path": str(out_path), "state": data}
     except Exception as e:
         return {"status": "error", "error": f"read_error: {type(e).__name__}: {e}", "path": str(out_path)}
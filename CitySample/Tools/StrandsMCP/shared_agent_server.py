@@ -11,12 +11,15 @@ import json
 import uuid
 import asyncio
 import threading
+import zlib
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Deque
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, is_dataclass
 from concurrent.futures import ThreadPoolExecutor
-from queue import Queue, Empty
+from queue import PriorityQueue, Empty
+from itertools import count, islice
+from collections import deque
 
 # Add Python path for UE dependencies
 _project_root = Path(__file__).resolve().parents[2]
@@ -27,28 +30,104 @@ if str(_site) not in sys.path:
 try:
     from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, ORJSONResponse
     from pydantic import BaseModel
     import uvicorn
 except ImportError:
     print("Installing FastAPI...")
     import subprocess
-    subprocess.run([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn", "websockets"])
+    subprocess.run([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn[standard]", "websockets"])
     from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, ORJSONResponse
     from pydantic import BaseModel
     import uvicorn
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
 try:
     import boto3
     from botocore.exceptions import ClientError
 except ImportError:
     print("Installing boto3...")
+    import subprocess
     subprocess.run([sys.executable, "-m", "pip", "install", "boto3"])
     import boto3
     from botocore.exceptions import ClientError
 
+# Errors that mean a WebSocket client has gone away (Starlette raises RuntimeError when sending
+# on a closed socket; uvicorn surfaces transport loss as websockets' ConnectionClosed or OSError)
+try:
+    from websockets.exceptions import ConnectionClosed
+    _WS_SEND_ERRORS = (WebSocketDisconnect, ConnectionClosed, RuntimeError, OSError)
+except ImportError:
+    _WS_SEND_ERRORS = (WebSocketDisconnect, RuntimeError, OSError)
+
+def _json_default(obj):
+    if is_dataclass(obj):
+        return obj.__dict__  # json recurses into nested dataclasses through default again
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumpb(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for WebSocket frames; orjson when installed. Dataclasses (QueuedCommand,
+    GlobalAgentStatus) serialize directly, never through an asdict() deep copy."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+# Broadcast fan-out limits: concurrent sends per broadcast, and how long a client may stall one send
+BROADCAST_MAX_CONCURRENT_SENDS = 100
+BROADCAST_SEND_TIMEOUT = 5.0
+
+# WebSocket frame formats a client can pick at connect time. Text stays the default because the
+# frontend JSON.parse()s event.data; binary clients get the JSON bytes as-is (no str round trip),
+# zlib clients get them compressed (and inflate them, e.g. pako.inflate).
+FRAME_TEXT, FRAME_BINARY, FRAME_ZLIB = "text", "binary", "zlib"
+
+def _frame(payload: bytes, mode: str):
+    if mode == FRAME_BINARY:
+        return payload
+    if mode == FRAME_ZLIB:
+        return zlib.compress(payload, 1)
+    return payload.decode("utf-8")
+
+async def _send_frame(websocket: WebSocket, frame):
+    if isinstance(frame, str):
+        await websocket.send_text(frame)
+    else:
+        await websocket.send_bytes(frame)
+
+# Longest a command's turn may run before the processor moves on
+COMMAND_TIMEOUT = 300.0
+
+# Seconds between heartbeat frames on each /ws connection
+HEARTBEAT_INTERVAL = 15.0
+
+# Commands kept for /api/history and legacy turn status lookups
+COMMAND_HISTORY_SIZE = 1000
+
+# Outbound broadcast queue bound, and how many queued messages one broadcaster pass may merge
+BROADCAST_QUEUE_SIZE = 10000
+BROADCAST_BATCH_SIZE = 64
+
+def _merge_fragments(messages: List[Dict]) -> List[Dict]:
+    """Join consecutive partial agent_response messages; everything else passes through in order"""
+    merged: List[Dict] = []
+    for m in messages:
+        prev = merged[-1] if merged else None
+        if (prev is not None and m.get("type") == "agent_response" and prev.get("type") == "agent_response"
+                and not prev.get("complete") and not m.get("complete")):
+            merged[-1] = {**prev, "content": prev.get("content", "") + m.get("content", "")}
+        else:
+            merged.append(m)
+    return merged
+
+# Static frames, built once per format
+_PONG = {mode: _frame(_dumpb({"type": "pong"}), mode) for mode in (FRAME_TEXT, FRAME_BINARY, FRAME_ZLIB)}
+
 from turn_based_agent import TurnBasedAgent
 
 # DynamoDB Manager for persisting agent thoughts
@@ -162,7 +241,7 @@ class WebSocketCallbackHandler:
                                     "complete": False,
                                     "timestamp": datetime.now(timezone.utc).isoformat()
                                 }
-                                asyncio.create_task(self.agent_manager.broadcast_update(message))
+                                self.agent_manager.publish(message)
                                 self.last_sent_length = len(self.accumulated_response)
                                 
                                 # Save to DynamoDB (but don't save every tiny fragment)
@@ -181,7 +260,7 @@ class WebSocketCallbackHandler:
                                 "content": reasoning["text"],
                                 "timestamp": datetime.now(timezone.utc).isoformat()
                             }
-                            asyncio.create_task(self.agent_manager.broadcast_update(thought_message))
+                            self.agent_manager.publish(thought_message)
                             
                             # Save to DynamoDB
                             if self.dynamodb_manager:
@@ -201,18 +280,18 @@ class WebSocketCallbackHandler:
                     if self.last_sent_length < len(self.accumulated_response):
                         remaining_text = self.accumulated_response[self.last_sent_length:]
                         if remaining_text.strip():
-                            asyncio.create_task(self.agent_manager.broadcast_update({
+                            self.agent_manager.publish({
                                 "type": "agent_response",
                                 "content": remaining_text,
                                 "complete": False,
                                 "timestamp": datetime.now(timezone.utc).isoformat()
-                            }))
+                            })
                     
                     # Send completion message
-                    asyncio.create_task(self.agent_manager.broadcast_update({
+                    self.agent_manager.publish({
                         "type": "agent_response_complete",
                         "timestamp": datetime.now(timezone.utc).isoformat()
-                    }))
+                    })
                     
                     # Reset for next message
                     self.accumulated_response = ""
@@ -223,32 +302,32 @@ class WebSocketCallbackHandler:
             
             # Handle legacy callback format (avoid duplication)
             if reasoningText and reasoningText.strip():
-                asyncio.create_task(self.agent_manager.broadcast_update({
+                self.agent_manager.publish({
                     "type": "agent_thought", 
                     "content": reasoningText,
                     "timestamp": datetime.now(timezone.utc).isoformat()
-                }))
+                })
             
             # Only broadcast legacy data if no event format was handled
             if data and data.strip() and not event:
-                asyncio.create_task(self.agent_manager.broadcast_update({
+                self.agent_manager.publish({
                     "type": "agent_response",
                     "content": data,
                     "complete": complete,
                     "timestamp": datetime.now(timezone.utc).isoformat()
-                }))
+                })
             
             if current_tool_use and current_tool_use.get("name"):
                 tool_name = current_tool_use.get("name", "Unknown tool")
                 if self.previous_tool_use != current_tool_use:
                     self.previous_tool_use = current_tool_use
                     self.tool_count += 1
-                    asyncio.create_task(self.agent_manager.broadcast_update({
+                    self.agent_manager.publish({
                         "type": "tool_use",
                         "tool_name": tool_name,
                         "tool_number": self.tool_count,
                         "timestamp": datetime.now(timezone.utc).isoformat()
-                    }))
+                    })
                     
         except Exception as e:
             print(f"Error in WebSocketCallbackHandler: {e}")
@@ -285,17 +364,28 @@ class SharedAgentManager:
     
     def __init__(self):
         self.global_agent: Optional[TurnBasedAgent] = None
-        self.command_queue: Queue = Queue()
+        # Entries are (-priority, seq, command): higher priority first, FIFO within a priority
+        self.command_queue: PriorityQueue = PriorityQueue()
+        self._seq = count()
+        self._pending: List[tuple] = []  # mirror of queued entries for inspection (under processing_lock)
         self.processing_lock = threading.Lock()
         self.is_processing = False
         self.current_command: Optional[QueuedCommand] = None
-        self.websocket_connections: List[WebSocket] = []
-        self.command_history: List[QueuedCommand] = []
+        # Connected clients -> the frame format they asked for (FRAME_TEXT/FRAME_BINARY/FRAME_ZLIB)
+        self.websocket_connections: Dict[WebSocket, str] = {}
+        # Recent commands, oldest evicted first, plus an id index for status lookups
+        self.command_history: Deque[QueuedCommand] = deque(maxlen=COMMAND_HISTORY_SIZE)
+        self._history_by_id: Dict[str, QueuedCommand] = {}
         self.total_processed = 0
         
         # Initialize DynamoDB manager
         self.dynamodb_manager = DynamoDBManager()
         
+        # Outbound broadcasts: any thread publish()es, one task on the server loop sends
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._out_queue: Optional[asyncio.Queue] = None
+        self._broadcaster: Optional[asyncio.Task] = None
+        
         # Start the command processor thread
         self.executor = ThreadPoolExecutor(max_workers=1)
         self.processor_future = self.executor.submit(self._process_command_queue)
@@ -329,13 +419,16 @@ class SharedAgentManager:
             status="queued"
         )
         
-        self.command_queue.put(queued_command)
-        self.command_history.append(queued_command)
+        entry = (-priority, next(self._seq), queued_command)
+        with self.processing_lock:
+            self._pending.append(entry)
+        self.command_queue.put(entry)
+        self._remember(queued_command)
         
         # Broadcast queue update
         await self.broadcast_update({
             "type": "command_queued",
-            "command": asdict(queued_command),
+            "command": queued_command,
             "queue_length": self.command_queue.qsize()
         })
         
@@ -347,14 +440,16 @@ class SharedAgentManager:
         while True:
             try:
                 # Get next command (blocks until available)
-                command = self.command_queue.get(timeout=1.0)
+                entry = self.command_queue.get(timeout=1.0)
+                command = entry[2]
                 
                 with self.processing_lock:
                     if self.is_processing:
                         # Should not happen, but safety check
-                        self.command_queue.put(command)  # Put it back
+                        self.command_queue.put(entry)  # Put it back
                         continue
                     
+                    self._pending.remove(entry)
                     self.is_processing = True
                     self.current_command = command
                 
@@ -385,10 +480,10 @@ class SharedAgentManager:
             
             # Update command status
             command.status = "processing"
-            asyncio.run(self.broadcast_update({
+            self.publish({
                 "type": "command_started",
-                "command": asdict(command)
-            }))
+                "command": {**command.__dict__}
+            })
             
             # Execute the turn
             turn_id = self.global_agent.start_turn(
@@ -396,42 +491,35 @@ class SharedAgentManager:
                 command.persona_traits
             )
             
-            # Poll for completion (blocking)
-            max_wait = 300  # 5 minutes max
-            poll_count = 0
-            while poll_count < max_wait:
-                status = self.global_agent.get_turn_status(turn_id)
-                
-                if status:
-                    # Broadcast status update
-                    asyncio.run(self.broadcast_update({
-                        "type": "turn_update",
-                        "command_id": command.command_id,
-                        "turn_data": status
-                    }))
-                    
-                    if status["status"] in ["completed", "error"]:
-                        command.status = "completed" if status["status"] == "completed" else "failed"
-                        break
+            # Block until the turn finishes (no polling); the agent's streaming output reaches
+            # clients through the callback handler meanwhile
+            self.global_agent.wait_turn(turn_id, timeout=COMMAND_TIMEOUT)
+            status = self.global_agent.get_turn_status(turn_id)
+            if status:
+                self.publish({
+                    "type": "turn_update",
+                    "command_id": command.command_id,
+                    "turn_data": status
+                })
                 
-                poll_count += 1
-                asyncio.run(asyncio.sleep(1))
+                if status["status"] in ["completed", "error"]:
+                    command.status = "completed" if status["status"] == "completed" else "failed"
             
             # Final broadcast
-            asyncio.run(self.broadcast_update({
+            self.publish({
                 "type": "command_completed",
-                "command": asdict(command),
+                "command": {**command.__dict__},
                 "queue_length": self.command_queue.qsize()
-            }))
+            })
             
         except Exception as e:
             command.status = "failed"
             print(f"Command execution failed: {e}")
-            asyncio.run(self.broadcast_update({
+            self.publish({
                 "type": "command_failed",
-                "command": asdict(command),
+                "command": {**command.__dict__},
                 "error": str(e)
-            }))
+            })
     
     async def broadcast_update(self, message: Dict):
         """Broadcast message to all connected WebSocket clients"""
@@ -439,30 +527,73 @@ class SharedAgentManager:
             return
             
         message["timestamp"] = datetime.now(timezone.utc).isoformat()
-        message_text = json.dumps(message)
+        # Serialize once, and build each frame format in use once, for every recipient
+        payload = _dumpb(message)
         
-        disconnected = []
-        for websocket in self.websocket_connections:
-            try:
-                await websocket.send_text(message_text)
-            except Exception as e:
-                print(f"WebSocket send failed: {e}")
-                disconnected.append(websocket)
+        # Sends run concurrently so one slow peer doesn't hold up the rest; clients iterate over a
+        # snapshot because /ws handlers connect and disconnect while the sends are awaited.
+        sem = asyncio.Semaphore(BROADCAST_MAX_CONCURRENT_SENDS)
+        
+        async def safe_send(websocket: WebSocket, frame):
+            async with sem:
+                try:
+                    await asyncio.wait_for(_send_frame(websocket, frame), timeout=BROADCAST_SEND_TIMEOUT)
+                    return websocket, True
+                except (asyncio.TimeoutError, *_WS_SEND_ERRORS) as e:
+                    print(f"WebSocket send failed: {type(e).__name__}: {e}")
+                    return websocket, False
         
-        # Remove disconnected clients
-        for ws in disconnected:
-            if ws in self.websocket_connections:
-                self.websocket_connections.remove(ws)
+        clients = tuple(self.websocket_connections.items())
+        frames = {mode: _frame(payload, mode) for mode in {mode for _, mode in clients}}
+        results = await asyncio.gather(*(safe_send(ws, frames[mode]) for ws, mode in clients))
+        
+        # Remove disconnected (or stalled) clients
+        for ws, ok in results:
+            if not ok:
+                self.websocket_connections.pop(ws, None)
+    
+    def start_broadcaster(self):
+        """Start the broadcaster task; call from the server's event loop at startup"""
+        self._loop = asyncio.get_running_loop()
+        self._out_queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+        self._broadcaster = self._loop.create_task(self._broadcast_loop())
+    
+    def publish(self, message: Dict):
+        """Queue a message for broadcast. Safe to call from any thread (e.g. the agent's streaming callback)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, message)
+        except RuntimeError:
+            pass  # loop closed after the check above (server shutting down)
     
-    def add_websocket(self, websocket: WebSocket):
+    def _enqueue(self, message: Dict):
+        try:
+            self._out_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            print(f"Broadcast queue full; dropping {message.get('type')} update")
+    
+    async def _broadcast_loop(self):
+        """Send queued messages, merging runs of streamed response fragments into one frame"""
+        while True:
+            batch = [await self._out_queue.get()]
+            while len(batch) < BROADCAST_BATCH_SIZE and not self._out_queue.empty():
+                batch.append(self._out_queue.get_nowait())
+            for message in _merge_fragments(batch):
+                try:
+                    await self.broadcast_update(message)
+                except Exception as e:
+                    print(f"Broadcast failed: {e}")
+    
+    def add_websocket(self, websocket: WebSocket, mode: str = FRAME_TEXT):
         """Add a WebSocket connection"""
-        self.websocket_connections.append(websocket)
+        self.websocket_connections[websocket] = mode
         print(f"WebSocket connected. Total connections: {len(self.websocket_connections)}")
     
     def remove_websocket(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
-        if websocket in self.websocket_connections:
-            self.websocket_connections.remove(websocket)
+        self.websocket_connections.pop(websocket, None)
         print(f"WebSocket disconnected. Total connections: {len(self.websocket_connections)}")
     
     def get_status(self) -> GlobalAgentStatus:
@@ -477,34 +608,32 @@ class SharedAgentManager:
             )
     
     def get_queue_status(self) -> List[Dict]:
-        """Get current queue status"""
-        queue_items = []
-        temp_queue = Queue()
-        
-        # Extract items to view them
-        while not self.command_queue.empty():
-            try:
-                item = self.command_queue.get_nowait()
-                queue_items.append(asdict(item))
-                temp_queue.put(item)
-            except Empty:
-                break
-        
-        # Put items back
-        while not temp_queue.empty():
-            self.command_queue.put(temp_queue.get_nowait())
-        
-        return queue_items
+        """Get current queue status, in processing order"""
+        with self.processing_lock:
+            pending = sorted(self._pending, key=lambda e: e[:2])
+        return [{**cmd.__dict__} for _, _, cmd in pending]
+    
+    def _remember(self, command: QueuedCommand):
+        """Append to command_history, dropping the evicted command from the id index"""
+        if len(self.command_history) == self.command_history.maxlen:
+            self._history_by_id.pop(self.command_history[0].command_id, None)
+        self.command_history.append(command)
+        self._history_by_id[command.command_id] = command
+    
+    def find_command(self, command_id: str) -> Optional[QueuedCommand]:
+        return self._history_by_id.get(command_id)
     
     def get_history(self) -> List[Dict]:
         """Get command history"""
-        return [asdict(cmd) for cmd in self.command_history[-50:]]  # Last 50 commands
+        start = max(0, len(self.command_history) - 50)  # Last 50 commands
+        return [{**cmd.__dict__} for cmd in islice(self.command_history, start, None)]
 
 # Create FastAPI app
 app = FastAPI(
     title="Shared Strands Agent Server",
     description="Global shared agent with command queue and broadcasting",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
 )
 
 # Add CORS middleware with specific origins
@@ -524,6 +653,10 @@ app.add_middleware(
 # Global shared agent manager
 shared_manager = SharedAgentManager()
 
+@app.on_event("startup")
+async def _start_broadcaster():
+    shared_manager.start_broadcaster()
+
 @app.get("/")
 async def root():
     """Health check and status"""
@@ -531,7 +664,7 @@ async def root():
     return {
         "service": "Shared Strands Agent Server",
         "status": "running",
-        "agent_status": asdict(status),
+        "agent_status": status,
         "connected_clients": len(shared_manager.websocket_connections),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
@@ -559,8 +692,7 @@ async def add_command(request: CommandRequest):
 @app.get("/api/status")
 async def get_status():
     """Get global agent status"""
-    status = shared_manager.get_status()
-    return asdict(status)
+    return shared_manager.get_status()
 
 @app.get("/api/queue")
 async def get_queue():
@@ -602,46 +734,66 @@ async def get_agent_thoughts(limit: int = 50):
 
 @app.websocket("/ws")
 async def websocket_global_endpoint(websocket: WebSocket):
-    """Global WebSocket endpoint - all clients get the same messages"""
+    """Global WebSocket endpoint - all clients get the same messages
+
+    Frames are JSON text by default. Connect with ?binary=1 to receive the same JSON as binary
+    messages (UTF-8 bytes), or with ?compress=zlib to receive it zlib-compressed in binary messages.
+    """
+    if websocket.query_params.get("compress") == "zlib":
+        mode = FRAME_ZLIB
+    elif websocket.query_params.get("binary") in ("1", "true"):
+        mode = FRAME_BINARY
+    else:
+        mode = FRAME_TEXT
+    
+    async def send(obj: Dict):
+        await _send_frame(websocket, _frame(_dumpb(obj), mode))
+    
     await websocket.accept()
-    shared_manager.add_websocket(websocket)
+    shared_manager.add_websocket(websocket, mode)
     
     # Send initial status
     status = shared_manager.get_status()
-    await websocket.send_text(json.dumps({
+    await send({
         "type": "initial_status",
-        "agent_status": asdict(status),
+        "agent_status": status,
         "connected_clients": len(shared_manager.websocket_connections),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }))
+    })
     
-    try:
-        while True:
-            try:
-                # Wait for client messages (ping, etc.)
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                
-                if message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-                elif message.get("type") == "get_status":
-                    status = shared_manager.get_status()
-                    await websocket.send_text(json.dumps({
-                        "type": "status_response",
-                        "agent_status": asdict(status)
-                    }))
-                
-            except asyncio.TimeoutError:
-                # Send periodic heartbeat
-                await websocket.send_text(json.dumps({
+    async def heartbeat():
+        # Periodic keepalive, independent of whether the client sends anything
+        try:
+            while True:
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                await send({
                     "type": "heartbeat",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                     "connected_clients": len(shared_manager.websocket_connections)
-                }))
+                })
+        except _WS_SEND_ERRORS:
+            pass
+    
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        while True:
+            # Wait for client messages (ping, etc.)
+            data = await websocket.receive_text()
+            message = json.loads(data)
+            
+            if message.get("type") == "ping":
+                await _send_frame(websocket, _PONG[mode])
+            elif message.get("type") == "get_status":
+                status = shared_manager.get_status()
+                await send({
+                    "type": "status_response",
+                    "agent_status": status
+                })
                 
     except WebSocketDisconnect:
         pass
     finally:
+        heartbeat_task.cancel()
         shared_manager.remove_websocket(websocket)
 
 # Legacy compatibility endpoints
@@ -665,16 +817,15 @@ async def start_turn_legacy(request: Dict[str, Any]):
 @app.get("/api/turn_status/{turn_id}")
 async def get_turn_status_legacy(turn_id: str):
     """Legacy compatibility - get command status"""
-    # Find command in history
-    for cmd in shared_manager.command_history:
-        if cmd.command_id == turn_id:
-            return {
-                "turn_id": turn_id,
-                "status": cmd.status,
-                "prompt": cmd.prompt,
-                "timestamp": cmd.timestamp,
-                "command_id": cmd.command_id
-            }
+    cmd = shared_manager.find_command(turn_id)
+    if cmd is not None:
+        return {
+            "turn_id": turn_id,
+            "status": cmd.status,
+            "prompt": cmd.prompt,
+            "timestamp": cmd.timestamp,
+            "command_id": cmd.command_id
+        }
     
     raise HTTPException(status_code=404, detail="Command not found")
 
@@ -708,11 +859,18 @@ if __name__ == "__main__":
             print("SSL certificates not found! Please generate cert.pem and key.pem")
             sys.exit(1)
     
+    # Pass the app object (not "shared_agent_server:app") so the module, and with it the shared
+    # manager and its processor thread, isn't imported a second time. "auto" picks uvloop and
+    # httptools when installed (uvloop isn't available on Windows, where this falls back to asyncio).
     uvicorn.run(
-        "shared_agent_server:app",
+        app,
         host=args.host,
         port=args.port,
         reload=False,  # Don't reload in shared mode
+        loop="auto",
+        http="auto",
+        ws="auto",
+        backlog=4096,
         log_level="info",
         ssl_keyfile=ssl_keyfile,
         ssl_certfile=ssl_certfile
@@ -6,22 +6,28 @@ Bridges CloudFront frontend to Unreal Engine Strands agents with persistent stat
 
 import os
 import sys
+import site
 import json
 import time
 import socket
+import mmap
+import gzip
+import hashlib
 import uuid
 import asyncio
 import threading
+from io import BytesIO
 from pathlib import Path
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 
 # Add likely native DLL locations to the DLL search path
 def _add_dll_dir(p: Path):
     try:
-        if p and p.is_dir():
+        if p.is_dir():
             os.add_dll_directory(str(p))
     except Exception:
         pass
@@ -30,12 +36,19 @@ def _add_dll_dir(p: Path):
 _project_root = Path(__file__).resolve().parents[2]
 _site = _project_root / "Intermediate" / "PipInstall" / "Lib" / "site-packages"
 
-if str(_site) not in sys.path:
-    sys.path.insert(0, str(_site))
-
-# Common native lib locations
-for sub in ["numpy/.libs", "numpy/core", "cv2", ""]:
-    _add_dll_dir((_site / sub) if sub else _site)
+# Ensure Python can import packages installed by UE's PipInstall
+if _site.is_dir():
+    # Skipped when a parent server already put the dir on sys.path. Otherwise prepend so these
+    # win over the embedded interpreter's own packages, then let site process the directory's
+    # .pth files (addsitedir won't re-add a path already present)
+    if str(_site) not in sys.path:
+        sys.path.insert(0, str(_site))
+        site.addsitedir(str(_site))
+    # Common native lib locations, registered whoever set up sys.path
+    # (os.add_dll_directory is Windows-only)
+    if hasattr(os, "add_dll_directory"):
+        for sub in ("numpy/.libs", "numpy/core", "cv2", ""):
+            _add_dll_dir((_site / sub) if sub else _site)
 
 from mcp.client.streamable_http import streamablehttp_client
 from strands.agent import Agent
@@ -45,11 +58,47 @@ from strands.hooks import BeforeInvocationEvent, AfterInvocationEvent, HookProvi
 
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
     from botocore.exceptions import ClientError
 except ImportError:
     boto3 = None
+    TransferConfig = None
     ClientError = Exception
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # OS-level file notifications (inotify / ReadDirectoryChangesW / FSEvents)
+    from watchfiles import watch
+except ImportError:
+    watch = None
+
+# Turns kept for status/history lookups, and turns allowed to wait or run at once before
+# start_turn sheds new ones
+TURN_HISTORY_SIZE = 100
+MAX_PENDING_TURNS = 4
+
+# Objects above the threshold go up as multipart, with parts sent in parallel
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 10
+# JSON bodies above this size are stored gzip-encoded (Content-Encoding: gzip; browsers and
+# CloudFront decode it transparently, so keys and URLs stay .json)
+S3_GZIP_MIN_BYTES = 4096
+
+# Upload Content-Type by file extension (no leading dot)
+_CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'json': 'application/json',
+    'txt': 'text/plain',
+    'log': 'text/plain'
+}
+
 @dataclass
 class TurnState:
     """Represents the state of a single turn"""
@@ -70,6 +119,22 @@ class TurnState:
             self.thoughts = []
         if self.s3_urls is None:
             self.s3_urls = {}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the fields (unlike asdict(), no deep copy of env_state). The two
+        containers mutated while a turn runs are copied so callers get a stable view.
+        Once the turn is finished (see finish()) the same cached dict is returned every time."""
+        cached = self.__dict__.get("_final")
+        if cached is not None:
+            return cached
+        d = dict(self.__dict__)
+        d["thoughts"] = list(self.thoughts)
+        d["s3_urls"] = dict(self.s3_urls)
+        return d
+    
+    def finish(self):
+        """Cache the serialized turn; call once processing is over and the turn no longer changes"""
+        self._final = self.to_dict()
 
 class S3Manager:
     """Handles S3 operations for storing Strands outputs"""
@@ -78,58 +143,99 @@ class S3Manager:
         self.bucket_name = bucket_name
         self.region = region
         self.s3_client = None
+        self._tx_cfg = None
+        # slot ("screenshot", "env_state", ...) -> (content digest, URL) of its last upload
+        self._last_uploads: Dict[str, Tuple[bytes, str]] = {}
         if boto3:
             try:
                 self.s3_client = boto3.client('s3', region_name=region)
+                self._tx_cfg = TransferConfig(
+                    multipart_threshold=S3_MULTIPART_THRESHOLD,
+                    multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+                    max_concurrency=S3_MAX_CONCURRENCY,
+                    use_threads=True
+                )
             except Exception as e:
                 print(f"Failed to initialize S3 client: {e}")
     
-    def upload_file(self, local_path: Path, s3_key: str) -> Optional[str]:
-        """Upload a file to S3 and return the URL"""
+    def _unchanged(self, slot: Optional[str], data) -> Tuple[Optional[bytes], Optional[str]]:
+        """Digest data for slot; returns (digest, previous URL if the content is unchanged)"""
+        if slot is None:
+            return None, None
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        last = self._last_uploads.get(slot)
+        return digest, (last[1] if last and last[0] == digest else None)
+    
+    def upload_file(self, local_path: Path, s3_key: str, slot: Optional[str] = None) -> Optional[str]:
+        """Upload a file to S3 and return the URL. With a slot, a file identical to the slot's
+        previous upload isn't sent again; the previous URL is returned instead."""
         if not self.s3_client or not local_path.exists():
             return None
             
         try:
-            self.s3_client.upload_file(
-                str(local_path),
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={'ContentType': self._get_content_type(local_path)}
-            )
-            return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
+            extra_args = {'ContentType': self._get_content_type(local_path)}
+            with open(local_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # mmap can't map an empty file
+                    self.s3_client.upload_fileobj(f, self.bucket_name, s3_key, ExtraArgs=extra_args)
+                else:
+                    # Upload straight from the page cache instead of through Python read buffers
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        digest, previous = self._unchanged(slot, mm)
+                        if previous:
+                            return previous
+                        self.s3_client.upload_fileobj(
+                            mm,
+                            self.bucket_name,
+                            s3_key,
+                            ExtraArgs=extra_args,
+                            Config=self._tx_cfg
+                        )
+                        if digest:
+                            self._last_uploads[slot] = (digest, self._url(s3_key))
+            return self._url(s3_key)
         except Exception as e:
             print(f"Failed to upload {local_path} to S3: {e}")
             return None
     
-    def upload_json(self, data: Dict, s3_key: str) -> Optional[str]:
-        """Upload JSON data directly to S3"""
+    def upload_json(self, data: Dict, s3_key: str, slot: Optional[str] = None) -> Optional[str]:
+        """Upload JSON data directly to S3 (slot as for upload_file)"""
         if not self.s3_client:
             return None
             
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=json.dumps(data, indent=2),
-                ContentType='application/json'
+            if orjson is not None:
+                body = orjson.dumps(data)
+            else:
+                body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            digest, previous = self._unchanged(slot, body)
+            if previous:
+                return previous
+            extra_args = {'ContentType': 'application/json'}
+            if len(body) > S3_GZIP_MIN_BYTES:
+                body = gzip.compress(body, compresslevel=1)
+                extra_args['ContentEncoding'] = 'gzip'
+            self.s3_client.upload_fileobj(
+                BytesIO(body),
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args,
+                Config=self._tx_cfg
             )
-            return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
+            if digest:
+                self._last_uploads[slot] = (digest, self._url(s3_key))
+            return self._url(s3_key)
         except Exception as e:
             print(f"Failed to upload JSON to S3: {e}")
             return None
     
+    def _url(self, s3_key: str) -> str:
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
+    
     def _get_content_type(self, file_path: Path) -> str:
         """Determine content type based on file extension"""
-        suffix = file_path.suffix.lower()
-        content_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.json': 'application/json',
-            '.txt': 'text/plain',
-            '.log': 'text/plain'
-        }
-        return content_types.get(suffix, 'application/octet-stream')
+        _, dot, ext = file_path.name.rpartition('.')
+        return _CONTENT_TYPES.get(ext.lower() if dot else '', 'application/octet-stream')
 
 class TurnBasedAgent:
     """Main turn-based agent system"""
@@ -140,7 +246,9 @@ class TurnBasedAgent:
                  s3_bucket: Optional[str] = None,
                  unreal_host: str = "127.0.0.1",
                  unreal_port: int = 17777,
-                 callback_handler: Optional[Any] = None):
+                 callback_handler: Optional[Any] = None,
+                 max_history: int = TURN_HISTORY_SIZE,
+                 max_pending: int = MAX_PENDING_TURNS):
         self.session_id = session_id or f"session-{int(time.time())}"
         self.mcp_url = mcp_url
         self.unreal_host = unreal_host
@@ -156,39 +264,129 @@ class TurnBasedAgent:
         self.saved_dir.mkdir(parents=True, exist_ok=True)
         
         # State storage
-        self.turns_history: List[TurnState] = []
+        self.turns_history: Deque[TurnState] = deque(maxlen=max_history)
+        self.turn_count = 0  # all turns started, including those evicted from turns_history
         self.agent_instance: Optional[Agent] = None
         self.session_manager: Optional[FileSessionManager] = None
         
         # Threading for non-blocking operations
         self.executor = ThreadPoolExecutor(max_workers=2)
+        # Separate pool for a turn's own blocking I/O (Unreal captures, S3 uploads), so that work
+        # never queues behind turns on self.executor
+        self._io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="turn-io")
+        self._turn_futures: Dict[str, Future] = {}  # turn_id -> future, for turns in turns_history
+        self.max_pending = max_pending
+        self._pending = 0  # turns submitted and not yet finished
+        self._pending_lock = threading.Lock()
         
+        # Persistent connection to StrandsInputServer, reused across commands and turns
+        self._ue_sock: Optional[socket.socket] = None
+        self._ue_lock = threading.Lock()
+        
+    def _connect_unreal(self) -> socket.socket:
+        sock = socket.create_connection((self.unreal_host, self.unreal_port), timeout=2.0)
+        # Small single-line commands: send them now rather than waiting out Nagle/delayed ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._ue_sock = sock
+        return sock
+    
+    @staticmethod
+    def _alive(sock: socket.socket) -> bool:
+        """False once Unreal has closed the connection (PIE stopped, level changed): a send on
+        the stale socket would still be accepted by the kernel and the command silently lost."""
+        timeout = sock.gettimeout()
+        try:
+            sock.setblocking(False)
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except BlockingIOError:
+            return True  # open, nothing to read
+        except OSError:
+            return False
+        finally:
+            try:
+                sock.settimeout(timeout)
+            except OSError:
+                pass
+    
+    def _close_unreal(self):
+        sock, self._ue_sock = self._ue_sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+    
     def _send_unreal_command(self, payload: Dict) -> bool:
         """Send command to Unreal Engine"""
         try:
             line = json.dumps(payload, separators=(",", ":")) + "\n"
             data = line.encode("utf-8")
-            with socket.create_connection((self.unreal_host, self.unreal_port), timeout=2.0) as sock:
-                sock.sendall(data)
+            with self._ue_lock:
+                sock = self._ue_sock
+                if sock is None or not self._alive(sock):
+                    self._close_unreal()
+                    sock = self._connect_unreal()
+                try:
+                    sock.sendall(data)
+                except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                    # Unreal restarted or dropped us; reconnect once and retry
+                    self._close_unreal()
+                    self._connect_unreal().sendall(data)
+                except OSError:
+                    self._close_unreal()
+                    raise
             return True
         except Exception as e:
             print(f"Failed to send Unreal command: {e}")
             return False
     
+    @staticmethod
+    def _file_ready(path: Path, start_time: float) -> bool:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return st.st_mtime > start_time and st.st_size > 0
+    
     def _wait_for_file(self, path: Path, start_time: float, timeout: float = 15.0) -> bool:
-        """Wait for file to appear with newer timestamp"""
-        deadline = start_time + timeout
-        while time.time() < deadline:
+        """Wait for file to appear with newer timestamp.
+        
+        Uses OS file notifications on the parent directory when watchfiles is installed,
+        otherwise polls every 100ms.
+        """
+        if self._file_ready(path, start_time):
+            return True
+        deadline = time.monotonic() + max(0.0, start_time + timeout - time.time())
+        if watch is not None:
             try:
-                if path.exists() and path.stat().st_mtime > start_time and path.stat().st_size > 0:
-                    return True
-            except FileNotFoundError:
-                pass
+                # rust_timeout bounds each wait so the deadline (and a write that landed before
+                # the watcher was armed) is re-checked at least every 500ms
+                for _changes in watch(
+                    path.parent,
+                    watch_filter=lambda _change, p: Path(p).name == path.name,
+                    step=10,
+                    rust_timeout=500,
+                    yield_on_timeout=True,
+                    recursive=False,
+                ):
+                    if self._file_ready(path, start_time):
+                        return True
+                    if time.monotonic() >= deadline:
+                        return False
+            except Exception:
+                pass  # watcher unavailable (e.g. unsupported filesystem); poll instead
+        while time.monotonic() < deadline:
+            if self._file_ready(path, start_time):
+                return True
             time.sleep(0.1)
         return False
     
-    def _capture_screenshot(self, turn_id: str) -> Optional[Path]:
-        """Capture screenshot from Unreal Engine"""
+    # Captures are split into a request half (send the command) and a collect half (wait for
+    # Unreal's file) so a turn can issue both commands before waiting on either.
+    # A request returns (path, start_time), or None if the command couldn't be sent.
+    
+    def _request_screenshot(self, turn_id: str) -> Optional[Tuple[Path, float]]:
         screenshot_path = self.saved_dir / f"turn_{turn_id}_screenshot.png"
         start_time = time.time()
         
@@ -197,12 +395,15 @@ class TurnBasedAgent:
             "path": str(screenshot_path), 
             "showUI": False
         }):
-            if self._wait_for_file(screenshot_path, start_time):
-                return screenshot_path
+            return screenshot_path, start_time
         return None
     
-    def _capture_env_state(self, turn_id: str) -> Optional[Dict]:
-        """Capture environment state from Unreal Engine"""
+    def _collect_screenshot(self, request: Optional[Tuple[Path, float]]) -> Optional[Path]:
+        if request and self._wait_for_file(*request):
+            return request[0]
+        return None
+    
+    def _request_env_state(self, turn_id: str) -> Optional[Tuple[Path, float]]:
         state_path = self.saved_dir / f"turn_{turn_id}_state.json"
         start_time = time.time()
         
@@ -210,13 +411,25 @@ class TurnBasedAgent:
             "cmd": "state", 
             "path": str(state_path)
         }):
-            if self._wait_for_file(state_path, start_time):
-                try:
-                    return json.loads(state_path.read_text(encoding="utf-8-sig"))
-                except Exception as e:
-                    print(f"Failed to parse state file: {e}")
+            return state_path, start_time
+        return None
+    
+    def _collect_env_state(self, request: Optional[Tuple[Path, float]]) -> Optional[Dict]:
+        if request and self._wait_for_file(*request):
+            try:
+                return json.loads(request[0].read_text(encoding="utf-8-sig"))
+            except Exception as e:
+                print(f"Failed to parse state file: {e}")
         return None
     
+    def _capture_screenshot(self, turn_id: str) -> Optional[Path]:
+        """Capture screenshot from Unreal Engine"""
+        return self._collect_screenshot(self._request_screenshot(turn_id))
+    
+    def _capture_env_state(self, turn_id: str) -> Optional[Dict]:
+        """Capture environment state from Unreal Engine"""
+        return self._collect_env_state(self._request_env_state(turn_id))
+    
     def _setup_agent(self) -> bool:
         """Initialize the Strands agent with MCP tools"""
         try:
@@ -269,7 +482,7 @@ class TurnBasedAgent:
         """Start a new turn with the given prompt"""
         turn_id = str(uuid.uuid4())[:8]
         
-        self.current_turn = TurnState(
+        turn = TurnState(
             turn_id=turn_id,
             session_id=self.session_id,
             timestamp=datetime.now(timezone.utc).isoformat(),
@@ -277,32 +490,56 @@ class TurnBasedAgent:
             status="pending"
         )
         
-        self.turns_history.append(self.current_turn)
-        
-        # Start turn processing in background
-        self.executor.submit(self._process_turn, persona_traits)
+        with self._pending_lock:
+            # The turn about to be evicted from turns_history takes its future with it
+            if len(self.turns_history) == self.turns_history.maxlen:
+                self._turn_futures.pop(self.turns_history[0].turn_id, None)
+            self.turns_history.append(turn)
+            self.turn_count += 1
+            
+            if self._pending >= self.max_pending:
+                # Backlogged: fail this turn now instead of queueing it behind the others
+                turn.status = "error"
+                turn.error_message = f"too many pending turns ({self._pending})"
+                future = Future()
+                future.set_result(None)
+                self._turn_futures[turn_id] = future
+                return turn_id
+            self._pending += 1
+            
+            self.current_turn = turn
+            
+            # Start turn processing in background
+            future = self.executor.submit(self._process_turn, turn, persona_traits)
+            future.add_done_callback(self._turn_done)
+            self._turn_futures[turn_id] = future
         
         return turn_id
     
-    def _process_turn(self, persona_traits: Optional[Dict] = None):
+    def _turn_done(self, _future: Future):
+        with self._pending_lock:
+            self._pending -= 1
+    
+    def _process_turn(self, turn: TurnState, persona_traits: Optional[Dict] = None):
         """Process a turn in the background"""
-        if not self.current_turn:
-            return
-            
         try:
-            self.current_turn.status = "running"
+            turn.status = "running"
             
             # Setup agent if not already done
             if not self.agent_instance and not self._setup_agent():
                 raise Exception("Failed to setup agent")
             
-            # Capture pre-turn state
-            self.current_turn.env_state = self._capture_env_state(self.current_turn.turn_id)
-            screenshot_path = self._capture_screenshot(self.current_turn.turn_id)
-            self.current_turn.screenshot_path = str(screenshot_path) if screenshot_path else None
+            # Capture pre-turn state and screenshot: send both commands back to back, then
+            # wait for the two files concurrently
+            state_request = self._request_env_state(turn.turn_id)
+            screenshot_request = self._request_screenshot(turn.turn_id)
+            state_capture = self._io_executor.submit(self._collect_env_state, state_request)
+            screenshot_path = self._collect_screenshot(screenshot_request)
+            turn.env_state = state_capture.result()
+            turn.screenshot_path = str(screenshot_path) if screenshot_path else None
             
             # Add persona context if provided
-            context_prompt = self.current_turn.prompt
+            context_prompt = turn.prompt
             if persona_traits:
                 if isinstance(persona_traits, dict) and 'persona' in persona_traits:
                     # New detailed persona format
@@ -313,67 +550,82 @@ class TurnBasedAgent:
                 context_prompt = persona_context + context_prompt
             
             # Add environment context
-            if self.current_turn.env_state:
-                pos = self.current_turn.env_state.get("pos", [0, 0, 0])
+            if turn.env_state:
+                pos = turn.env_state.get("pos", [0, 0, 0])
                 context_prompt += f"\nCurrent position: ({pos[0]:.1f}, {pos[1]:.1f}, {pos[2]:.1f})"
             
             # Run agent
             response = self.agent_instance(context_prompt)
-            self.current_turn.agent_response = str(response)
+            turn.agent_response = str(response)
             
             # Upload to S3 if configured
             if self.s3_manager:
-                s3_prefix = f"strands-turns/{self.session_id}/{self.current_turn.turn_id}"
+                s3_prefix = f"strands-turns/{self.session_id}/{turn.turn_id}"
                 
-                # Upload screenshot
+                # Upload screenshot and state concurrently
+                uploads: Dict[str, Future] = {}
                 if screenshot_path and screenshot_path.exists():
-                    screenshot_url = self.s3_manager.upload_file(
+                    uploads["screenshot"] = self._io_executor.submit(
+                        self.s3_manager.upload_file,
                         screenshot_path, 
-                        f"{s3_prefix}/screenshot.png"
+                        f"{s3_prefix}/screenshot.png",
+                        "screenshot"
                     )
-                    if screenshot_url:
-                        self.current_turn.s3_urls["screenshot"] = screenshot_url
-                
-                # Upload state
-                if self.current_turn.env_state:
-                    state_url = self.s3_manager.upload_json(
-                        self.current_turn.env_state,
-                        f"{s3_prefix}/env_state.json"
+                if turn.env_state:
+                    uploads["env_state"] = self._io_executor.submit(
+                        self.s3_manager.upload_json,
+                        turn.env_state,
+                        f"{s3_prefix}/env_state.json",
+                        "env_state"
                     )
-                    if state_url:
-                        self.current_turn.s3_urls["env_state"] = state_url
+                for name, upload in uploads.items():
+                    url = upload.result()
+                    if url:
+                        turn.s3_urls[name] = url
                 
-                # Upload turn data
+                # Upload turn data (after the others, so it records their URLs)
                 turn_data_url = self.s3_manager.upload_json(
-                    asdict(self.current_turn),
+                    turn.to_dict(),
                     f"{s3_prefix}/turn_data.json"
                 )
                 if turn_data_url:
-                    self.current_turn.s3_urls["turn_data"] = turn_data_url
+                    turn.s3_urls["turn_data"] = turn_data_url
             
-            self.current_turn.status = "completed"
+            turn.status = "completed"
             
         except Exception as e:
-            self.current_turn.status = "error"
-            self.current_turn.error_message = str(e)
+            turn.status = "error"
+            turn.error_message = str(e)
             print(f"Turn processing error: {e}")
+        
+        # Status polls of the finished turn now reuse one dict
+        turn.finish()
+    
+    def wait_turn(self, turn_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until turn turn_id finishes processing. Returns False on timeout or if the
+        turn is unknown (or already evicted from turns_history)."""
+        future = self._turn_futures.get(turn_id)
+        if future is None:
+            return False
+        done, _ = wait([future], timeout=timeout)
+        return bool(done)
     
     def get_turn_status(self, turn_id: str) -> Optional[Dict]:
         """Get the status of a specific turn"""
         for turn in self.turns_history:
             if turn.turn_id == turn_id:
-                return asdict(turn)
+                return turn.to_dict()
         return None
     
     def get_current_turn_status(self) -> Optional[Dict]:
         """Get the status of the current turn"""
         if self.current_turn:
-            return asdict(self.current_turn)
+            return self.current_turn.to_dict()
         return None
     
     def get_session_history(self) -> List[Dict]:
         """Get all turns in the current session"""
-        return [asdict(turn) for turn in self.turns_history]
+        return [turn.to_dict() for turn in self.turns_history]
     
     def cleanup(self):
         """Cleanup resources"""
@@ -382,21 +634,73 @@ class TurnBasedAgent:
                 self.streamable_http_mcp_client.__exit__(None, None, None)
             except:
                 pass
+        with self._ue_lock:
+            self._close_unreal()
         self.executor.shutdown(wait=False)
+        self._io_executor.shutdown(wait=False)
+
+# Port for --serve: a long-lived TurnBasedAgent that keeps its MCP client and Agent between turns
+DAEMON_PORT = 17778
+
+def serve(agent_system: TurnBasedAgent, port: int = DAEMON_PORT):
+    """Accept newline-delimited JSON requests {"prompt", "persona", "wait"} on localhost and
+    answer each with one JSON line: the finished turn's status, or its id if not waiting."""
+    import socketserver
+    
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                try:
+                    request = json.loads(raw)
+                    prompt = str(request.get("prompt") or "").strip()
+                    if not prompt:
+                        raise ValueError("missing prompt")
+                except Exception as e:
+                    reply = {"status": "error", "error": f"bad request: {e}"}
+                else:
+                    turn_id = agent_system.start_turn(prompt, request.get("persona"))
+                    if request.get("wait"):
+                        finished = agent_system.wait_turn(turn_id)
+                        reply = (finished and agent_system.get_turn_status(turn_id)) or {
+                            "turn_id": turn_id, "status": "error", "error": "turn is no longer tracked"
+                        }
+                    else:
+                        reply = {"turn_id": turn_id, "status": "started"}
+                self.wfile.write((json.dumps(reply, separators=(",", ":")) + "\n").encode("utf-8"))
+    
+    with socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler) as server:
+        server.daemon_threads = True
+        print(f"Serving turns on 127.0.0.1:{port}")
+        server.serve_forever()
+
+def _send_to_daemon(port: int, request: Dict) -> Dict:
+    """Send one request to a running --serve process and return its reply"""
+    with socket.create_connection(("127.0.0.1", port), timeout=2.0) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall((json.dumps(request, separators=(",", ":")) + "\n").encode("utf-8"))
+        sock.settimeout(None)  # a waited turn can take minutes
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
 
 # CLI interface for testing
 def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Turn-based Strands Agent System")
-    parser.add_argument("--prompt", required=True, help="Prompt for the agent")
+    parser.add_argument("--prompt", help="Prompt for the agent")
     parser.add_argument("--session-id", help="Session ID for persistence")
     parser.add_argument("--mcp-url", default="http://localhost:8000/mcp", help="MCP server URL")
     parser.add_argument("--s3-bucket", help="S3 bucket for storing outputs")
     parser.add_argument("--persona", help="JSON string with persona traits")
     parser.add_argument("--wait", action="store_true", help="Wait for turn to complete")
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep one agent running and take turns over localhost TCP (see --port)")
+    parser.add_argument("--daemon", action="store_true", help="Send the turn to a running --serve process")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="Port for --serve/--daemon")
     
     args = parser.parse_args()
+    if not args.serve and not args.prompt:
+        parser.error("--prompt is required unless --serve is given")
     
     # Parse persona traits if provided
     persona_traits = None
@@ -407,6 +711,15 @@ def main():
             print(f"Failed to parse persona: {e}")
             sys.exit(1)
     
+    if args.daemon:
+        try:
+            reply = _send_to_daemon(args.port, {"prompt": args.prompt, "persona": persona_traits, "wait": args.wait})
+        except OSError as e:
+            print(f"Failed to reach turn daemon on port {args.port}: {e}")
+            sys.exit(1)
+        print(json.dumps(reply, indent=2) if args.wait else json.dumps(reply))
+        return
+    
     # Create agent system
     agent_system = TurnBasedAgent(
         session_id=args.session_id,
@@ -415,18 +728,20 @@ def main():
     )
     
     try:
+        if args.serve:
+            serve(agent_system, args.port)
+            return
+        
         # Start turn
         turn_id = agent_system.start_turn(args.prompt, persona_traits)
         print(f"Started turn: {turn_id}")
         
         if args.wait:
             # Wait for completion
-            while True:
-                status = agent_system.get_current_turn_status()
-                if status and status["status"] in ["completed", "error"]:
-                    print(json.dumps(status, indent=2))
-                    break
-                time.sleep(1)
+            if not agent_system.wait_turn(turn_id):
+                print(f"Turn {turn_id} is no longer tracked")
+                sys.exit(1)
+            print(json.dumps(agent_system.get_turn_status(turn_id), indent=2))
         else:
             # Just return the turn ID
             print(json.dumps({"turn_id": turn_id, "status": "started"}))
@@ -1,101 +1,49 @@
 import carla
 import math
 import random
-import time
 import queue
+import threading
+import multiprocessing as mp
 import numpy as np
 import cv2
 import os
-from transformers import AutoTokenizer, AutoImageProcessor, VisionEncoderDecoderModel, AutoModelForCausalLM
-from PIL import Image
-
-client = carla.Client('localhost', 2000)
-world  = client.get_world()
-bp_lib = world.get_blueprint_library()
-
-# Get the map spawn points
-spawn_points = world.get_map().get_spawn_points()
-
-# spawn vehicle
-vehicle_bp = bp_lib.find('vehicle.lincoln.mkz')
-vehicle = world.try_spawn_actor(vehicle_bp, random.choice(spawn_points))
-
-vehicle.set_autopilot(True)
-
-# Set up the simulator in synchronous mode
-settings = world.get_settings()
-settings.synchronous_mode = True # Enables synchronous mode
-settings.fixed_delta_seconds = 0.05
-world.apply_settings(settings)
-
-# Create a queue to store and retrieve the sensor data
-image_queue = queue.Queue()
-#camera.listen(image_queue.put)
-semantic_queue = queue.Queue()
-#camera2.listen(semantic_queue.put)
-
-# Create output directories
-os.makedirs('ims', exist_ok=True)
-os.makedirs('labels', exist_ok=True)
-
-# Initialize AI models
-print("Loading image captioning model...")
-model_path = "cnmoro/mini-image-captioning"
-caption_model = VisionEncoderDecoderModel.from_pretrained(model_path)
-caption_tokenizer = AutoTokenizer.from_pretrained(model_path)
-image_processor = AutoImageProcessor.from_pretrained(model_path)
-
-print("Loading language model...")
-llm_model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0" # "Qwen/Qwen3-0.6B" # "arnir0/Tiny-LLM" # "Qwen/Qwen3-0.6B"
-llm_tokenizer = AutoTokenizer.from_pretrained(llm_model_name)
-llm_model = AutoModelForCausalLM.from_pretrained(
-    llm_model_name,
-    torch_dtype="auto",
-    device_map="auto"
-)
-
-# Spawn 10 pedestrians with cameras
-print("Spawning pedestrians...")
-pedestrians = []
-pedestrian_cameras = []
-pedestrian_queues = []
-pedestrian_histories = []
-
-walker_bp = bp_lib.filter('walker.pedestrian.*')
-for i in range(3):
-    # Spawn pedestrian
-    spawn_point = random.choice(spawn_points)
-    ped_bp = random.choice(walker_bp)
-    pedestrian = world.try_spawn_actor(ped_bp, spawn_point)
-    
-    if pedestrian:
-        # Spawn camera attached to pedestrian
-        ped_camera_bp = bp_lib.find('sensor.camera.rgb')
-        ped_camera_bp.set_attribute('image_size_x', '640')
-        ped_camera_bp.set_attribute('image_size_y', '480')
-        ped_camera_trans = carla.Transform(carla.Location(x=0.5, z=1.7))  # Eye level
-        ped_camera = world.spawn_actor(ped_camera_bp, ped_camera_trans, attach_to=pedestrian)
-        
-        # Create queue for this pedestrian's camera
-        ped_queue = queue.Queue()
-        ped_camera.listen(ped_queue.put)
-        
-        pedestrians.append(pedestrian)
-        pedestrian_cameras.append(ped_camera)
-        pedestrian_queues.append(ped_queue)
-        pedestrian_histories.append({'observations': [], 'decisions': []})
-        
-        # Set pedestrian to walk randomly
-        walker_controller_bp = world.get_blueprint_library().find('controller.ai.walker')
-        walker_controller = world.spawn_actor(walker_controller_bp, carla.Transform(), pedestrian)
-        walker_controller.start()
-        walker_controller.go_to_location(world.get_random_location_from_navigation())
-        walker_controller.set_max_speed(1.4)  # Normal walking speed
-        
-        print(f"Spawned pedestrian {i+1}")
-
-print(f"Successfully spawned {len(pedestrians)} pedestrians")
+from collections import deque
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _bbox_has_vehicle(points_2d, semantic_red, img_w, img_h):
+        # Bounding rectangle in one pass over the projected corners
+        x_lo = x_hi = points_2d[0, 0]
+        y_lo = y_hi = points_2d[0, 1]
+        for k in range(1, points_2d.shape[0]):
+            x_lo = min(x_lo, points_2d[k, 0])
+            x_hi = max(x_hi, points_2d[k, 0])
+            y_lo = min(y_lo, points_2d[k, 1])
+            y_hi = max(y_hi, points_2d[k, 1])
+        x_min = max(0, int(x_lo))
+        x_max = min(img_w - 1, int(x_hi))
+        y_min = max(0, int(y_lo))
+        y_max = min(img_h - 1, int(y_hi))
+        # Scan the ROI, stopping at the first vehicle pixel
+        for y in range(y_min, y_max):
+            for x in range(x_min, x_max):
+                v = semantic_red[y, x]
+                if v >= 12 and v <= 19:
+                    return True
+        return False
 
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _bboxes_have_vehicle(points_2d_batch, semantic_red, img_w, img_h):
+        # One bounding box per iteration, spread across cores
+        out = np.zeros(points_2d_batch.shape[0], dtype=np.bool_)
+        for i in prange(points_2d_batch.shape[0]):
+            out[i] = _bbox_has_vehicle(points_2d_batch[i], semantic_red, img_w, img_h)
+        return out
 
 
 def check_bbox_has_vehicle(points_2d, semantic_img, img_w, img_h):
@@ -103,6 +51,9 @@ def check_bbox_has_vehicle(points_2d, semantic_img, img_w, img_h):
     Check if bounding box contains vehicle pixels in semantic segmentation.
     Vehicle labels are 12-19 (inclusive) in the red channel.
     """
+    if njit is not None:
+        return _bbox_has_vehicle(points_2d, semantic_img[:, :, 2], img_w, img_h)
+    
     # Get bounding rectangle
     x_coords = points_2d[:, 0]
     y_coords = points_2d[:, 1]
@@ -124,128 +75,270 @@ def check_bbox_has_vehicle(points_2d, semantic_img, img_w, img_h):
     return vehicle_pixels > 0
 
 
-def process_pedestrian_vision(ped_idx, ped_image):
+def check_bboxes_have_vehicle(points_2d_batch, semantic_img, img_w, img_h):
     """
-    Process pedestrian's camera image through AI models.
-    Returns the caption and decision.
+    check_bbox_has_vehicle for all of a frame's bounding boxes in one call.
+    points_2d_batch is (N, 8, 2); returns a length-N bool array.
     """
-    # Convert CARLA image to PIL Image
-    print('thinking', ped_idx)
-    img_array = np.reshape(np.copy(ped_image.raw_data), (ped_image.height, ped_image.width, 4))
-    img_rgb = img_array[:, :, :3]  # Remove alpha channel
-    pil_image = Image.fromarray(img_rgb)
-    
-    # Generate caption
-    pixel_values = image_processor(pil_image, return_tensors="pt").pixel_values
-    start_caption = time.time()
-    generated_ids = caption_model.generate(pixel_values, temperature=0.7, top_p=0.8, top_k=50, num_beams=1)
-    generated_caption = caption_tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
-    end_caption = time.time()
-    
-    print(f"\nPedestrian {ped_idx} sees: {generated_caption}")
-    print(f"Caption time: {end_caption - start_caption:.2f}s")
-    
-    # Generate decision based on caption
-    prompt = f"You are a pedestrian in a city. You see: '{generated_caption}'. What should you do next? Give a brief decision in one sentence."
-    messages = [{"role": "user", "content": prompt}]
-    text = llm_tokenizer.apply_chat_template(
-        messages,
-        tokenize=False,
-        add_generation_prompt=True,
-        enable_thinking=True
+    if njit is not None:
+        return _bboxes_have_vehicle(points_2d_batch, semantic_img[:, :, 2], img_w, img_h)
+    return np.array(
+        [check_bbox_has_vehicle(points_2d, semantic_img, img_w, img_h) for points_2d in points_2d_batch],
+        dtype=bool
     )
-    model_inputs = llm_tokenizer([text], return_tensors="pt").to(llm_model.device)
-    
-    start_llm = time.time()
-    generated_ids = llm_model.generate(**model_inputs, max_new_tokens=128)
-    output_ids = generated_ids[0][len(model_inputs.input_ids[0]):].tolist()
-    end_llm = time.time()
-    
-    # Parse thinking content
-    try:
-        index = len(output_ids) - output_ids[::-1].index(151668)  # </think>
-    except ValueError:
-        index = 0
-    
-    thinking_content = llm_tokenizer.decode(output_ids[:index], skip_special_tokens=True).strip("\n")
-    decision = llm_tokenizer.decode(output_ids[index:], skip_special_tokens=True).strip("\n")
-    
-    if thinking_content:
-        print(f"Thinking: {thinking_content[:100]}...")
-    print(f"Decision: {decision}")
-    print(f"LLM time: {end_llm - start_llm:.2f}s")
-    
-    return generated_caption, decision, img_rgb
 
 
-# Spawn NPC vehicles
-for i in range(20):
-    vehicle_bp = random.choice(bp_lib.filter('vehicle'))
-    npc = world.try_spawn_actor(vehicle_bp, random.choice(spawn_points))
-    if npc:
-        npc.set_autopilot(True)
+def inference_server(vision_requests, vision_results):
+    """
+    Entry point of the inference process. The models load and run there, so torch never
+    holds this process's GIL while CARLA's sensor callbacks need it.
+    """
+    import carla_inference  # loads the models
+    carla_inference.serve(vision_requests, vision_results)
+
+
+if __name__ == "__main__":
+    client = carla.Client('localhost', 2000)
+    world  = client.get_world()
+    bp_lib = world.get_blueprint_library()
+
+    # Get the map spawn points
+    spawn_points = world.get_map().get_spawn_points()
+
+    # spawn vehicle
+    vehicle_bp = bp_lib.find('vehicle.lincoln.mkz')
+    vehicle = world.try_spawn_actor(vehicle_bp, random.choice(spawn_points))
+
+    vehicle.set_autopilot(True)
+
+    # Set up the simulator in synchronous mode
+    settings = world.get_settings()
+    settings.synchronous_mode = True # Enables synchronous mode
+    settings.fixed_delta_seconds = 0.05
+    world.apply_settings(settings)
+
+    # Create a queue to store and retrieve the sensor data
+    image_queue = queue.Queue()
+    #camera.listen(image_queue.put)
+    semantic_queue = queue.Queue()
+    #camera2.listen(semantic_queue.put)
+
+    # Create output directories
+    os.makedirs('ims', exist_ok=True)
+    os.makedirs('labels', exist_ok=True)
+
+    # Vision inference runs in a separate process so the simulation keeps ticking while the models
+    # think: the main loop submits (ped_idx, img_bgra) requests and drains finished results.
+    # 'spawn' gives the child a fresh interpreter, with no CARLA client state or threads.
+    mp_context = mp.get_context('spawn')
+    vision_requests = mp_context.Queue()
+    vision_results = mp_context.Queue()
+    inference_process = mp_context.Process(
+        target=inference_server, args=(vision_requests, vision_results), daemon=True
+    )
+    inference_process.start()  # models load in the child while the scene is set up
+
+    if njit is not None:
+        # Compile (or load from the on-disk cache) in the background while the scene is set up
+        threading.Thread(
+            target=_bbox_has_vehicle,
+            args=(np.zeros((8, 2)), np.zeros((1, 1, 4), dtype=np.uint8)[:, :, 2], 1, 1),
+            daemon=True
+        ).start()
+        threading.Thread(
+            target=_bboxes_have_vehicle,
+            args=(np.zeros((1, 8, 2)), np.zeros((1, 1, 4), dtype=np.uint8)[:, :, 2], 1, 1),
+            daemon=True
+        ).start()
+
+    # Spawn 10 pedestrians with cameras
+    print("Spawning pedestrians...")
+    pedestrians = []
+    pedestrian_cameras = []
+    pedestrian_queues = []
+
+    walker_bp = bp_lib.filter('walker.pedestrian.*')
+    # The captioner resizes to 224x224 anyway; and frames are only sampled every 100 ticks
+    # (5 s of sim time), so there is no point capturing more often than that
+    ped_camera_bp = bp_lib.find('sensor.camera.rgb')
+    ped_camera_bp.set_attribute('image_size_x', '256')
+    ped_camera_bp.set_attribute('image_size_y', '256')
+    ped_camera_bp.set_attribute('sensor_tick', '5.0')
+    walker_controller_bp = bp_lib.find('controller.ai.walker')
+    for i in range(3):
+        # Spawn pedestrian
+        spawn_point = random.choice(spawn_points)
+        ped_bp = random.choice(walker_bp)
+        pedestrian = world.try_spawn_actor(ped_bp, spawn_point)
+
+        if pedestrian:
+            # Spawn camera attached to pedestrian
+            ped_camera_trans = carla.Transform(carla.Location(x=0.5, z=1.7))  # Eye level
+            ped_camera = world.spawn_actor(ped_camera_bp, ped_camera_trans, attach_to=pedestrian)
+
+            # Keep only this pedestrian's latest camera frame; older ones are dropped as new ones arrive
+            ped_queue = deque(maxlen=1)
+            ped_camera.listen(ped_queue.append)
+
+            pedestrians.append(pedestrian)
+            pedestrian_cameras.append(ped_camera)
+            pedestrian_queues.append(ped_queue)
 
-world.tick()
+            # Set pedestrian to walk randomly
+            walker_controller = world.spawn_actor(walker_controller_bp, carla.Transform(), pedestrian)
+            walker_controller.start()
+            walker_controller.go_to_location(world.get_random_location_from_navigation())
+            walker_controller.set_max_speed(1.4)  # Normal walking speed
 
-edges = [[0,1], [1,3], [3,2], [2,0], [0,4], [4,5], [5,1], [5,7], [7,6], [6,4], [6,2], [7,3]]
-ii = 0
-current_pedestrian_idx = 0  # Index for cycling through pedestrians
+            print(f"Spawned pedestrian {i+1}")
 
-print("\nStarting main loop...")
+    print(f"Successfully spawned {len(pedestrians)} pedestrians")
+
+    # Pedestrian histories as structure-of-arrays: row = pedestrian, column = observation number,
+    # obs_counts = filled columns per row. Capacity doubles when any row fills up.
+    observations = np.empty((len(pedestrians), 1024), dtype=object)
+    decisions = np.empty_like(observations)
+    obs_counts = np.zeros(len(pedestrians), dtype=np.int32)
+
+    # The frame each pedestrian is being captioned from, None when it has no request in flight
+    ped_in_flight = [None] * len(pedestrians)
+
+    # JPEG encoding and disk writes happen on a writer thread; the bounded queue caps how many
+    # frames can pile up if the disk falls behind (extra frames are dropped, not waited on)
+    image_writes = queue.Queue(maxsize=32)
+    JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85]
+    IMAGE_PATH_FMT = 'ims/im_%d.jpg'
+
+
+    def image_writer():
+        for path, img_bgra in iter(image_writes.get, None):
+            ok, buf = cv2.imencode('.jpg', np.ascontiguousarray(img_bgra[:, :, :3]), JPEG_PARAMS)  # cv2 wants BGR
+            if not ok:
+                print(f"Warning: JPEG encode failed for {path}")
+                continue
+            with open(path, 'wb') as f:
+                f.write(buf)
+
+
+    image_writer_thread = threading.Thread(target=image_writer, daemon=True)
+    image_writer_thread.start()
+
+
+    # Spawn NPC vehicles
+    vehicle_bps = list(bp_lib.filter('vehicle'))
+    for i in range(20):
+        vehicle_bp = random.choice(vehicle_bps)
+        npc = world.try_spawn_actor(vehicle_bp, random.choice(spawn_points))
+        if npc:
+            npc.set_autopilot(True)
 
-while True:
-    # Retrieve and reshape the image
     world.tick()
-    #image = image_queue.get()
-    #semantic_image = semantic_queue.get()
 
-    #img = np.reshape(np.copy(image.raw_data), (image.height, image.width, 4))
-    #semantic_img = np.reshape(np.copy(semantic_image.raw_data), (semantic_image.height, semantic_image.width, 4))
-    ii += 1
-    
-    # Process pedestrian vision every 100 frames (to avoid overwhelming the models)
-    if ii % 100 == 0 and len(pedestrians) > 0:
-        # Get image from current pedestrian
-        try:
-            ped_image = pedestrian_queues[current_pedestrian_idx].get(timeout=10.0)
-            caption, decision, img_rgb = process_pedestrian_vision(current_pedestrian_idx, ped_image)
-            # Store in history
-            pedestrian_histories[current_pedestrian_idx]['observations'].append(caption)
-            pedestrian_histories[current_pedestrian_idx]['decisions'].append(decision)
+    edges = [[0,1], [1,3], [3,2], [2,0], [0,4], [4,5], [5,1], [5,7], [7,6], [6,4], [6,2], [7,3]]
+    ii = 0
+    current_pedestrian_idx = 0  # Index for cycling through pedestrians
+
+    # world.tick() runs on a ticker thread, one tick per request: the main loop asks for the next
+    # tick as soon as the previous one is done, so the server steps while this tick is processed
+    tick_request = threading.Event()
+    tick_done = threading.Event()
+
+
+    def ticker():
+        while True:
+            tick_request.wait()
+            tick_request.clear()
+            world.tick()
+            tick_done.set()
+
+
+    threading.Thread(target=ticker, daemon=True).start()
+    tick_request.set()
+
+    print("\nStarting main loop...")
+
+    while True:
+        # Wait for the tick in flight and immediately start the next one
+        tick_done.wait()
+        tick_done.clear()
+        tick_request.set()
+        #image = image_queue.get()
+        #semantic_image = semantic_queue.get()
+
+        #img = np.reshape(np.copy(image.raw_data), (image.height, image.width, 4))
+        #semantic_img = np.reshape(np.copy(semantic_image.raw_data), (semantic_image.height, semantic_image.width, 4))
+        ii += 1
+
+        # Process pedestrian vision every 100 frames (to avoid overwhelming the models)
+        if ii % 100 == 0 and len(pedestrians) > 0:
+            # Hand the current pedestrian's image to the inference process, unless it is still
+            # thinking about its previous one
+            if ped_in_flight[current_pedestrian_idx] is not None:
+                print(f"Pedestrian {current_pedestrian_idx} still thinking; skipping")
+            else:
+                ped_queue = pedestrian_queues[current_pedestrian_idx]
+                ped_image = ped_queue.pop() if ped_queue else None
+                if ped_image is None:
+                    print(f"Warning: No image from pedestrian {current_pedestrian_idx}")
+                else:
+                    # Copy the frame out of CARLA's buffer; it is pickled to the inference process
+                    img_bgra = np.frombuffer(ped_image.raw_data, dtype=np.uint8).reshape(
+                        ped_image.height, ped_image.width, 4
+                    ).copy()
+                    ped_in_flight[current_pedestrian_idx] = img_bgra
+                    vision_requests.put_nowait((current_pedestrian_idx, img_bgra))
             # Move to next pedestrian
             current_pedestrian_idx = (current_pedestrian_idx + 1) % len(pedestrians)
-            cv2.imwrite(f'ims/im_{ii}.jpg', np.ascontiguousarray(img_rgb[:, :, :3]))
-        except queue.Empty:
-            print(f"Warning: No image from pedestrian {current_pedestrian_idx}")
-    
-    # Get the camera matrix 
-    #world_2_camera = np.array(camera.get_transform().get_inverse_matrix())
-    
-    # List to store all valid bounding boxes for YOLO format
-    yolo_labels = []
-    
 
+        # Collect whatever inference finished since the last tick (late results are fine)
+        while True:
+            try:
+                ped_idx, caption, decision = vision_results.get_nowait()
+            except queue.Empty:
+                break
+            img_bgra, ped_in_flight[ped_idx] = ped_in_flight[ped_idx], None
+            if caption is None:
+                continue
+            # Store in history
+            n = obs_counts[ped_idx]
+            if n == observations.shape[1]:
+                observations = np.concatenate([observations, np.empty_like(observations)], axis=1)
+                decisions = np.concatenate([decisions, np.empty_like(decisions)], axis=1)
+            observations[ped_idx, n] = caption
+            decisions[ped_idx, n] = decision
+            obs_counts[ped_idx] = n + 1
+            try:
+                image_writes.put_nowait((IMAGE_PATH_FMT % ii, img_bgra))
+            except queue.Full:
+                print(f"Warning: image writer behind; dropping frame {ii}")
 
-    # Save image and labels periodically
-    if ii % 300 == 0:
-        # Print pedestrian histories summary
-        for idx, history in enumerate(pedestrian_histories):
-            if history['observations']:
-                print(f"Pedestrian {idx} - {len(history['observations'])} observations recorded")
-    
+        # Get the camera matrix 
+        #world_2_camera = np.array(camera.get_transform().get_inverse_matrix())
+
+
+
+        # Save image and labels periodically
+        if ii % 300 == 0:
+            # Print pedestrian histories summary
+            for idx in np.flatnonzero(obs_counts):
+                print(f"Pedestrian {idx} - {obs_counts[idx]} observations recorded")
+
+
+    cv2.destroyAllWindows()
+    image_writes.put(None)
+    image_writer_thread.join()
+    #camera.stop()
+    #camera2.stop()
+    for ped_camera in pedestrian_cameras:
+        ped_camera.stop()
+    for pedestrian in pedestrians:
+        pedestrian.destroy()
+    vehicle.destroy()
 
-cv2.destroyAllWindows()
-#camera.stop()
-#camera2.stop()
-for ped_camera in pedestrian_cameras:
-    ped_camera.stop()
-for pedestrian in pedestrians:
-    pedestrian.destroy()
-vehicle.destroy()
-
-print("\nFinal Pedestrian Histories:")
-for idx, history in enumerate(pedestrian_histories):
-    print(f"\n=== Pedestrian {idx} ===")
-    for i, (obs, dec) in enumerate(zip(history['observations'], history['decisions'])):
-        print(f"  Observation {i+1}: {obs}")
-        print(f"  Decision {i+1}: {dec}")
\ No newline at end of file
+    print("\nFinal Pedestrian Histories:")
+    for idx in range(len(pedestrians)):
+        print(f"\n=== Pedestrian {idx} ===")
+        n = obs_counts[idx]
+        for i, (obs, dec) in enumerate(zip(observations[idx, :n], decisions[idx, :n])):
+            print(f"  Observation {i+1}: {obs}")
+            print(f"  Decision {i+1}: {dec}")
@@ -0,0 +1,255 @@
+"""
+Vision models for carla_agents.py: pedestrian camera captioning and LLM decisions.
+
+Runs in its own process (see carla_agents.inference_server): importing this module loads the
+models, and serve() answers (ped_idx, img_bgra) requests with (ped_idx, caption, decision).
+"""
+import os
+import time
+import queue
+import threading
+import contextlib
+import numpy as np
+import copy
+import torch
+from transformers import AutoTokenizer, AutoImageProcessor, VisionEncoderDecoderModel, AutoModelForCausalLM, DynamicCache
+from PIL import Image
+
+try:
+    # Weight-only 4-bit quantization for the LLM (CUDA only)
+    import bitsandbytes  # noqa: F401
+    from transformers import BitsAndBytesConfig
+except ImportError:
+    BitsAndBytesConfig = None
+
+# Initialize AI models: half precision on GPU, quantized LLM weights when bitsandbytes is there
+use_cuda = torch.cuda.is_available()
+half_dtype = torch.bfloat16 if use_cuda and torch.cuda.is_bf16_supported() else torch.float16
+
+print("Loading image captioning model...")
+model_path = "cnmoro/mini-image-captioning"
+caption_model = VisionEncoderDecoderModel.from_pretrained(
+    model_path,
+    torch_dtype=torch.float16 if use_cuda else torch.float32
+)
+if use_cuda:
+    caption_model.to('cuda')
+caption_tokenizer = AutoTokenizer.from_pretrained(model_path)
+image_processor = AutoImageProcessor.from_pretrained(model_path)
+
+print("Loading language model...")
+llm_model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0" # "Qwen/Qwen3-0.6B" # "arnir0/Tiny-LLM" # "Qwen/Qwen3-0.6B"
+llm_tokenizer = AutoTokenizer.from_pretrained(llm_model_name)
+if use_cuda and BitsAndBytesConfig is not None:
+    llm_model = AutoModelForCausalLM.from_pretrained(
+        llm_model_name,
+        quantization_config=BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_compute_dtype=half_dtype),
+        device_map="auto"
+    )
+else:
+    llm_model = AutoModelForCausalLM.from_pretrained(
+        llm_model_name,
+        torch_dtype=half_dtype if use_cuda else "auto",
+        device_map="auto"
+    )
+# Batched generation needs a pad token and left padding
+if llm_tokenizer.pad_token is None:
+    llm_tokenizer.pad_token = llm_tokenizer.eos_token
+llm_tokenizer.padding_side = "left"
+
+# Inference only: no dropout, no autograd bookkeeping. Grad mode is per thread, so the worker
+# threads also enter inference_mode themselves.
+caption_model.eval()
+llm_model.eval()
+torch.set_grad_enabled(False)
+
+# Every decision prompt is the same chat template around the caption. Render it once with a
+# placeholder, and prefill the part before the caption once: each call then starts from a copy
+# of that KV cache and only prefills the caption and the rest of the template.
+CAPTION_SLOT = "{CAPTION}"
+DECISION_PROMPT = f"You are a pedestrian in a city. You see: '{CAPTION_SLOT}'. What should you do next? Give a brief decision in one sentence."
+prompt_prefix, prompt_suffix = llm_tokenizer.apply_chat_template(
+    [{"role": "user", "content": DECISION_PROMPT}],
+    tokenize=False,
+    add_generation_prompt=True,
+    enable_thinking=True
+).split(CAPTION_SLOT)
+prefix_ids = llm_tokenizer(prompt_prefix, return_tensors="pt").input_ids.to(llm_model.device)
+suffix_ids = llm_tokenizer(prompt_suffix, add_special_tokens=False).input_ids  # per call only captions get tokenized
+with torch.inference_mode():
+    prefix_cache = llm_model(prefix_ids, past_key_values=DynamicCache(), use_cache=True).past_key_values
+
+# Optional torch.compile of both models' forward passes, e.g. CARLA_TORCH_COMPILE=default or
+# reduce-overhead. Off by default: the decode cache grows every step and batch sizes vary, so
+# shapes are never fully fixed and the first calls of each new shape pay a recompile.
+TORCH_COMPILE = os.environ.get('CARLA_TORCH_COMPILE', '')
+if TORCH_COMPILE:
+    print(f"Compiling models (mode={TORCH_COMPILE})...")
+    caption_model.forward = torch.compile(caption_model.forward, mode=TORCH_COMPILE, fullgraph=False)
+    llm_model.forward = torch.compile(llm_model.forward, mode=TORCH_COMPILE, fullgraph=False)
+
+# Separate CUDA streams let the caption model's kernels overlap the LLM's when both run at once
+caption_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+llm_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+
+
+def on_stream(stream):
+    return torch.cuda.stream(stream) if stream is not None else contextlib.nullcontext()
+
+
+def to_device(tensor, device, dtype=None):
+    """Host->device copy from pinned memory, asynchronous on the current stream on CUDA"""
+    if torch.device(device).type != 'cuda':
+        return tensor.to(device=device, dtype=dtype)
+    return tensor.pin_memory().to(device=device, dtype=dtype, non_blocking=True)
+
+
+def caption_pedestrian_images(batch):
+    """
+    Caption a micro-batch of pedestrians' camera images in one caption_model call.
+    batch is a list of (ped_idx, img_bgra).
+    Returns a list of (ped_idx, caption).
+    """
+    # Convert the BGRA frames to PIL Images through an RGB view of each
+    ped_idxs = [ped_idx for ped_idx, _ in batch]
+    print('thinking', ped_idxs)
+    pil_images = [Image.fromarray(img_bgra[:, :, 2::-1]) for _, img_bgra in batch]
+    
+    # Generate captions
+    pixel_values = image_processor(pil_images, return_tensors="pt").pixel_values
+    pixel_values = to_device(pixel_values, caption_model.device, caption_model.dtype)
+    start_caption = time.time()
+    # Greedy: a caption of what is in view needs no sampling, and stays short
+    generated_ids = caption_model.generate(
+        pixel_values,
+        do_sample=False,
+        num_beams=1,
+        max_new_tokens=32,
+        use_cache=True,
+        pad_token_id=caption_tokenizer.pad_token_id
+    )
+    generated_captions = caption_tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+    end_caption = time.time()
+    
+    for ped_idx, generated_caption in zip(ped_idxs, generated_captions):
+        print(f"\nPedestrian {ped_idx} sees: {generated_caption}")
+    print(f"Caption time: {end_caption - start_caption:.2f}s ({len(batch)} images)")
+    
+    return list(zip(ped_idxs, generated_captions))
+
+
+def decide_pedestrian_actions(captioned):
+    """
+    Turn a batch of captions into decisions with one padded llm_model call.
+    captioned is a list of (ped_idx, caption).
+    Returns a list of (ped_idx, caption, decision).
+    """
+    # Generate decisions based on captions: [cached prefix][padding][caption + template suffix].
+    # Left padding of the tails keeps every prompt ending at the same column, so new tokens
+    # start there; the attention mask hides the padding between prefix and tail.
+    n = len(captioned)
+    caption_ids = llm_tokenizer([generated_caption for _, generated_caption in captioned], add_special_tokens=False).input_ids
+    tails = [ids + suffix_ids for ids in caption_ids]
+    width = -(-max(len(tail) for tail in tails) // 16) * 16  # bucketed, so prompt shapes repeat
+    tail_ids = torch.full((n, width), llm_tokenizer.pad_token_id, dtype=torch.long)
+    tail_mask = torch.zeros((n, width), dtype=torch.long)
+    for row, tail in enumerate(tails):
+        tail_ids[row, width - len(tail):] = torch.tensor(tail)
+        tail_mask[row, width - len(tail):] = 1
+    input_ids = torch.cat([prefix_ids.expand(n, -1), to_device(tail_ids, llm_model.device)], dim=1)
+    attention_mask = torch.cat(
+        [torch.ones_like(prefix_ids).expand(n, -1), to_device(tail_mask, llm_model.device)], dim=1
+    )
+    cache = copy.deepcopy(prefix_cache)  # generate extends the cache in place
+    if n > 1:
+        cache.batch_repeat_interleave(n)
+    
+    start_llm = time.time()
+    generated_ids = llm_model.generate(
+        input_ids=input_ids,
+        attention_mask=attention_mask,
+        past_key_values=cache,
+        max_new_tokens=64,  # the prompt asks for one sentence
+        pad_token_id=llm_tokenizer.pad_token_id
+    )
+    prompt_len = input_ids.shape[1]
+    end_llm = time.time()
+    
+    results = []
+    for row, (ped_idx, generated_caption) in enumerate(captioned):
+        output_ids = generated_ids[row, prompt_len:]
+        
+        # Parse thinking content: split after the last </think>, searched on the device
+        think_end = torch.where(output_ids == 151668)[0]  # </think>
+        index = int(think_end[-1]) + 1 if think_end.numel() else 0
+        
+        thinking_content = llm_tokenizer.decode(output_ids[:index], skip_special_tokens=True).strip("\n")
+        decision = llm_tokenizer.decode(output_ids[index:], skip_special_tokens=True).strip("\n")
+        
+        if thinking_content:
+            print(f"Thinking: {thinking_content[:100]}...")
+        print(f"Pedestrian {ped_idx} decision: {decision}")
+        results.append((ped_idx, generated_caption, decision))
+    print(f"LLM time: {end_llm - start_llm:.2f}s ({len(captioned)} prompts)")
+    
+    return results
+
+
+# serve() runs a two-stage pipeline: the caption thread feeds the LLM thread through
+# captioned_batches, so once warm the next batch is being captioned while the previous one is
+# being decided.
+captioned_batches = queue.Queue()
+
+# Micro-batching: after the first request arrives, wait up to VISION_BATCH_TIMEOUT for more,
+# capped at VISION_BATCH_MAX, and run them through the models together
+VISION_BATCH_MAX = 3
+VISION_BATCH_TIMEOUT = 0.05
+
+
+def fail_batch(vision_results, ped_idxs, stage, e):
+    print(f"Vision {stage} failed for pedestrians {ped_idxs}: {e}")
+    for ped_idx in ped_idxs:
+        vision_results.put((ped_idx, None, None))
+
+
+def caption_worker(vision_requests, vision_results):
+    while True:
+        batch = [vision_requests.get()]
+        deadline = time.monotonic() + VISION_BATCH_TIMEOUT
+        while len(batch) < VISION_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(vision_requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            with on_stream(caption_stream), torch.inference_mode():
+                captioned_batches.put(caption_pedestrian_images(batch))
+        except Exception as e:
+            fail_batch(vision_results, [ped_idx for ped_idx, _ in batch], "captioning", e)
+
+
+def llm_worker(vision_results):
+    while True:
+        captioned = captioned_batches.get()
+        try:
+            with on_stream(llm_stream), torch.inference_mode():
+                for result in decide_pedestrian_actions(captioned):
+                    vision_results.put(result)
+        except Exception as e:
+            fail_batch(vision_results, [ped_idx for ped_idx, _ in captioned], "decision", e)
+
+
+if TORCH_COMPILE:
+    # Warm up (compile) on dummy inputs here so the main loop never pays the compile cost
+    with torch.inference_mode():
+        caption_pedestrian_images([(-1, np.zeros((256, 256, 4), dtype=np.uint8))])
+        decide_pedestrian_actions([(-1, "a city street")])
+
+
+def serve(vision_requests, vision_results):
+    """Answer (ped_idx, img_bgra) requests with (ped_idx, caption, decision) results, forever"""
+    threading.Thread(target=llm_worker, args=(vision_results,), daemon=True).start()
+    caption_worker(vision_requests, vision_results)